@@ -6,46 +6,344 @@ Lädt Firmware von GitHub und bereitet sie für ESPHome vor
 
 import os
 import sys
-import requests
+import json
+import time
+import stat
 import hashlib
+import threading
+import requests
 from pathlib import Path
+from urllib.parse import urlparse
 
 # Konfiguration
 FIRMWARE_URLS = {
     "vital_signs": "https://raw.githubusercontent.com/YOUR_USERNAME/YOUR_REPO/main/firmware/vital_signs_tracking_6843AOP_demo.bin",
-    # Weitere Firmware-Dateien hier hinzufügen
+    # Weitere Firmware-Dateien hier hinzufügen; mit bekanntem Hash entfällt der Download,
+    # sobald das Image im Store liegt:
+    # "name": {"url": "https://...", "sha256": "<64 hex>"},
 }
 
 FIRMWARE_DIR = Path("firmware")
 FIRMWARE_DIR.mkdir(exist_ok=True)
+# Size, header and SHA-256 per downloaded file, recorded from the stream
+FIRMWARE_MANIFEST = FIRMWARE_DIR / "firmware_manifest.json"
 
-def download_file(url, destination):
-    """Download file from URL"""
-    print(f"📥 Downloading from: {url}")
-    print(f"📁 Destination: {destination}")
-    
+# Parallel downloads: worker threads overall and open connections per host
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_PER_HOST = 4
+DOWNLOAD_TIMEOUT = 30
+CHUNK_SIZE = 65536
+PROGRESS_INTERVAL = 0.1
+
+def make_session(per_host=DOWNLOAD_PER_HOST):
+    """requests.Session with keep-alive pools sized for the per-host limit"""
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=per_host)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class HostLimiter:
+    """Caps the number of concurrent requests per host"""
+
+    def __init__(self, per_host=DOWNLOAD_PER_HOST):
+        self.per_host = per_host
+        self.lock = threading.Lock()
+        self.slots = {}
+
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.slots:
+                self.slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self.slots[host]
+
+class DownloadProgress:
+    """One aggregate progress line for all running downloads"""
+
+    def __init__(self, files):
+        self.files = files
+        self.done = 0
+        self.failed = 0
+        self.received = 0
+        self.total = 0
+        self.sized = 0
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.printed = 0.0
+
+    def add_total(self, size):
+        """Bytes still to come for one file; None if the server did not say"""
+        with self.lock:
+            if size is not None:
+                self.total += size
+                self.sized += 1
+
+    def advance(self, size):
+        with self.lock:
+            self.received += size
+            self._render()
+
+    def finish(self, ok):
+        with self.lock:
+            self.done += 1
+            self.failed += not ok
+            self._render(force=True)
+
+    def _render(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self.printed < PROGRESS_INTERVAL:
+            return
+        self.printed = now
+        rate = self.received / max(now - self.started, 1e-9)
+        received = f"{self.received / 1048576:.1f}"
+        if self.sized == self.files and self.total:
+            # Sizes are known once every response has started
+            received += f"/{self.total / 1048576:.1f} MiB ({self.received / self.total * 100:.1f}%)"
+        else:
+            received += " MiB"
+        print(f"\r⏳ {self.done}/{self.files} files, {received}, {rate / 1048576:.1f} MiB/s", end='', flush=True)
+
+def new_chunk_sums():
+    try:
+        from iwr6843_flash.manifest import ChunkSums
+    except ImportError:
+        return None
+    return ChunkSums()
+
+class StreamCheck:
+    """Size, header bytes and SHA-256 of a download, taken from the streamed chunks"""
+
+    def __init__(self):
+        self.size = 0
+        self.head = b""
+        self.digest = hashlib.sha256()
+        self.known_sha256 = None
+        self.etag = None
+        self.last_modified = None
+        # downloaded, resumed (from resumed_from bytes), not_modified or stored
+        self.status = "downloaded"
+        self.resumed_from = 0
+        # Per-chunk bootloader checksums for the image manifest, None without iwr6843_flash
+        self.chunks = new_chunk_sums()
+
+    @classmethod
+    def from_blob(cls, path, sha256):
+        """Check of an image already in the firmware store"""
+        check = cls()
+        check.size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            check.head = f.read(4)
+        check.known_sha256 = sha256
+        check.status = "stored"
+        check.chunks = None
+        return check
+
+    @classmethod
+    def from_entry(cls, entry):
+        """Check of an unchanged local copy, rebuilt from its manifest entry"""
+        check = cls()
+        check.size = entry["size"]
+        check.head = bytes.fromhex(entry["header"])
+        check.known_sha256 = entry["sha256"]
+        check.etag = entry.get("etag")
+        check.last_modified = entry.get("last_modified")
+        check.status = "not_modified"
+        check.chunks = None
+        return check
+
+    def update(self, chunk):
+        if len(self.head) < 4:
+            self.head += chunk[:4 - len(self.head)]
+        self.size += len(chunk)
+        self.digest.update(chunk)
+        if self.chunks is not None:
+            self.chunks.update(chunk)
+
+    @property
+    def sha256(self):
+        return self.known_sha256 or self.digest.hexdigest()
+
+    def to_dict(self):
+        return {"size": self.size, "header": self.head.hex(), "sha256": self.sha256,
+                "etag": self.etag, "last_modified": self.last_modified}
+
+def _range_validator(etag, last_modified):
+    """If-Range value: a strong ETag, else Last-Modified, else None (no resume)"""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return last_modified
+
+def _resume_offset(part, url):
+    """(offset, If-Range validator) of a resumable .part file, else (0, None)"""
+    try:
+        with open(f"{part}.json") as f:
+            state = json.load(f)
+        offset = os.path.getsize(part)
+    except (OSError, ValueError):
+        return 0, None
+    validator = _range_validator(state.get("etag"), state.get("last_modified"))
+    if state.get("url") != url or not validator or not offset:
+        return 0, None
+    return offset, validator
+
+def _make_writable(path):
+    """Windows cannot replace a read-only file (older store versions made linked blobs read-only)"""
     try:
-        response = requests.get(url, stream=True, timeout=30)
+        mode = os.stat(path).st_mode
+    except OSError:
+        return
+    if not mode & stat.S_IWRITE:
+        os.chmod(path, mode | stat.S_IWRITE)
+
+def _discard_part(part):
+    for path in (part, f"{part}.json"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def fetch(url, destination, session=requests, progress=None, report=None, cached=None):
+    """Stream url into destination and return its StreamCheck
+
+    cached is the manifest entry of an unchanged local copy; its ETag and
+    Last-Modified make the request conditional, and a 304 returns the entry
+    without touching the file. Data goes to destination.part first; an
+    interrupted .part is resumed with a Range request if the server sent a
+    validator for it. Raises requests.exceptions.RequestException.
+    """
+    part = f"{destination}.part"
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    offset, validator = _resume_offset(part, url)
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+
+    with session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+        if response.status_code == 304 and cached:
+            _discard_part(part)
+            if progress is not None:
+                progress.add_total(0)
+            return StreamCheck.from_entry(cached)
+        if response.status_code == 416:
+            # The .part no longer fits the resource, start over next time
+            _discard_part(part)
         response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
-        
-        with open(destination, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+
+        check = StreamCheck()
+        resumed = (response.status_code == 206 and offset and
+                   response.headers.get('content-range', '').startswith(f"bytes {offset}-"))
+        if response.status_code == 206 and not resumed:
+            # A range we did not ask for is only part of the image; never install it as the whole
+            _discard_part(part)
+            raise requests.exceptions.HTTPError(
+                f"206 with Content-Range {response.headers.get('content-range')!r} "
+                f"does not match resume offset {offset}", response=response)
+        if resumed:
+            check.status = "resumed"
+            check.resumed_from = offset
+            with open(part, 'rb') as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    check.update(block)
+            with open(f"{part}.json") as f:
+                state = json.load(f)
+            check.etag, check.last_modified = state.get("etag"), state.get("last_modified")
+        else:
+            check.etag = response.headers.get('etag')
+            check.last_modified = response.headers.get('last-modified')
+            with open(f"{part}.json", 'w') as f:
+                json.dump({"url": url, "etag": check.etag, "last_modified": check.last_modified}, f)
+
+        length = response.headers.get('content-length')
+        total_size = check.size + int(length) if length is not None else 0
+        if progress is not None:
+            progress.add_total(None if length is None else int(length))
+        with open(part, 'ab' if resumed else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
                 if chunk:
                     f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        print(f"\r⏳ Progress: {progress:.1f}% ({downloaded}/{total_size} bytes)", end='')
-        
+                    check.update(chunk)
+                    if progress is not None:
+                        progress.advance(len(chunk))
+                    if report is not None:
+                        report(check.size, total_size)
+        if total_size and check.size < total_size:
+            raise requests.exceptions.ConnectionError(
+                f"connection closed after {check.size} of {total_size} bytes")
+
+    _make_writable(destination)
+    os.replace(part, destination)
+    _discard_part(part)
+    return check
+
+def describe_status(check):
+    if check.status == "stored":
+        return "📦 Pinned hash already in the store, linked without download"
+    if check.status == "not_modified":
+        return "♻️  Not modified (304), keeping local copy"
+    if check.status == "resumed":
+        return f"⏯️  Resumed at {check.resumed_from} bytes"
+    return None
+
+def download_file(url, destination, session=requests, cached=None):
+    """Download file from URL; returns its StreamCheck, None on failure"""
+    print(f"📥 Downloading from: {url}")
+    print(f"📁 Destination: {destination}")
+    
+    def report(downloaded, total_size):
+        if total_size > 0:
+            progress = (downloaded / total_size) * 100
+            print(f"\r⏳ Progress: {progress:.1f}% ({downloaded}/{total_size} bytes)", end='')
+    
+    try:
+        check = fetch(url, destination, session, report=report, cached=cached)
+        status = describe_status(check)
+        if status:
+            print(f"\n{status}")
         print(f"\n✅ Download complete: {destination}")
-        return True
+        return check
         
     except requests.exceptions.RequestException as e:
         print(f"\n❌ Download failed: {e}")
-        return False
+        return None
+
+def download_all(jobs, workers=DOWNLOAD_WORKERS, per_host=DOWNLOAD_PER_HOST, session=None, manifest=None):
+    """Download (name, url, destination) jobs in parallel over one pooled session
+
+    With the manifest, unchanged local copies are only revalidated.
+    Returns (StreamCheck, None) or (None, error message) per job, in job order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    session = session or make_session(per_host)
+    limiter = HostLimiter(per_host)
+    progress = DownloadProgress(len(jobs))
+
+    def run(job):
+        name, url, destination = job
+        cached = cached_entry(manifest, destination, url) if manifest else None
+        with limiter.slot(url):
+            try:
+                check = fetch(url, destination, session, progress, cached=cached)
+            except (requests.exceptions.RequestException, OSError) as e:
+                progress.finish(False)
+                return None, str(e)
+        progress.finish(True)
+        return check, None
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            return list(pool.map(run, jobs))
+    finally:
+        print()
 
 def calculate_sha256(file_path):
     """Calculate SHA256 hash of file"""
@@ -55,13 +353,17 @@ def calculate_sha256(file_path):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-def verify_firmware(file_path):
-    """Verify firmware file integrity"""
-    if not os.path.exists(file_path):
+def verify_firmware(file_path, check=None):
+    """Verify firmware file integrity
+
+    With the StreamCheck of the download, size and header come from the
+    stream instead of reading the file again.
+    """
+    if check is None and not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
         return False
     
-    file_size = os.path.getsize(file_path)
+    file_size = os.path.getsize(file_path) if check is None else check.size
     print(f"📊 File size: {file_size} bytes ({file_size/1024:.1f} KB)")
     
     if file_size < 1024:
@@ -69,23 +371,144 @@ def verify_firmware(file_path):
         return False
     
     # Check magic header for IWR6843 firmware (0x5254534D = "MSTR" in little-endian)
-    with open(file_path, 'rb') as f:
-        header = f.read(4)
-        header_hex = header.hex()
-        print(f"🔍 File header: 0x{header_hex}")
-        
-        # IWR68xx uses META_IMAGE format with header 0x5254534D
-        if header_hex in ['4d535452', '5254534d']:  # Both endianness
-            print("✅ Valid IWR68xx firmware header detected")
-            return True
-        else:
-            print(f"⚠️  Unexpected header (expected 0x5254534D, got 0x{header_hex})")
-            print("   Firmware might still be valid for older formats")
-            return True  # Don't fail, just warn
+    if check is None:
+        with open(file_path, 'rb') as f:
+            header = f.read(4)
+    else:
+        header = check.head
+    header_hex = header.hex()
+    print(f"🔍 File header: 0x{header_hex}")
     
-    return True
+    try:
+        from iwr6843_flash.catalog import parse_header, detect_file_types
+    except ImportError:
+        parse_header = None
+    
+    # IWR68xx uses META_IMAGE format with header 0x5254534D
+    if header_hex in ['4d535452', '5254534d']:  # Both endianness
+        print("✅ Valid IWR68xx firmware header detected")
+        return True
+    elif parse_header is not None:
+        # Older formats (e.g. xWR14xx MSS/BSS images) are in the header tables too
+        header_word = parse_header(header)
+        file_types = detect_file_types(header_word) if header_word is not None else {}
+        if not file_types:
+            print(f"❌ Unknown header 0x{header_hex}: not valid for any part family")
+            return False
+        found = sorted({t for types in file_types.values() for t in types.values()})
+        print(f"✅ Valid header for {', '.join(found)}")
+        return True
+    else:
+        print(f"⚠️  Unexpected header (expected 0x5254534D, got 0x{header_hex})")
+        print("   Firmware might still be valid for older formats")
+        return True  # Without the flash tool the header tables are not available
+
+def load_manifest(path=FIRMWARE_MANIFEST):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-def generate_esphome_config(firmware_files):
+def save_manifest(manifest, path=FIRMWARE_MANIFEST):
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def record_download(manifest, file_path, url, check):
+    """Store the streamed size/header/digest together with the file's stat"""
+    stat = os.stat(file_path)
+    manifest[Path(file_path).name] = dict(check.to_dict(), url=url, mtime_ns=stat.st_mtime_ns)
+
+def manifest_digest(manifest, file_path):
+    """SHA-256 from the manifest, None if the file changed since it was recorded"""
+    entry = manifest.get(Path(file_path).name)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+    return None
+
+def cached_entry(manifest, file_path, url):
+    """Manifest entry of an unchanged local copy of url, else None"""
+    entry = manifest.get(Path(file_path).name)
+    if entry and entry.get("url") == url and manifest_digest(manifest, file_path):
+        return entry
+    return None
+
+def image_source(value):
+    """FIRMWARE_URLS value -> (url, pinned SHA-256 or None)"""
+    if isinstance(value, dict):
+        return value["url"], value.get("sha256")
+    return value, None
+
+def open_store():
+    """The flash tool's content-addressed FirmwareStore, None without iwr6843_flash"""
+    try:
+        from iwr6843_flash.store import FirmwareStore
+    except ImportError:
+        return None
+    return FirmwareStore()
+
+def store_image(store, destination, check):
+    """Move a verified image into the store and hardlink destination to its blob
+
+    An identical image stored under another name is reused, so the
+    duplicate is dropped.
+    """
+    if store is None:
+        return
+    store.put_file(destination, check.sha256)
+    store.materialize(check.sha256, destination)
+    store.set_ref(Path(destination).name, check.sha256)
+
+def write_image_manifests(destination, check, store=None):
+    """Manifest sidecars of destination and its store blob; returns the manifest
+
+    Hash, header and chunk checksums come from the download stream; a copy
+    that was not downloaded (304, pinned in the store) keeps a still valid
+    manifest or gets one built from the file. None without iwr6843_flash.
+    """
+    try:
+        from iwr6843_flash.manifest import (make_manifest, write_image_manifest,
+                                            read_image_manifest, ensure_image_manifest)
+    except ImportError:
+        return None
+    if check.chunks is not None:
+        manifest = write_image_manifest(destination, make_manifest(
+            Path(destination).name, check.sha256, check.size, None, check.head, check.chunks.finish()))
+    else:
+        manifest, _built = ensure_image_manifest(destination)
+    if store is not None and store.has(check.sha256):
+        blob = store.blob_path(check.sha256)
+        if read_image_manifest(blob, manifest["chunk_size"]) is None:
+            write_image_manifest(blob, manifest)
+    return manifest
+
+def read_image_manifest(file_path):
+    try:
+        from iwr6843_flash.manifest import read_image_manifest as read
+    except ImportError:
+        return None
+    return read(file_path)
+
+def register_in_catalog(file_path, url, check=None):
+    """Record the image and its source URL in the flash tool's firmware catalog"""
+    try:
+        from iwr6843_flash.catalog import FirmwareCatalog
+    except ImportError:
+        return
+    catalog = FirmwareCatalog()
+    if check is None:
+        entry = catalog.add(file_path, source_url=url)
+    else:
+        entry = catalog.add(file_path, source_url=url, sha256=check.sha256, head=check.head)
+    catalog.save()
+    print(f"🗂️  Catalog: {entry['name']} ({entry['sha256'][:12]})")
+
+def generate_esphome_config(firmware_files, manifest=None, store=None):
     """Generate ESPHome configuration snippet"""
     config_snippet = """
 # ============================================
@@ -96,17 +519,34 @@ def generate_esphome_config(firmware_files):
 # Embed firmware files at compile time
 # These files will be included in the ESP32 flash
 """
+    substitutions = []
     
     for name, file_path in firmware_files.items():
         if os.path.exists(file_path):
-            sha256 = calculate_sha256(file_path)
-            size = os.path.getsize(file_path)
+            # The image manifest has everything; without one, fall back to scanning
+            image = read_image_manifest(file_path)
+            if image is not None:
+                sha256, size = image["sha256"], image["size"]
+            else:
+                sha256 = manifest_digest(manifest or {}, file_path) or calculate_sha256(file_path)
+                size = os.path.getsize(file_path)
             
             config_snippet += f"""
 # {name} Firmware
 # Size: {size} bytes ({size/1024:.1f} KB)
 # SHA256: {sha256}
 """
+            if store is not None and store.has(sha256):
+                config_snippet += f"# Store: {store.blob_path(sha256)}\n"
+            substitutions += [(f"{name}_firmware_sha256", sha256), (f"{name}_firmware_size", size)]
+            if image is not None:
+                config_snippet += f"# Header: {image['header']}, {image['chunk_count']} chunks of {image['chunk_size']} bytes\n"
+                substitutions += [(f"{name}_firmware_chunk_size", image["chunk_size"]),
+                                  (f"{name}_firmware_chunks", image["chunk_count"])]
+    
+    if substitutions:
+        config_snippet += "\nsubstitutions:\n"
+        config_snippet += "".join(f'  {key}: "{value}"\n' for key, value in substitutions)
     
     config_file = Path("firmware_config_generated.yaml")
     with open(config_file, 'w') as f:
@@ -114,22 +554,126 @@ def generate_esphome_config(firmware_files):
     
     print(f"\n📝 Generated config: {config_file}")
 
+class _BenchmarkHandler:
+    """Mixin for http.server: fake network latency per connection and request"""
+
+    connect_delay = 0.0
+    request_delay = 0.0
+
+    def setup(self):
+        # TCP/TLS handshake of a new connection
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def send_head(self):
+        # Round trip until the first byte of every response
+        time.sleep(self.request_delay)
+        return super().send_head()
+
+    def log_message(self, format, *args):
+        pass
+
+def run_benchmark(count, size_kib=256, latency_ms=20, workers=DOWNLOAD_WORKERS, per_host=DOWNLOAD_PER_HOST):
+    """Serve count images locally and time the sequential loop against download_all"""
+    import struct
+    import tempfile
+    from functools import partial
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    handler = type("Handler", (_BenchmarkHandler, SimpleHTTPRequestHandler),
+                   {"protocol_version": "HTTP/1.1", "connect_delay": latency_ms / 1000.0,
+                    "request_delay": latency_ms / 1000.0})
+    with tempfile.TemporaryDirectory() as served, tempfile.TemporaryDirectory() as target:
+        body = struct.pack('<I', 0x5254534D) + os.urandom(size_kib * 1024 - 4)
+        for i in range(count):
+            with open(os.path.join(served, f"image{i:03d}.bin"), 'wb') as f:
+                f.write(body)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=served))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        jobs = [(f"image{i:03d}", f"{base}/image{i:03d}.bin", Path(target) / f"image{i:03d}.bin")
+                for i in range(count)]
+        print(f"🏁 {count} images × {size_kib} KiB from {base}, {latency_ms} ms per connect and request")
+
+        try:
+            started = time.perf_counter()
+            for name, url, destination in jobs:
+                # The old loop: one request per file, each on a new connection
+                fetch(url, destination)
+            sequential = time.perf_counter() - started
+
+            started = time.perf_counter()
+            errors = [error for _check, error in download_all(jobs, workers, per_host)]
+            concurrent = time.perf_counter() - started
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    failed = sum(1 for e in errors if e)
+    total = count * size_kib / 1024
+    print(f"📊 Sequential:  {sequential:7.3f} s ({total / sequential:.1f} MiB/s)")
+    print(f"📊 Concurrent:  {concurrent:7.3f} s ({total / concurrent:.1f} MiB/s), "
+          f"{workers} workers, {per_host} per host")
+    print(f"{'✅' if not failed else '❌'} Speedup {sequential / concurrent:.1f}×, {failed} failed")
+    return 0 if not failed else 1
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Download IWR6843AOP firmware images")
+    parser.add_argument('urls', nargs='*',
+                        help='Firmware URL(s); without URLs all FIRMWARE_URLS are downloaded')
+    parser.add_argument('--jobs', '-j', type=int, default=DOWNLOAD_WORKERS,
+                        help=f'Parallel downloads (default: {DOWNLOAD_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DOWNLOAD_PER_HOST,
+                        help=f'Parallel connections per host (default: {DOWNLOAD_PER_HOST})')
+    parser.add_argument('--gc', action='store_true',
+                        help='Delete store blobs that no image name refers to any more')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                        help='Serve N synthetic images locally and compare sequential vs. concurrent')
+    parser.add_argument('--benchmark-size', type=int, default=256, metavar='KIB',
+                        help='Image size for --benchmark in KiB (default: 256)')
+    parser.add_argument('--latency', type=int, default=20, metavar='MS',
+                        help='Simulated latency per connect and request for --benchmark (default: 20)')
+    return parser.parse_args(argv)
+
 def main():
     """Main function"""
     print("=" * 60)
     print("🎯 IWR6843AOP Firmware Download Tool")
     print("=" * 60)
     
-    if len(sys.argv) > 1:
+    args = parse_args()
+    if args.benchmark:
+        return run_benchmark(args.benchmark, args.benchmark_size, args.latency, args.jobs, args.per_host)
+    
+    store = open_store()
+    if args.gc:
+        if store is None:
+            print("❌ Firmware store needs the iwr6843_flash package")
+            return 1
+        removed, freed = store.gc()
+        print(f"🧹 Store: removed {removed} unreferenced blob(s), {freed / 1024:.1f} KB freed")
+        return 0
+    
+    if len(args.urls) == 1:
         # Custom URL provided
-        custom_url = sys.argv[1]
+        custom_url = args.urls[0]
         custom_name = Path(custom_url).name
         destination = FIRMWARE_DIR / custom_name
         
-        if download_file(custom_url, destination):
-            if verify_firmware(destination):
-                sha256 = calculate_sha256(destination)
-                print(f"\n🔐 SHA256: {sha256}")
+        manifest = load_manifest()
+        check = download_file(custom_url, destination, cached=cached_entry(manifest, destination, custom_url))
+        if check:
+            if verify_firmware(destination, check):
+                print(f"\n🔐 SHA256: {check.sha256}")
+                store_image(store, destination, check)
+                write_image_manifests(destination, check, store)
+                record_download(manifest, destination, custom_url, check)
+                save_manifest(manifest)
+                if store is not None:
+                    store.save()
+                register_in_catalog(destination, custom_url, check)
                 print(f"\n✅ SUCCESS: Firmware ready at {destination}")
                 return 0
             else:
@@ -139,34 +683,67 @@ def main():
             print(f"\n❌ FAILED: Could not download firmware")
             return 1
     
-    # Download all configured firmwares
+    # Download all configured (or given) firmwares in parallel
+    urls = {Path(url).stem: url for url in args.urls} or FIRMWARE_URLS
+    sources = {name: image_source(value) for name, value in urls.items()}
+    jobs = [(name, url, FIRMWARE_DIR / f"{name}.bin") for name, (url, _pinned) in sources.items()]
+    # Pinned images already in the store need no request at all
+    stored = {job for job in jobs
+              if store is not None and sources[job[0]][1] and store.has(sources[job[0]][1])}
+    pending = [job for job in jobs if job not in stored]
+    print(f"📥 Downloading {len(pending)} file(s), {args.jobs} parallel, {args.per_host} per host"
+          f"{f', {len(stored)} from the store' if stored else ''}")
+    started = time.perf_counter()
+    manifest = load_manifest()
+    results = dict(zip(pending, download_all(pending, args.jobs, args.per_host, manifest=manifest)))
+    print(f"⏱️  Downloads finished in {time.perf_counter() - started:.2f} s")
     success_count = 0
     firmware_files = {}
     
-    for name, url in FIRMWARE_URLS.items():
+    for job in jobs:
+        name, url, destination = job
         print(f"\n📦 Processing: {name}")
-        destination = FIRMWARE_DIR / f"{name}.bin"
+        if job in stored:
+            pinned = sources[name][1]
+            store.materialize(pinned, destination)
+            check, error = StreamCheck.from_blob(store.blob_path(pinned), pinned), None
+        else:
+            check, error = results[job]
         
-        if download_file(url, destination):
-            if verify_firmware(destination):
-                sha256 = calculate_sha256(destination)
-                print(f"🔐 SHA256: {sha256}")
+        if error is None:
+            status = describe_status(check)
+            if status:
+                print(status)
+            if verify_firmware(destination, check):
+                print(f"🔐 SHA256: {check.sha256}")
+                pinned = sources[name][1]
+                if pinned and pinned != check.sha256:
+                    print(f"❌ SHA-256 mismatch for {name}: expected {pinned}")
+                    continue
+                store_image(store, destination, check)
+                write_image_manifests(destination, check, store)
+                record_download(manifest, destination, url, check)
+                register_in_catalog(destination, url, check)
                 firmware_files[name] = destination
                 success_count += 1
             else:
                 print(f"⚠️  Verification failed for {name}")
         else:
-            print(f"❌ Download failed for {name}")
+            print(f"❌ Download failed for {name}: {error}")
+    
+    save_manifest(manifest)
+    if store is not None:
+        store.save()
     
     # Generate config
     if firmware_files:
-        generate_esphome_config(firmware_files)
+        generate_esphome_config(firmware_files, manifest, store)
     
     print("\n" + "=" * 60)
-    print(f"📊 Summary: {success_count}/{len(FIRMWARE_URLS)} firmware files downloaded")
+    print(f"📊 Summary: {success_count}/{len(jobs)} firmware files downloaded")
     print("=" * 60)
     
-    if success_count == len(FIRMWARE_URLS):
+    if success_count == len(jobs):
         print("\n✅ All firmware files ready!")
         print("\n💡 Next steps:")
         print("   1. Review firmware_config_generated.yaml")
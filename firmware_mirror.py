@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Firmware-Mirror für IWR6843AOP
+Liefert Firmware aus dem lokalen Store an viele ESP32-Knoten aus; jedes
+Image wird nur einmal von upstream geladen
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import download_firmware as dl
+from iwr6843_flash.store import FirmwareStore, is_sha256
+from iwr6843_flash.manifest import MANIFEST_SUFFIX, ensure_image_manifest
+
+MIRROR_PORT = 8080
+# Seconds before a cached name is revalidated upstream (a conditional GET)
+MIRROR_MAX_AGE = 300.0
+COPY_BLOCK_SIZE = 65536
+
+def parse_range(header, size):
+    """(start, end) of a single 'bytes=' range, None to send the whole file
+
+    Raises ValueError if the range cannot be satisfied. Multi-range requests
+    are answered with the whole file, which RFC 9110 allows.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError(header)
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+class Mirror:
+    """Image name -> store blob; a missing or stale name is fetched upstream once"""
+
+    def __init__(self, store, firmware_dir=dl.FIRMWARE_DIR, sources=None, upstream=None,
+                 max_age=MIRROR_MAX_AGE):
+        self.store = store
+        self.firmware_dir = Path(firmware_dir)
+        self.manifest_file = self.firmware_dir / "firmware_manifest.json"
+        self.manifest = dl.load_manifest(self.manifest_file)
+        # "<name>.bin" -> (url, pinned SHA-256), from FIRMWARE_URLS
+        self.sources = {f"{name}.bin": dl.image_source(value) for name, value in (sources or {}).items()}
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.max_age = max_age
+        self.session = dl.make_session()
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.checked = {}
+        self.stats = {"requests": 0, "hits": 0, "upstream_fetches": 0, "upstream_not_modified": 0,
+                      "upstream_errors": 0, "bytes_sent": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def source(self, name):
+        if name in self.sources:
+            return self.sources[name]
+        if self.upstream:
+            return f"{self.upstream}/{name}", None
+        return None, None
+
+    def resolve(self, name):
+        """SHA-256 of the image called name; raises KeyError if there is none"""
+        url, pinned = self.source(name)
+        if pinned and self.store.has(pinned):
+            self.count("hits")
+            return pinned
+        sha256 = self.store.refs.get(name)
+        fresh = time.monotonic() - self.checked.get(name, float("-inf")) < self.max_age
+        if sha256 and self.store.has(sha256) and (fresh or url is None):
+            self.count("hits")
+            return sha256
+        if url is None:
+            raise KeyError(name)
+
+        # Single flight: concurrent requests for the same name share one upstream fetch
+        with self.lock:
+            done = self.inflight.get(name)
+            owner = done is None
+            if owner:
+                done = self.inflight[name] = threading.Event()
+        if not owner:
+            done.wait()
+            return self.resolve_cached(name)
+        try:
+            return self._refresh(name, url, pinned)
+        except (dl.requests.exceptions.RequestException, OSError) as e:
+            response = getattr(e, "response", None)
+            if response is not None and response.status_code == 404 and not sha256:
+                raise KeyError(name) from None
+            self.count("upstream_errors")
+            if sha256 and self.store.has(sha256):
+                print(f"⚠️  Upstream failed for {name} ({e}), serving the cached copy")
+                return sha256
+            raise KeyError(name) from e
+        finally:
+            with self.lock:
+                del self.inflight[name]
+            done.set()
+
+    def resolve_cached(self, name):
+        sha256 = self.store.refs.get(name)
+        if sha256 is None or not self.store.has(sha256):
+            raise KeyError(name)
+        self.count("hits")
+        return sha256
+
+    def _refresh(self, name, url, pinned):
+        destination = self.firmware_dir / name
+        cached = dl.cached_entry(self.manifest, destination, url)
+        check = dl.fetch(url, destination, self.session, cached=cached)
+        if pinned and check.sha256 != pinned:
+            raise OSError(f"SHA-256 mismatch for {name}: expected {pinned}, got {check.sha256}")
+        with self.lock:
+            dl.store_image(self.store, destination, check)
+            dl.write_image_manifests(destination, check, self.store)
+            dl.record_download(self.manifest, destination, url, check)
+            dl.save_manifest(self.manifest, self.manifest_file)
+            self.store.save()
+            self.checked[name] = time.monotonic()
+            key = "upstream_not_modified" if check.status == "not_modified" else "upstream_fetches"
+            self.stats[key] += 1
+        if check.status != "not_modified":
+            print(f"📥 {name}: {check.size} bytes from {url} ({check.sha256[:12]})")
+        return check.sha256
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """GET/HEAD /<name>, /sha256/<hex> and /status with strong ETags and Range
+
+    Appending .manifest.json to an image path returns its image manifest.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "IWR6843Mirror/1.0"
+    mirror = None
+    use_sendfile = True
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def _reply_json(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _serve(self, body):
+        mirror = self.mirror
+        mirror.count("requests")
+        path = urlparse(self.path).path.lstrip("/")
+        if path == "status":
+            with mirror.lock:
+                return self._reply_json(200, dict(mirror.stats, images=len(mirror.store.refs)))
+        manifest = path.endswith(MANIFEST_SUFFIX)
+        if manifest:
+            path = path[:-len(MANIFEST_SUFFIX)]
+        immutable = path.startswith("sha256/")
+        if immutable:
+            sha256 = path[len("sha256/"):]
+            if not is_sha256(sha256) or not mirror.store.has(sha256):
+                return self.send_error(404)
+        else:
+            if not path or "/" in path or path.startswith("."):
+                return self.send_error(404)
+            try:
+                sha256 = mirror.resolve(path)
+            except KeyError as e:
+                return self.send_error(502 if e.__cause__ is not None else 404)
+
+        blob = mirror.store.blob_path(sha256)
+        if manifest:
+            return self._send_manifest(blob, sha256, immutable, body)
+        size = os.path.getsize(blob)
+        etag = f'"{sha256}"'
+        if self._not_modified(etag):
+            return
+
+        start, end, status = 0, size - 1, 200
+        if_range = self.headers.get("If-Range")
+        if if_range is None or if_range == etag:
+            try:
+                requested = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if requested is not None:
+                (start, end), status = requested, 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        # Names can move to a new image, hashes never change
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable" if immutable else "no-cache")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if body:
+            self._send_file(blob, start, end - start + 1)
+
+    def _not_modified(self, etag):
+        if self.headers.get("If-None-Match") not in (etag, "*"):
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        return True
+
+    def _send_manifest(self, blob, sha256, immutable, body):
+        """The blob's image manifest, built once on first request"""
+        etag = f'"{sha256}.manifest"'
+        if self._not_modified(etag):
+            return
+        with self.mirror.lock:
+            image, _built = ensure_image_manifest(blob)
+        data = json.dumps(image).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable" if immutable else "no-cache")
+        self.end_headers()
+        if body:
+            self.wfile.write(data)
+            self.mirror.count("bytes_sent", len(data))
+
+    def _send_file(self, path, offset, count):
+        with open(path, "rb") as f:
+            if self.use_sendfile:
+                # Zero-copy: os.sendfile from the page cache into the socket
+                sent = self.connection.sendfile(f, offset, count)
+            else:
+                f.seek(offset)
+                sent = 0
+                while sent < count:
+                    block = f.read(min(COPY_BLOCK_SIZE, count - sent))
+                    if not block:
+                        break
+                    self.wfile.write(block)
+                    sent += len(block)
+        self.mirror.count("bytes_sent", sent)
+
+def make_server(mirror, bind="0.0.0.0", port=MIRROR_PORT, use_sendfile=True, verbose=False):
+    handler = type("Handler", (MirrorHandler,), {"mirror": mirror, "use_sendfile": use_sendfile,
+                                                 "verbose": verbose})
+    server = ThreadingHTTPServer((bind, port), handler)
+    server.daemon_threads = True
+    return server
+
+def _client_run(base, names, sha256s, rounds):
+    """One client: every image rounds times over its own keep-alive session"""
+    import hashlib
+    session = dl.requests.Session()
+    latencies, received = [], 0
+    for _ in range(rounds):
+        for name in names:
+            started = time.perf_counter()
+            response = session.get(f"{base}/{name}", timeout=dl.DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            if hashlib.sha256(response.content).hexdigest() != sha256s[name]:
+                raise OSError(f"corrupt response for {name}")
+            latencies.append(time.perf_counter() - started)
+            received += len(response.content)
+    session.close()
+    return latencies, received
+
+def run_benchmark(clients, images=4, size_kib=512, latency_ms=20, rounds=2):
+    """Many concurrent local clients against a mirror in front of a slow upstream"""
+    import struct
+    import hashlib
+    import tempfile
+    from functools import partial
+    from concurrent.futures import ProcessPoolExecutor
+    from http.server import SimpleHTTPRequestHandler
+
+    upstream_gets = []
+
+    class Upstream(dl._BenchmarkHandler, SimpleHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        connect_delay = request_delay = latency_ms / 1000.0
+
+        def do_GET(self):
+            upstream_gets.append(self.path)
+            super().do_GET()
+
+    with tempfile.TemporaryDirectory() as work:
+        served = os.path.join(work, "upstream")
+        os.makedirs(served)
+        names, sha256s = [], {}
+        for i in range(images):
+            data = struct.pack("<I", 0x5254534D) + os.urandom(size_kib * 1024 - 4)
+            names.append(f"image{i}.bin")
+            sha256s[names[-1]] = hashlib.sha256(data).hexdigest()
+            with open(os.path.join(served, names[-1]), "wb") as f:
+                f.write(data)
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), partial(Upstream, directory=served))
+        upstream.daemon_threads = True
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        print(f"🏁 {clients} clients × {images} images × {size_kib} KiB × {rounds} rounds, "
+              f"upstream latency {latency_ms} ms")
+
+        once = True
+        for use_sendfile in (True, False):
+            mode = "sendfile" if use_sendfile else "read/write"
+            firmware_dir = os.path.join(work, mode, "firmware")
+            os.makedirs(firmware_dir)
+            mirror = Mirror(FirmwareStore(os.path.join(work, mode, "store")), firmware_dir,
+                            upstream=f"http://127.0.0.1:{upstream.server_address[1]}")
+            server = make_server(mirror, "127.0.0.1", 0, use_sendfile)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            del upstream_gets[:]
+            started = time.perf_counter()
+            # CPU of this process only: mirror (and upstream), not the client processes
+            cpu = time.process_time()
+            try:
+                # Clients in their own processes, so the mirror process only serves
+                with ProcessPoolExecutor(max_workers=clients) as pool:
+                    runs = list(pool.map(_client_run, [base] * clients, [names] * clients,
+                                         [sha256s] * clients, [rounds] * clients))
+            finally:
+                server.shutdown()
+                server.server_close()
+            elapsed = time.perf_counter() - started
+            cpu = time.process_time() - cpu
+            latencies = sorted(l for run, _ in runs for l in run)
+            received = sum(r for _, r in runs)
+            once = once and len(upstream_gets) == images
+            print(f"📊 {mode:<10} {elapsed:7.3f} s, {received / elapsed / 1048576:7.1f} MiB/s, "
+                  f"p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms, "
+                  f"mirror CPU {cpu / (received / 1073741824):5.2f} s/GiB, "
+                  f"upstream GETs {len(upstream_gets)} for {len(latencies)} requests")
+        upstream.shutdown()
+        upstream.server_close()
+
+    print(f"{'✅' if once else '❌'} Each image fetched upstream once: {once}")
+    return 0 if once else 1
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve firmware images from the local store to ESP32 nodes")
+    parser.add_argument('--bind', default="0.0.0.0", help='Address to listen on (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=MIRROR_PORT, help=f'Port (default: {MIRROR_PORT})')
+    parser.add_argument('--upstream', metavar='URL',
+                        help='Base URL for images not listed in FIRMWARE_URLS (<URL>/<name>)')
+    parser.add_argument('--max-age', type=float, default=MIRROR_MAX_AGE, metavar='S',
+                        help=f'Revalidate a cached image upstream after S seconds (default: {MIRROR_MAX_AGE:.0f})')
+    parser.add_argument('--no-sendfile', action='store_true', help='Copy through user space instead of sendfile')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every request')
+    parser.add_argument('--benchmark', type=int, metavar='CLIENTS',
+                        help='Run CLIENTS concurrent local clients against a mirror of a slow local upstream')
+    parser.add_argument('--benchmark-images', type=int, default=4, metavar='N',
+                        help='Images for --benchmark (default: 4)')
+    parser.add_argument('--benchmark-size', type=int, default=512, metavar='KIB',
+                        help='Image size for --benchmark in KiB (default: 512)')
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    if args.benchmark:
+        return run_benchmark(args.benchmark, args.benchmark_images, args.benchmark_size)
+
+    mirror = Mirror(FirmwareStore(), sources=dl.FIRMWARE_URLS, upstream=args.upstream, max_age=args.max_age)
+    server = make_server(mirror, args.bind, args.port, not args.no_sendfile, args.verbose)
+    names = sorted(set(mirror.sources) | set(mirror.store.refs))
+    print(f"🪞 Firmware mirror on http://{args.bind}:{args.port}/ "
+          f"({len(names)} image(s){', upstream ' + args.upstream if args.upstream else ''})")
+    for name in names:
+        print(f"   /{name}")
+    print("   /sha256/<hash>, /status")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Mirror stopped")
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
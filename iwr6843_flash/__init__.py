@@ -0,0 +1,24 @@
+"""
+IWR6843AOP flash core
+
+Shared by all entry points:
+  flash_iwr6843aop.py                  command-line tool
+  flash_iwr6843aop_standalone.py       standalone command-line tool
+  ccs_base/mmWave/gen1/mmWaveProgFlash.py  Uniflash-compatible module
+
+API:
+  BootLdr             protocol engine (TI mmWaveProgFlash interface)
+  IWR6843AOPFlasher   flash session: settings, header check, erase, download
+  EventStream/Tracer  machine-readable events and Chrome trace spans
+  SimulatedDevice     in-process bootloader, pass open_serial as comm_factory
+"""
+
+from .constants import *
+from .serial_stub import SerialStub
+from .bootloader import BootLdr, FilesObject
+from .simulator import SimulatedDevice
+from .events import EventStream, FlashPhase, EVENT_FORMATS, TRACE_LEVEL_NAMES
+from .tracing import Tracer
+from .flasher import IWR6843AOPFlasher, FlashCallback
+from .profiling import SamplingProfiler, run_profiled, PROFILE_MODES
+from .cli import main, run_flash, run_check, COMMANDS
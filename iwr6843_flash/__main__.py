@@ -0,0 +1,9 @@
+"""
+python -m iwr6843_flash: same command line as flash_iwr6843aop.py
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,760 @@
+"""
+TI mmWave ROM bootloader protocol (from mmWaveProgFlash.py)
+
+BootLdr is the engine shared by the command-line tool and the
+Uniflash-compatible front end in ccs_base/mmWave/gen1: packet framing,
+response parsing and progress reporting live here only.
+"""
+
+import os
+import sys
+import time
+import struct
+
+from . import serial_stub
+from .constants import *
+from .device import DeviceInfo
+from .headers import HEADER_CACHE, HEADER_INDEX, MASKED_HEADER_INDEX, image_identity
+
+# serial and binascii are imported where they are used so that offline
+# commands never load them.
+
+#----------TEST-------------
+# Set to True for testing without the EVM (faster)
+# Set to False for production and to flash to the EVM
+STUBOUT_VALUE = False
+#----------TEST-------------
+
+def _checksum(data):
+    """8-bit additive checksum used by the bootloader packet framing"""
+    return sum(data) & 0xFF
+
+def _packet_checksum(opcode, chunkSum):
+    """Checksum of opcode + chunk from the chunk's precomputed sum8 (None: compute it)"""
+    if chunkSum is None:
+        return None
+    return (_checksum(opcode) + chunkSum) & 0xFF
+
+# Complete ACK response packet: size 4, checksum, 0x00, ACK
+ACK_PACKET = struct.pack(">HB", 4, _checksum(b"\x00" + AWR_BOOTLDR_OPCODE_ACK)) + b"\x00" + AWR_BOOTLDR_OPCODE_ACK
+
+def _image_size(image):
+    """Size of an image given as a path or as a bundle member"""
+    if hasattr(image, "open"):
+        return image.size
+    return os.path.getsize(image)
+
+def _image_open(image):
+    """Binary reader for a path or a bundle member (streamed, not extracted)"""
+    if hasattr(image, "open"):
+        return image.open()
+    return open(image,"rb")
+
+def _wait_for_ack(comm, until):
+    """Read until a complete ACK packet arrives or time.perf_counter() passes until"""
+    window = b""
+    while time.perf_counter() < until:
+        byte = comm.read(1)
+        if byte:
+            window = (window + byte)[-len(ACK_PACKET):]
+            if window == ACK_PACKET:
+                return True
+    return False
+
+class FilesObject(object):
+    """File information object"""
+    file_id = ""
+    fileSize = 0
+    order = 0
+    path = ""
+    chunkSums = None
+
+    def __init__(self, path, order):
+        self.path = path
+        self.order = order
+        self.file_id = ""
+        self.fileSize = 0
+        self.chunkSums = None
+
+class BootLdr:
+    """Main bootloader class for mmWave devices"""
+
+    def __init__(self, cls, com_port, trace_level=0, tracer=None, comm_factory=None, reset_sequence=None):
+        self.callbackClass=cls
+        self.com_port = com_port
+        self.tracer = tracer
+        self.commFactory = comm_factory
+        self.resetSequence = reset_sequence
+        self.baudrate = DEFAULT_SERIAL_BAUD_RATE
+        self.chunksize = DEFAULT_CHUNK_SIZE
+        self.FileList = Files
+        self.StorageList = Storages
+        self.trace_level = trace_level
+        self.IGNORE_BYTE_CONDITION = IGNORE_BYTE_CONDITION
+        self.IS_FILE_ALLOCATED = False
+        self.MAX_APP_FILE_SIZE = MAX_APP_FILE_SIZE
+        self.CHIP_VARIANT = CHIP_VARIANT
+        self.ROM_VERSION = ROM_VERSION
+        self.cmdStatusSize = 1
+        self.connected = False
+        self.progPercentage = 0
+        self.imageProgCntList = {}
+        self.PG3OrLater = False
+        self.versionInfo = ""
+        self.versionRecord = b""
+        self.deviceInfo = None
+        self.progMessage =""
+        self.partNum = ""
+        self.cancelRequested = False
+        self.stubOut = STUBOUT_VALUE
+        self.opcodeStats = {}
+        self._trace_msg(TRACE_LEVEL_DEBUG, "===>" + self.__class__.__name__ + " init complete")
+
+    def _update_prog_msg(self,updateStr,incPercent):
+        if (self.callbackClass != ''):
+            newProgPercent = self.progPercentage + incPercent
+            if (newProgPercent > UNIFLASH_PROG_INDICATOR_B4_SHUTDOWN):
+                newProgPercent = UNIFLASH_PROG_INDICATOR_B4_SHUTDOWN
+                self._trace_msg(TRACE_LEVEL_DEBUG, "Progress bar maxed out!!")
+            if (updateStr == ""):
+                stringToSend = self.progMessage
+            else:
+                stringToSend = updateStr
+                self.progMessage = updateStr
+            self.callbackClass.update_progress(str(stringToSend), newProgPercent)
+            self.update_prog_percentage(newProgPercent)
+
+    def _trace_msg(self,level,msgStr):
+        if (self.callbackClass != ''):
+            if (level >= self.trace_level):
+                if (level == TRACE_LEVEL_DEBUG):
+                    level=FLASHPYTHON_DEBUG_LEVEL
+                self.callbackClass.push_message(str(msgStr), level)
+        else:
+            if (level >= self.trace_level):
+               print ("%s"%(msgStr))
+
+    def _report_retry(self, operation, attempt):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "Retrying %s (attempt %d)"%(operation, attempt))
+        if (self.callbackClass != '') and hasattr(self.callbackClass, "report_retry"):
+            self.callbackClass.report_retry(operation, attempt)
+
+    def _record_opcode_time(self, data, elapsed):
+        name = OpcodeNames.get(data[0], hex(data[0]))
+        stats = self.opcodeStats.get(name)
+        if (stats is None):
+            self.opcodeStats[name] = [1, elapsed, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            if (elapsed < stats[2]):
+                stats[2] = elapsed
+            if (elapsed > stats[3]):
+                stats[3] = elapsed
+
+    def _trace_span(self, name, started, **args):
+        if (self.tracer is not None):
+            self.tracer.add_span(name, self.com_port, started, time.perf_counter() - started, args)
+
+    def _checkForCancel(self):
+        if (self.callbackClass != ''):
+            status = self.callbackClass.check_is_cancel_set()
+            self.cancelRequested = True
+        else:
+            status = False
+        return status
+
+    def _comm_open(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"--> Entering _comm_open method")
+        if(self._is_connected()):
+            self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Exiting _comm_open method")
+            return True
+        if (self.commFactory is not None):
+            self.comm = self.commFactory(port=self.com_port, baudrate=self.baudrate, timeout=10)
+            if (self.resetSequence is not None):
+                self.resetSequence.apply_idle(self.comm)
+        elif (self.stubOut is False):
+            import serial
+            try:
+                if (self.resetSequence is not None):
+                    # Idle DTR/RTS levels must be set before open or the board resets
+                    self.comm = self.resetSequence.open_serial(self.com_port, self.baudrate, 10)
+                else:
+                    self.comm = serial.Serial(port=self.com_port, baudrate=self.baudrate, timeout=10)
+            except serial.SerialException:
+                self._trace_msg(TRACE_LEVEL_ERROR, "Serial port %s"%(self.com_port) + " specified does not exist, is already open, or permission is denied!!")
+                self._trace_msg(TRACE_LEVEL_ERROR, "!! Aborting operation!!")
+                self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Exiting _comm_open method")
+                return False
+        else:
+            self.comm = serial_stub.SerialStub(port=self.com_port, baudrate=self.baudrate, timeout=6)
+        if self.comm.isOpen():
+            self.comm.flushInput()
+            self.connected = True
+            self._trace_msg(TRACE_LEVEL_DEBUG,"COM port opened.")
+            self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Exiting _comm_open method")
+            return True
+        else:
+            self._trace_msg(TRACE_LEVEL_ERROR,"!!! Error opening the COM port!!!")
+            self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Exiting _comm_open method")
+            return False
+
+    def _comm_close(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"--> Entering _comm_close method")
+        if(self._is_connected()):
+            self.comm.close()
+            self.connected = False
+            self._trace_msg(TRACE_LEVEL_DEBUG, "COM port closed.")
+            self.comm = None
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Exiting _comm_close method")
+
+    def _is_connected(self):
+        return self.connected
+
+    def _send_packet(self,data,checksum=None):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "-----> Send packet")
+        if (checksum is None):
+            checksum = _checksum(data)
+        msgSize = len(data)+2
+        # SYNC, size and checksum go out in one write; the payload stays a
+        # separate write so SerialStub still sees the opcode on its own
+        self.comm.write(AWR_BOOTLDR_SYNC_PATTERN + struct.pack(">HB",msgSize,checksum))
+        self.comm.write(data)
+        self._trace_msg(TRACE_LEVEL_DEBUG, "<----- Send packet")
+
+    def _receive_packet(self, Length):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "----->Receive packet")
+        Header = self.comm.read(3)
+        PacketLength , CheckSum  = struct.unpack(">HB", Header)
+        PacketLength -= 2
+        if (Length != PacketLength):
+            self._trace_msg(TRACE_LEVEL_DEBUG, "Requested length={:d}, actual={:d}".format(Length, PacketLength))
+            self._trace_msg(TRACE_LEVEL_FATAL, "Error, Mismatch between requested and actual packet length: act {:d}, req {:d}".format(PacketLength, Length))
+        Payload = self.comm.read(PacketLength)
+        if (len(Payload) != Length):
+            self._trace_msg(TRACE_LEVEL_FATAL, "Error, time-out while receiving packet's payload")
+        self.comm.write(AWR_BOOTLDR_OPCODE_ACK)
+        CalculatedCheckSum = _checksum(Payload)
+        if (CalculatedCheckSum != CheckSum):
+            self._trace_msg(TRACE_LEVEL_ERROR, "Calculated: 0x{:x}.  Received: 0x{:x}".format(CalculatedCheckSum, CheckSum))
+            self._trace_msg(TRACE_LEVEL_FATAL, "Checksum error on received packet")
+        else:
+            self._trace_msg(TRACE_LEVEL_DEBUG, "Calculated and Received CheckSum: 0x{:x}.".format(CalculatedCheckSum))
+        self._trace_msg(TRACE_LEVEL_DEBUG, "<----- Receive packet")
+        return Payload
+
+    def _read_ack(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "-----> Waiting for ACK message from device.")
+        length = ''
+        while (length == ''):
+            length = self.comm.read(2)
+        chksum = self.comm.read(1)
+        self.comm.read(1)
+        a = self.comm.read(1)
+        status = False
+        while (not ((a == AWR_BOOTLDR_OPCODE_ACK) or (a == AWR_BOOTLDR_OPCODE_NACK))):
+            a = self.comm.read(1)
+        self._trace_msg(TRACE_LEVEL_DEBUG,"Checking message from device:")
+        if (a == AWR_BOOTLDR_OPCODE_ACK):
+            self._trace_msg(TRACE_LEVEL_DEBUG,"*** Received ACK ***")
+            status = True
+        elif (a == AWR_BOOTLDR_OPCODE_NACK):
+            self._trace_msg(TRACE_LEVEL_DEBUG,"*** Received NACK ***")
+            status = False
+        else:
+            self._trace_msg(TRACE_LEVEL_ERROR,"XXXX Received unexpected data!!!XXXX")
+            status = False
+        self._trace_msg(TRACE_LEVEL_DEBUG, "<----- Done waiting for ACK message from device.")
+        return status
+
+    def _read_ack_with_cancel_check(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "-----> Waiting for ACK message from device - w/ cancel check.")
+        length = ''
+        outerCount = 0
+        c = False
+        while ((c is False) and (outerCount < 10)):
+            innerCount = 0
+            while ((length == '') and (innerCount < 2)):
+                if (outerCount > 0 or innerCount > 0):
+                    self._report_retry("connect", outerCount*2 + innerCount)
+                length = self.comm.read(2)
+                innerCount += 1
+            c = self._checkForCancel()
+            if (length != ''):
+                break
+            outerCount += 1
+        if (c is True):
+            self._trace_msg(TRACE_LEVEL_INFO, AWR_CANCEL_MSG)
+            status = False
+        elif (length == ''):
+            self._trace_msg(TRACE_LEVEL_ERROR, "Initial response from the device was not received. Please power cycle device before re-flashing.")
+            status = False
+        else:
+            chksum = self.comm.read(1)
+            self.comm.read(1)
+            a = self.comm.read(1)
+            readCount = 0
+            while not ((a == AWR_BOOTLDR_OPCODE_ACK) or (a == AWR_BOOTLDR_OPCODE_NACK)) and readCount < 10:
+                a = self.comm.read(1)
+                readCount += 1
+            self._trace_msg(TRACE_LEVEL_DEBUG,"Checking message from device:")
+            if (a == AWR_BOOTLDR_OPCODE_ACK):
+                self._trace_msg(TRACE_LEVEL_DEBUG,"*** Received ACK ***")
+                status = True
+            elif (a == AWR_BOOTLDR_OPCODE_NACK):
+                self._trace_msg(TRACE_LEVEL_DEBUG,"*** Received NACK ***")
+                status = False
+            else:
+                self._trace_msg(TRACE_LEVEL_ERROR,"XXXX Received unexpected data!!!XXXX")
+                status = False
+        self._trace_msg(TRACE_LEVEL_DEBUG, "<----- Done waiting for ACK message from device w/ cancel check.")
+        return status
+
+    def _send_command(self,data,checksum=None):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"--->Send command")
+        started = time.perf_counter()
+        self._send_packet(data,checksum)
+        ackStatus = self._read_ack()
+        self._send_packet(AWR_BOOTLDR_OPCODE_GET_LAST_STATUS)
+        retStatus = self._receive_packet(self.cmdStatusSize)
+        self._record_opcode_time(data, time.perf_counter() - started)
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<--- Send command")
+        return ackStatus
+
+    def _send_start_download(self,file_id,file_size,max_size,mirror_enabled,storage):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"->Send start download command")
+        data = AWR_BOOTLDR_OPCODE_START_DOWNLOAD + \
+            struct.pack(">I",file_size) + Storages[storage] + \
+            Files[file_id] + struct.pack(">I",mirror_enabled)
+        self._send_command(data)
+        return True
+
+    def _send_file_close(self,file_id):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"-->Send file close command")
+        data = AWR_BOOTLDR_OPCODE_FILE_CLOSE + \
+            Files[file_id]
+        self._send_command(data)
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-- Send file close command")
+        return True
+
+    def _send_chunk(self,buff,bufflen,chunkSum=None):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"--> Send chunk")
+        data = AWR_BOOTLDR_OPCODE_SEND_DATA + buff
+        return self._send_command(data,_packet_checksum(AWR_BOOTLDR_OPCODE_SEND_DATA,chunkSum))
+
+    def _send_chunkRAM(self,buff,bufflen,chunkSum=None):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"--> Send chunkRAM")
+        data = AWR_BOOTLDR_OPCODE_SEND_DATA_RAM + buff
+        return self._send_command(data,_packet_checksum(AWR_BOOTLDR_OPCODE_SEND_DATA_RAM,chunkSum))
+
+    def _getFileHeaderList(self):
+        if (self.PG3OrLater is True):
+            PGkey = AWR_POST_PG3_KEY
+        else:
+            PGkey = AWR_PRE_PG3_KEY
+        return FileHeaders[PGkey][self.partNum[1:5]]["headers"]
+
+    def _getFileTypeList(self):
+        if (self.PG3OrLater is True):
+            PGkey = AWR_POST_PG3_KEY
+        else:
+            PGkey = AWR_PRE_PG3_KEY
+        return FileHeaders[PGkey][self.partNum[1:5]]["fileType"]
+
+    # ******************* APIs *******************
+
+    def connect_with_reset(self, timeout, com_port, reset_command):
+        passed = True
+        self._trace_msg(TRACE_LEVEL_DEBUG,"->Entering connect_with_reset method")
+        self._trace_msg(TRACE_LEVEL_ACTIVITY,"Reset connection to device")
+        trace_level = self.trace_level
+        self.__init__(self.callbackClass, com_port, trace_level, self.tracer, self.commFactory,
+                      self.resetSequence)
+        if (self._comm_open()):
+            self._update_prog_msg("Opening COM port %s..."%(self.com_port), 1)
+            self.comm.timeout = timeout
+            started = time.perf_counter()
+            if (self.resetSequence is not None):
+                self._trace_msg(TRACE_LEVEL_INFO,"Reset into bootloader via %s"%(self.resetSequence.reset_line.upper()))
+                acked = self.resetSequence.enter_bootloader(self.comm, self._report_retry)
+                self._trace_span("reset_ready", started, attempts=self.resetSequence.attempts, ok=acked)
+                if (acked is False):
+                    self._trace_msg(TRACE_LEVEL_ERROR,"Bootloader did not answer within %.1f s after reset; check the DTR/RTS wiring and polarity."%(self.resetSequence.ready_timeout))
+            else:
+                self._trace_msg(TRACE_LEVEL_INFO,"Set break signal")
+                if (sys.version_info[0] >= 2):
+                    self.comm.break_condition = True
+                else:
+                    self.comm.setBreak(True)
+                time.sleep(0.100)
+                if (reset_command != ""):
+                    import subprocess
+                    subprocess.call(reset_command)
+                acked = self._read_ack_with_cancel_check()
+            if (acked):
+                self._trace_msg(TRACE_LEVEL_ACTIVITY,"Connection to COM port succeeded. Flashing can proceed.")
+                self._update_prog_msg("Connected to COM port.", 1)
+                if (sys.version_info[0] >= 2):
+                    self.comm.break_condition = False
+                else:
+                    self.comm.setBreak(False)
+                passed = True
+            else:
+                if (self.cancelRequested is False):
+                    self._trace_msg(TRACE_LEVEL_ERROR,"Failure: Recheck that correct COM port was provided or power cycle the device.")
+                passed = False
+            self._trace_span("break_ack", started, ok=passed)
+            self._comm_close()
+            self._trace_msg(TRACE_LEVEL_DEBUG,"Exit bootldr connect")
+        else:
+            passed = False
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<- Exiting connect_with_reset method")
+        return passed
+
+    def resetToApplication(self):
+        """Reset the board with SOP in functional mode (needs a reset sequence)"""
+        if (self.resetSequence is None):
+            return False
+        if (self._comm_open()):
+            self.resetSequence.enter_application(self.comm)
+            self._comm_close()
+            self._trace_msg(TRACE_LEVEL_INFO,"Device reset into application")
+            return True
+        return False
+
+    def skip_connect(self):
+        self.connected = True
+
+    def connect(self, timeout, com_port):
+        self._trace_msg(TRACE_LEVEL_ACTIVITY,"Connecting to COM Port %s"%(com_port) + "...")
+        return self.connect_with_reset(timeout, com_port, "")
+
+    def disconnect(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"-> Entering disconnect method")
+        self._trace_msg(TRACE_LEVEL_ACTIVITY,"Disconnecting from device on COM port %s"%(self.com_port) + "...")
+        self._update_prog_msg("Disconnecting from device on COM port %s ..."%(self.com_port), 1)
+        self._comm_close()
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<- Exit disconnect method")
+
+    def GetVersion(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG,"-> Entering GetVersion method")
+        self._trace_msg(TRACE_LEVEL_ACTIVITY,"Reading device version info...")
+        if (self._comm_open()):
+            serial_stub.GETVERSION_CALLED = True
+            self._trace_msg(TRACE_LEVEL_DEBUG, "Connected to device to get version")
+            data = AWR_BOOTLDR_OPCODE_GET_VERSION_INFO
+            started = time.perf_counter()
+            self._send_packet(data)
+            self._trace_msg(TRACE_LEVEL_DEBUG, "GET_VERSION code send packet completed.")
+            Status = self._read_ack()
+            self._record_opcode_time(data, time.perf_counter() - started)
+            self._trace_msg(TRACE_LEVEL_DEBUG, "Response from device obtained.")
+            RetValue = ""
+            try:
+                if (Status is False):
+                    self._trace_msg(TRACE_LEVEL_DEBUG, "!!! Version read was not successful !!!")
+                    return RetValue
+                Length = struct.unpack(">H", self.comm.read(2))[0]
+                crcRead = self.comm.read(1)
+                checkSum = struct.unpack("B",crcRead)[0]
+                Length -= 2
+                versionRead = self.comm.read(Length)
+                calculatedCheckSum = _checksum(versionRead)
+                if (calculatedCheckSum != checkSum):
+                    self._trace_msg(TRACE_LEVEL_ERROR, "Version checksum Calculated: 0x{:x}.  Received: 0x{:x}".format(calculatedCheckSum, checkSum))
+                    self._trace_msg(TRACE_LEVEL_FATAL, "Checksum error on received packet")
+                    return RetValue
+                else:
+                    self._trace_msg(TRACE_LEVEL_DEBUG, "Version Calculated and Received CheckSum: 0x{:x}.".format(calculatedCheckSum))
+                self.versionRecord = versionRead
+                import binascii
+                versionData = binascii.b2a_hex(versionRead)
+                self.comm.write(AWR_BOOTLDR_OPCODE_ACK)
+                convertVersion = versionData[0:8]
+                self._trace_msg(TRACE_LEVEL_DEBUG, str("Truncated Version Info = %s"%(convertVersion)))
+                serial_stub.GETVERSION_CALLED = False
+                RetValue = convertVersion
+            except:
+                pass
+            finally:
+                self._comm_close()
+                self._trace_msg(TRACE_LEVEL_DEBUG, "Closing connection to device")
+        else:
+            self._trace_msg(TRACE_LEVEL_ERROR,"Cannot open serial port. Try again.")
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<- Exit GetVersion method")
+        return RetValue
+
+    def download_file(self,filename,file_id,mirror_enabled,max_size,storage, imageProgList, chunkSums=None):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "->Entering download_file method")
+        fSize = _image_size(filename)
+        result = True
+        # Precomputed per-chunk sum8 (image manifest) only if made for this chunk size
+        if (chunkSums is not None) and (len(chunkSums) != -(-fSize // self.chunksize)):
+            chunkSums = None
+        if (storage == "SRAM"):
+            self.cmdStatusSize = 4
+        else:
+            self.cmdStatusSize = 1
+        self._trace_msg(TRACE_LEVEL_ACTIVITY,"Downloading [%s] size [%d]"%(file_id,fSize))
+        if (fSize>0) and (fSize < MAX_FILE_SIZE):
+            if (max_size < fSize):
+                max_size = fSize
+            try:
+                fSrc = _image_open(filename)
+            except (IOError, KeyError):
+                self._trace_msg(TRACE_LEVEL_FATAL, "Unable to open the file. Please double-check the name and path")
+                return False
+            if (self._comm_open()):
+                self._update_prog_msg("Downloading [%s] size [%d]..."%(file_id,fSize),1)
+                started = time.perf_counter()
+                startStatus = self._send_start_download(file_id,fSize,max_size,mirror_enabled,storage)
+                self._trace_span("START_DOWNLOAD", started, file_id=file_id, size=fSize)
+                if (startStatus):
+                    started = time.perf_counter()
+                    offset = 0
+                    spacingCnt = 0
+                    spacingCntLimit = imageProgList[0]
+                    percentIncr = imageProgList[1]
+                    chunkIndex = 0
+                    while (offset < fSize):
+                        buff = fSrc.read(self.chunksize)
+                        bufflen = len(buff)
+                        chunkSum = None if chunkSums is None else chunkSums[chunkIndex]
+                        chunkIndex += 1
+                        if (storage == "SRAM"):
+                            sendStatus = self._send_chunkRAM(buff,bufflen,chunkSum)
+                            if (sendStatus == False):
+                                result = False
+                                break
+                        else:
+                            sendStatus = self._send_chunk(buff,bufflen,chunkSum)
+                            if (sendStatus == False):
+                                result = False
+                                break
+                        spacingCnt += 1
+                        if (spacingCnt == spacingCntLimit):
+                            spacingCnt = 0
+                            self._update_prog_msg("", percentIncr)
+                        offset += bufflen
+                        c = self._checkForCancel()
+                        if (c is True):
+                            self._trace_msg(TRACE_LEVEL_INFO, AWR_CANCEL_MSG)
+                            result = False
+                            break
+                    self._trace_span("chunk_stream", started, file_id=file_id, bytes=offset)
+                started = time.perf_counter()
+                self._send_file_close(file_id);
+                self._trace_span("FILE_CLOSE", started, file_id=file_id)
+                self._comm_close()
+            else:
+                self._trace_msg(TRACE_LEVEL_ERROR,"Failure while trying to connect...")
+                result = False
+            fSrc.close()
+        else:
+            self._trace_msg(TRACE_LEVEL_ERROR,"Invalid file size")
+            result = False
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit download_file method")
+        return result
+
+    def erase_storage(self,storage="SFLASH",location_offset=0,capacity=0):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "->Entering erase_storage method")
+        self._trace_msg(TRACE_LEVEL_ACTIVITY, str("-->Erasing storage [%s]" %(storage)))
+        if (self._comm_open()):
+            data = AWR_BOOTLDR_OPCODE_ERASE + Storages[storage] + \
+                struct.pack(">I",location_offset) + struct.pack(">I",capacity)
+            self._update_prog_msg("Sending Erase command to device...", 1)
+            self._trace_msg(TRACE_LEVEL_ACTIVITY,"-->Sending Erase command to device...")
+            started = time.perf_counter()
+            self._send_packet(data)
+            self._trace_msg(TRACE_LEVEL_DEBUG,"Erase command sent to device.")
+            ackStatus = self._read_ack()
+            self._record_opcode_time(data, time.perf_counter() - started)
+            self._trace_span("ERASE", started, storage=storage, ok=ackStatus)
+            if (ackStatus):
+                self._trace_msg(TRACE_LEVEL_DEBUG,"Erase storage ACK received.")
+                self._trace_msg(TRACE_LEVEL_INFO,"-->Erase storage completed successfully!")
+            else:
+                self._trace_msg(TRACE_LEVEL_DEBUG,"Erase storage ACK not received.")
+                self._trace_msg(TRACE_LEVEL_ERROR,"Erase storage did not complete. Reset device and try again")
+        self._update_prog_msg("", 1)
+        self._comm_close()
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exiting erase_storage method")
+
+    def checkFileHeader(self, fileName, fileInfo):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "->Entering checkFileHeader method")
+        self._trace_msg(TRACE_LEVEL_INFO, "Checking file %s for correct header for %s."%(fileName,self.partNum))
+        # One stat for existence and size; the identity keys the header cache
+        identity = image_identity(fileName)
+        fileExists = hasattr(fileName, "open") or (identity is not None)
+        checkResult = True
+        if (fileExists == True):
+            fSize = _image_size(fileName) if hasattr(fileName, "open") else identity[2]
+            if (fSize < FILE_HEADERSIZE):
+                self._trace_msg(TRACE_LEVEL_ERROR, "File %s is too small: size = %d"%(fileName,fSize) + "!")
+                checkResult = False
+            else:
+                header = HEADER_CACHE.lookup(identity)
+                if (header is None):
+                    try:
+                        # Only the first FILE_HEADERSIZE bytes are read
+                        fSrc = _image_open(fileName)
+                    except (IOError, KeyError):
+                        self._trace_msg(TRACE_LEVEL_FATAL, "Unable to open the file. Please double-check the name and path")
+                        checkResult=False
+                    if (checkResult == True):
+                        rawHeader = fSrc.read(FILE_HEADERSIZE)
+                        fSrc.close()
+                        if (sys.byteorder == 'little'):
+                            header = struct.unpack("<L",rawHeader)[0]
+                        else:
+                            header = struct.unpack(">L",rawHeader)[0]
+                        HEADER_CACHE.store(identity, header)
+                if (checkResult == True):
+                    self._update_prog_msg("Checking fileType appropriateness for this device...", 2)
+                    maskedHeader = header & 0xFFF00000
+                    PGkey = AWR_POST_PG3_KEY if (self.PG3OrLater is True) else AWR_PRE_PG3_KEY
+                    headerIndex = HEADER_INDEX[PGkey][self.partNum[1:5]]
+                    maskedIndex = MASKED_HEADER_INDEX[PGkey][self.partNum[1:5]]
+                    fileTypeList = self._getFileTypeList()
+                    if (header in headerIndex):
+                        if ((self.partNum[1:5]==xWR16xx_PART_NUM) or (self.isDevicePG3OrLater())):
+                            if (fileInfo.order <= 0 or fileInfo.order > 4):
+                                checkResult = False
+                                self._trace_msg(TRACE_LEVEL_ERROR, "Internal Error: File Order number value %d is not in valid range (1-4)"%(fileInfo.order))
+                                self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit checkFileHeader method prematurely!!")
+                                return checkResult
+                            fileTypeIndex = fileInfo.order-1
+                        else:
+                            fileTypeIndex = headerIndex[header]
+                        self._trace_msg(TRACE_LEVEL_INFO, "%s device, fileType=%s detected -> OK" %(self.partNum,fileTypeList[fileTypeIndex]))
+                        fileInfo.file_id = fileTypeList[fileTypeIndex]
+                        fileInfo.fileSize = fSize
+                        checkResult = True
+                        self._update_prog_msg("", 1)
+                    elif ((self.partNum[0:5] in OlderFileFormatParts) and (maskedHeader in maskedIndex)):
+                        fileTypeIndex = maskedIndex[maskedHeader]
+                        self._trace_msg(TRACE_LEVEL_INFO, "%s device, fileType=%s detected -> OK"%(self.partNum,fileTypeList[fileTypeIndex]))
+                        fileInfo.file_id = fileTypeList[fileTypeIndex]
+                        fileInfo.fileSize = fSize
+                        checkResult = True
+                        self._update_prog_msg("", 1)
+                    else:
+                        self._trace_msg(TRACE_LEVEL_WARNING, "Header of %s file indicates it is not a valid file to flash to %s: "%(fileName,self.partNum) + hex(header))
+                        checkResult = False
+        else:
+            self._trace_msg(TRACE_LEVEL_ERROR, "File %s does not exist!"%(fileName))
+            checkResult = False
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit checkFileHeader method")
+        return checkResult
+
+    def calcProgressValues(self, images, fileSizeSum, formatOnDownload):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "->Entering calcProgressValues method")
+        indicatorRange = UNIFLASH_PROG_INDICATOR_RANGE
+        if (formatOnDownload == True):
+            indicatorRange = UNIFLASH_PROG_INDICATOR_RANGE - ERASE_PROG_VALUE
+        for i in images:
+            range = (i.fileSize*indicatorRange)/fileSizeSum
+            numChunksToSend = i.fileSize/DEFAULT_CHUNK_SIZE
+            if (numChunksToSend < 1):
+                numChunksToSend = 1
+            if (range < 1):
+                range = 1
+            if (numChunksToSend > range):
+                spacingCnt =  int(numChunksToSend/range)
+                percentIncr = 1
+            else:
+                spacingCnt = 1
+                percentIncr = int(range/numChunksToSend)
+            self.imageProgCntList[i] = [spacingCnt, percentIncr]
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit calcProgressValues method")
+
+    def getImageProgCntList(self, image):
+        return self.imageProgCntList[image]
+
+    def getHeaderCacheStats(self):
+        return HEADER_CACHE.stats()
+
+    def getOpcodeStats(self):
+        summary = {}
+        for name, stats in self.opcodeStats.items():
+            summary[name] = {"count" : stats[0],
+                             "total_s" : round(stats[1], 6),
+                             "min_s" : round(stats[2], 6),
+                             "max_s" : round(stats[3], 6),
+                             "avg_s" : round(stats[1]/stats[0], 6)}
+        return summary
+
+    def isPartNumSupported(self, partNum):
+        return partNum[0:5] in PartNumSupported
+
+    def get_prog_percentage(self):
+        return self.progPercentage
+
+    def update_prog_percentage(self, percentage):
+        self.progPercentage = percentage
+
+    def checkPropertiesMapKeys(self, propMap):
+        keysPresent = True
+        if (COMPORT_KEY not in propMap):
+            value = COMPORT_KEY
+            keysPresent = False
+        elif (MEMSELECT_KEY not in propMap):
+            value = MEMSELECT_KEY
+            keysPresent = False
+        elif (PARTNUM_KEY not in propMap):
+            value = PARTNUM_KEY
+            keysPresent = False
+        elif (DOWNLOADFORMAT_KEY not in propMap):
+            value = DOWNLOADFORMAT_KEY
+            keysPresent = False
+
+        if (keysPresent is False):
+            self._trace_msg(TRACE_LEVEL_FATAL, "Integration Error: \'%s\' key is not present in propertiesMap"%(value))
+        return (keysPresent)
+
+    def determinePGVersion(self):
+        self._trace_msg(TRACE_LEVEL_DEBUG, "->Entering determinePGVersion method")
+        serial_stub.PARTNUM=self.partNum
+        started = time.perf_counter()
+        versionRead = self.GetVersion()
+        self.versionInfo = versionRead
+        self._trace_span("determinePGVersion", started, ok=(versionRead != ""))
+        if (versionRead == ""):
+            self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit determinePGVersion method, failure")
+            return False
+        # Parsed from the full record; the hex string above is bytes on Python 3
+        # and never matched BootloaderVerPrePG3
+        self.deviceInfo = DeviceInfo(self.versionRecord, self.com_port,
+                                     probe_s=time.perf_counter() - started)
+        self.PG3OrLater = self.deviceInfo.pg3
+        self._trace_msg(TRACE_LEVEL_DEBUG,"<-Exit determinePGVersion method")
+        return True
+
+    def setDeviceInfo(self, info):
+        """Use a previously read version record instead of a GET_VERSION round trip"""
+        self.deviceInfo = info
+        self.versionRecord = info.record
+        self.versionInfo = info.rom_version.encode()
+        self.PG3OrLater = info.pg3
+
+    def isDevicePG3OrLater(self):
+        return self.PG3OrLater
+
+    def copyImagesList(self, images):
+        filesList = []
+        for i in images:
+            fileObj = FilesObject(i.path, i.order)
+            filesList.append(fileObj)
+        return filesList
+
+    def addAutomaticDownload(self, filesList, path):
+        if (self.PG3OrLater is False):
+            if (self.partNum[0:5] in CONFIGFileParts):
+                numFiles = len(filesList)
+                newAddition = FilesObject(path, numFiles)
+                filesList.append(newAddition)
+                self._trace_msg(TRACE_LEVEL_INFO, "note: CONFIG file is added to list of files for download to the device.")
+        return
+
+    def setPartNum(self, partNum):
+        self.partNum = partNum
@@ -0,0 +1,112 @@
+"""
+Firmware bundles: zip/tar archives with several images plus metadata
+
+Member images are streamed straight from the archive into BootLdr (header
+check and chunk pipeline); nothing is extracted to disk. An optional
+manifest.json ({"images": ["a.bin", ...]}) sets the download order,
+otherwise every .bin member is used in archive order.
+"""
+
+import os
+
+BUNDLE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+BUNDLE_MANIFEST = "manifest.json"
+IMAGE_SUFFIX = ".bin"
+
+def is_bundle(path):
+    return isinstance(path, str) and path.lower().endswith(BUNDLE_SUFFIXES)
+
+class _MemberReader:
+    """File-like reader for one member that also closes its archive"""
+
+    def __init__(self, archive, stream):
+        self.archive = archive
+        self.stream = stream
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+    def close(self):
+        self.stream.close()
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class BundleMember:
+    """One image inside a bundle; BootLdr accepts it wherever it takes a file name"""
+
+    def __init__(self, bundle_path, name, size, tar_info=None):
+        self.bundle_path = bundle_path
+        self.name = name
+        self.size = size
+        # TarInfo from open_bundle: its data offset spares the member scan on every open
+        self.tar_info = tar_info
+
+    def open(self):
+        """Binary reader streaming the member from the archive"""
+        if self.bundle_path.lower().endswith(".zip"):
+            import zipfile
+            archive = zipfile.ZipFile(self.bundle_path)
+            return _MemberReader(archive, archive.open(self.name))
+        import tarfile
+        archive = tarfile.open(self.bundle_path, "r:*")
+        return _MemberReader(archive, archive.extractfile(self.tar_info or self.name))
+
+    def cache_key(self):
+        stat = os.stat(self.bundle_path)
+        return (os.path.abspath(self.bundle_path), self.name, stat.st_size, stat.st_mtime_ns)
+
+    def __str__(self):
+        return f"{self.bundle_path}:{self.name}"
+
+def _read_manifest(data, names):
+    import json
+    order = json.loads(data).get("images", [])
+    missing = [name for name in order if name not in names]
+    if missing:
+        raise ValueError(f"manifest lists images missing from the bundle: {', '.join(missing)}")
+    return order
+
+def open_bundle(path):
+    """List the images of a bundle as BundleMembers in download order"""
+    sizes = {}
+    tar_infos = {}
+    manifest = None
+    if path.lower().endswith(".zip"):
+        import zipfile
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    sizes[info.filename] = info.file_size
+            if BUNDLE_MANIFEST in sizes:
+                manifest = archive.read(BUNDLE_MANIFEST)
+    else:
+        import tarfile
+        with tarfile.open(path, "r:*") as archive:
+            for info in archive.getmembers():
+                if info.isfile():
+                    sizes[info.name] = info.size
+                    tar_infos[info.name] = info
+            if BUNDLE_MANIFEST in sizes:
+                manifest = archive.extractfile(BUNDLE_MANIFEST).read()
+    if manifest is not None:
+        names = _read_manifest(manifest, sizes)
+    else:
+        names = [name for name in sizes if name.lower().endswith(IMAGE_SUFFIX)]
+    if not names:
+        raise ValueError(f"no {IMAGE_SUFFIX} images in bundle {path}")
+    return [BundleMember(path, name, sizes[name], tar_infos.get(name)) for name in names]
+
+def expand_images(paths):
+    """Replace each bundle in an image list with its member images"""
+    images = []
+    for path in paths:
+        if is_bundle(path):
+            images.extend(open_bundle(path))
+        else:
+            images.append(path)
+    return images
@@ -0,0 +1,261 @@
+"""
+Local firmware catalog: every known image indexed by content hash
+
+The index (JSON, like the other caches in user_files/settings) stores size,
+header, the file type per part family, mtime, source URL and last-flashed
+stats. Re-indexing only hashes files whose size or mtime changed, and
+selecting an image by name, hash or part never touches the image files.
+"""
+
+import os
+import sys
+import time
+import struct
+
+from .constants import FileHeaders, OlderFileFormatParts, FILE_HEADERSIZE
+from .headers import HEADER_INDEX, MASKED_HEADER_INDEX
+
+CATALOG_FILE = "user_files/settings/firmware_catalog.json"
+CATALOG_DIRS = ["user_files/images", "firmware"]
+CATALOG_SUFFIX = ".bin"
+HASH_BLOCK_SIZE = 65536
+
+def detect_file_types(header):
+    """File type per PG key and part family, decided like BootLdr.checkFileHeader
+
+    META images get their META_IMAGE1..4 slot from the download order, so
+    they are listed as META_IMAGE.
+    """
+    found = {}
+    masked = header & 0xFFF00000
+    for pg_key, families in HEADER_INDEX.items():
+        for family, index in families.items():
+            file_types = FileHeaders[pg_key][family]["fileType"]
+            if header in index:
+                file_type = file_types[index[header]]
+            elif any(part[1:5] == family for part in OlderFileFormatParts) and \
+                    masked in MASKED_HEADER_INDEX[pg_key][family]:
+                file_type = file_types[MASKED_HEADER_INDEX[pg_key][family][masked]]
+            else:
+                continue
+            if file_type.startswith("META_IMAGE"):
+                file_type = "META_IMAGE"
+            found.setdefault(pg_key, {})[family] = file_type
+    return found
+
+def parse_header(raw):
+    if len(raw) < FILE_HEADERSIZE:
+        return None
+    # Same byte order BootLdr.checkFileHeader uses
+    return struct.unpack("<L" if sys.byteorder == "little" else ">L", raw[:FILE_HEADERSIZE])[0]
+
+def read_header(path):
+    with open(path, "rb") as f:
+        return parse_header(f.read(FILE_HEADERSIZE))
+
+def hash_file(path):
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _family(part):
+    """'IWR68' / 'WR68' -> 'WR68' (the FileHeaders key)"""
+    return part[1:5] if len(part) == 5 else part
+
+class FirmwareCatalog:
+    """Images by SHA-256 plus a path index for incremental re-indexing"""
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = path
+        self.images = None
+        self.files = None
+
+    def _load(self):
+        if self.images is not None:
+            return
+        self.images, self.files = {}, {}
+        import json
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.images = data.get("images", {})
+        self.files = data.get("files", {})
+
+    def save(self):
+        import json
+        self._load()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"images": self.images, "files": self.files}, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def add(self, path, source_url=None, stat=None, sha256=None, head=None):
+        """Hash one file and (re)register it; returns its entry
+
+        sha256 and head (the first bytes) skip reading the file when the
+        caller already has them, e.g. from the download stream.
+        """
+        self._load()
+        path = os.path.abspath(path)
+        stat = stat or os.stat(path)
+        sha256 = sha256 or hash_file(path)
+        header = read_header(path) if head is None else parse_header(head)
+        old = self.files.get(path)
+        if old is not None and old["sha256"] != sha256:
+            self._forget_path(path)
+        entry = self.images.setdefault(sha256, {
+            "sha256": sha256, "size": stat.st_size, "paths": [], "source_url": None,
+            "flashed": {"count": 0, "last_at": None, "last_port": None, "last_duration_s": None}})
+        entry["name"] = os.path.basename(path)
+        entry["header"] = None if header is None else f"0x{header:08X}"
+        entry["file_types"] = {} if header is None else detect_file_types(header)
+        entry["mtime"] = stat.st_mtime
+        entry["indexed_at"] = time.time()
+        if source_url:
+            entry["source_url"] = source_url
+        entry["paths"] = [path] + [p for p in entry["paths"] if p != path]
+        self.files[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return entry
+
+    def _forget_path(self, path):
+        old = self.files.pop(path, None)
+        if old is None or old["sha256"] not in self.images:
+            return
+        entry = self.images[old["sha256"]]
+        entry["paths"] = [p for p in entry["paths"] if p != path]
+        if not entry["paths"] and not entry.get("source_url"):
+            del self.images[old["sha256"]]
+
+    def index(self, directories=CATALOG_DIRS):
+        """Incremental re-index: only new or changed files are hashed"""
+        self._load()
+        stats = {"files": 0, "hashed": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        for directory in directories:
+            for root, _dirs, names in os.walk(directory):
+                for name in sorted(names):
+                    if not name.lower().endswith(CATALOG_SUFFIX):
+                        continue
+                    path = os.path.abspath(os.path.join(root, name))
+                    seen.add(path)
+                    stats["files"] += 1
+                    stat = os.stat(path)
+                    known = self.files.get(path)
+                    if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                        stats["unchanged"] += 1
+                        continue
+                    self.add(path, stat=stat)
+                    stats["hashed"] += 1
+        roots = [os.path.abspath(d) + os.sep for d in directories]
+        for path in list(self.files):
+            if path not in seen and any(path.startswith(root) for root in roots):
+                self._forget_path(path)
+                stats["removed"] += 1
+        return stats
+
+    def select(self, query=None, part=None):
+        """Entries matching a name (substring or glob), a hash prefix and/or a part"""
+        import fnmatch
+        self._load()
+        matches = []
+        for entry in self.images.values():
+            if part and not any(_family(part) in types for types in entry["file_types"].values()):
+                continue
+            if query:
+                lowered = query.lower()
+                by_hash = len(lowered) >= 8 and entry["sha256"].startswith(lowered)
+                names = [entry.get("name", "")] + [os.path.basename(p) for p in entry["paths"]]
+                if any(c in query for c in "*?["):
+                    by_name = any(fnmatch.fnmatch(n.lower(), lowered) for n in names)
+                else:
+                    by_name = any(lowered in n.lower() for n in names)
+                if not (by_hash or by_name):
+                    continue
+            matches.append(entry)
+        return sorted(matches, key=lambda e: e.get("name", ""))
+
+    def resolve(self, query, part=None):
+        """Path of the one image matching query (ValueError otherwise)"""
+        matches = self.select(query, part)
+        if len(matches) != 1:
+            listed = ", ".join(f"{e['name']} ({e['sha256'][:12]})" for e in matches) or "none"
+            raise ValueError(f"--image {query!r} needs exactly one catalog match, found "
+                             f"{len(matches)}: {listed}")
+        if not matches[0]["paths"]:
+            raise ValueError(f"{matches[0]['name']} has no local copy (source: {matches[0]['source_url']})")
+        return matches[0]["paths"][0]
+
+    def indexed_sha256(self, path):
+        """SHA-256 indexed for path, None if unknown or changed since"""
+        self._load()
+        known = self.files.get(os.path.abspath(path))
+        if known is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if known["size"] != stat.st_size or known["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return known["sha256"]
+
+    def record_flash(self, path, com_port, duration_s):
+        """Update last-flashed stats for a path whose size/mtime still match the index"""
+        self._load()
+        path = os.path.abspath(path)
+        known = self.files.get(path)
+        if known is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if known["size"] != stat.st_size or known["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        entry = self.images.get(known["sha256"])
+        if entry is None:
+            return None
+        flashed = entry["flashed"]
+        flashed["count"] += 1
+        flashed["last_at"] = time.time()
+        flashed["last_port"] = com_port
+        flashed["last_duration_s"] = round(duration_s, 3)
+        return entry
+
+def print_entries(entries):
+    print(f"\n{'SHA-256':<14} {'NAME':<40} {'SIZE':>9} {'HEADER':<11} {'FAMILIES':<24} {'FLASHED':>7}")
+    for entry in entries:
+        families = sorted({family for types in entry["file_types"].values() for family in types})
+        print(f"{entry['sha256'][:12]:<14} {entry.get('name', '-'):<40} {entry['size']:>9} "
+              f"{entry['header'] or '-':<11} {','.join(families) or '-':<24} "
+              f"{entry['flashed']['count']:>7}")
+
+def run_catalog(args, events):
+    """Re-index the image folders, or look images up without touching them"""
+    started = time.perf_counter()
+    catalog = FirmwareCatalog()
+    if args.find is None:
+        directories = CATALOG_DIRS + (args.catalog_dir or [])
+        stats = catalog.index(directories)
+        catalog.save()
+        print(f"🗂️  Indexed {stats['files']} image(s) in {', '.join(directories)}: hashed "
+              f"{stats['hashed']}, unchanged {stats['unchanged']}, removed {stats['removed']} "
+              f"({time.perf_counter() - started:.3f} s)")
+        events.emit("catalog_index", **stats)
+    entries = catalog.select(args.find, args.part)
+    print_entries(entries)
+    for entry in entries:
+        events.emit("catalog_entry", **entry)
+    events.emit("result", success=True, exit_code=0, images=len(entries),
+                duration_s=round(time.perf_counter() - started, 6))
+    return 0
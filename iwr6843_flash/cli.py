@@ -0,0 +1,332 @@
+"""
+Command-line interface shared by flash_iwr6843aop.py and the standalone script
+"""
+
+import sys
+import time
+import contextlib
+
+from .simulator import SimulatedDevice
+from .events import EventStream, EVENT_FORMATS
+from .tracing import Tracer
+from .flasher import IWR6843AOPFlasher, FLASH_BANNER
+from .headers import HEADER_CACHE
+from .profiling import PROFILE_MODES, run_profiled
+from .constants import DEFAULT_CHUNK_SIZE, DEFAULT_SERIAL_BAUD_RATE
+
+def run_flash(args, events):
+    """Run a flash job described by parsed CLI arguments"""
+    started = time.perf_counter()
+    
+    tracer = Tracer() if args.trace else None
+    
+    if args.com == "auto":
+        from .discovery import resolve_auto_port
+        args.com = resolve_auto_port(args.simulate)
+    
+    reset_sequence = None
+    if args.reset_line:
+        from .reset import reset_sequence_from_args
+        reset_sequence = reset_sequence_from_args(args)
+    
+    comm_factory = None
+    if args.simulate:
+        device = SimulatedDevice() if reset_sequence is None else reset_sequence.simulated_device()
+        comm_factory = device.open_serial
+        print("🧪 Using simulated bootloader (no device I/O)")
+    
+    device_cache = None
+    if not args.no_device_cache:
+        from .device import DeviceCache
+        # Simulated boards must never end up in the on-disk device cache
+        device_cache = DeviceCache(path=None) if args.simulate else DeviceCache()
+    
+    # Keeps the measured phases for the comparison with the plan
+    from .planner import TimingModel, RunRecorder, SIMULATED_PORT, TIMING_MODEL_FILE, \
+        image_sizes, plan_flash, calibrate
+    recorder = RunRecorder(events)
+    
+    # Create flasher (COM port override is applied while loading settings)
+    flasher = IWR6843AOPFlasher(recorder, tracer, com_port=args.com, comm_factory=comm_factory,
+                                device_cache=device_cache, reset_sequence=reset_sequence,
+                                banner=args.banner)
+    flasher.expected_sha256 = args.sha256
+    
+    catalog = None
+    # Simulated runs never end up in the on-disk catalog stats
+    record_catalog = not (args.no_catalog or args.simulate)
+    if args.image or record_catalog:
+        from .catalog import FirmwareCatalog
+        catalog = FirmwareCatalog()
+    if args.image:
+        # Resolved from the index only; the image files are not read here
+        part = args.part or flasher.part_number
+        args.firmware = (args.firmware or []) + [catalog.resolve(q, part) for q in args.image]
+        print(f"🗂️  Catalog: {', '.join(args.firmware)}")
+    
+    # Predicted before the run, compared with the measured phases after it.
+    # Simulated runs only update a timing model file given explicitly
+    timing_model = TimingModel(args.timing_model if args.simulate else
+                               args.timing_model or TIMING_MODEL_FILE)
+    plan_port = SIMULATED_PORT if args.simulate else flasher.com_port
+    try:
+        plan = plan_flash(timing_model.profile(plan_port),
+                          image_sizes(args.firmware or flasher.default_firmware), args.storage,
+                          flasher.bootloader.chunksize, flasher.bootloader.baudrate, not args.no_format)
+    except Exception:
+        # The plan is advisory; the flash itself reports missing or broken
+        # images and bundles through its own error path
+        plan = None
+    
+    # Flash firmware (one or several images in one session)
+    success = flasher.flash_firmware(
+        firmware_path=args.firmware,
+        format_enabled=not args.no_format,
+        storage=args.storage
+    )
+    
+    if success and plan is not None:
+        try:
+            calibrate(timing_model, plan_port, plan, recorder, events)
+        except Exception as e:
+            # Advisory like the plan: an unwritable timing model must not fail a good flash
+            print(f"⚠️  Timing model not updated: {e}")
+    
+    if success and args.run_after:
+        flasher.run_application()
+    
+    if success and record_catalog and catalog.exists():
+        duration_s = time.perf_counter() - started
+        if [path for path in args.firmware or [flasher.default_firmware]
+                if catalog.record_flash(path, flasher.com_port, duration_s)]:
+            catalog.save()
+    
+    if success:
+        print("\n🎊 FLASH SUCCESSFUL!")
+        if not args.run_after:
+            print("🔄 You may need to reset the device to run new firmware")
+    else:
+        print("\n💥 FLASH FAILED!")
+        print("💡 Try:")
+        print("  - Check device connection and COM port")
+        print("  - Reset device and try again")
+        print("  - Verify firmware file is correct for IWR6843AOP")
+    
+    if tracer is not None:
+        tracer.export(args.trace)
+        print(f"📈 Trace written: {args.trace}")
+    
+    exit_code = 0 if success else 1
+    images = args.firmware or [flasher.default_firmware]
+    events.emit("result", success=success, exit_code=exit_code,
+                duration_s=round(time.perf_counter() - started, 6),
+                com_port=flasher.com_port,
+                firmware=images[0], images=images,
+                storage=args.storage)
+    return exit_code
+
+def run_check(args, events):
+    """Check the firmware header offline (no serial port is opened)"""
+    started = time.perf_counter()
+    flasher = IWR6843AOPFlasher(events, com_port=args.com)
+    success = flasher.check_firmware(args.firmware)
+    
+    if success:
+        print("\n✅ FIRMWARE HEADER OK")
+    else:
+        print("\n❌ FIRMWARE HEADER CHECK FAILED")
+    
+    exit_code = 0 if success else 1
+    images = args.firmware or [flasher.default_firmware]
+    events.emit("result", success=success, exit_code=exit_code,
+                duration_s=round(time.perf_counter() - started, 6),
+                firmware=images[0], images=images)
+    return exit_code
+
+def run_daemon(args, events):
+    """Keep a warm flashing process serving jobs over a local HTTP API"""
+    from .daemon import run_daemon as serve
+    if args.com == "auto":
+        from .discovery import resolve_auto_port
+        args.com = resolve_auto_port(args.simulate)
+    return serve(args, events)
+
+def run_submit(args, events):
+    """Hand a job to a running daemon instead of flashing in this process"""
+    from .daemon import run_submit as submit
+    return submit(args, events)
+
+def run_scan(args, events):
+    """Find the ports with a bootloader in flashing mode"""
+    from .discovery import run_scan as scan
+    return scan(args, events)
+
+def run_catalog(args, events):
+    """Index the local firmware images or look them up by name, hash or part"""
+    from .catalog import run_catalog as catalog
+    return catalog(args, events)
+
+def run_watch(args, events):
+    """Re-download the image to SRAM whenever it changes"""
+    from .watch import run_watch as watch
+    return watch(args, events)
+
+def run_manifest(args, events):
+    """Write the per-image manifests (hash, header, chunk checksums)"""
+    from .manifest import run_manifest as manifest
+    return manifest(args, events)
+
+def run_validate(args, events):
+    """Validate many images at once for every part family (no device needed)"""
+    from .validate import run_validate as validate
+    return validate(args, events)
+
+def run_plan(args, events):
+    """Predict the phases and total time of a flash from the timing model (no device I/O)"""
+    from .planner import run_plan as plan
+    return plan(args, events)
+
+COMMANDS = {
+    "flash": run_flash,
+    "check": run_check,
+    "daemon": run_daemon,
+    "submit": run_submit,
+    "scan": run_scan,
+    "watch": run_watch,
+    "catalog": run_catalog,
+    "manifest": run_manifest,
+    "validate": run_validate,
+    "plan": run_plan,
+}
+
+def main(argv=None, banner=FLASH_BANNER):
+    """Main entry point; banner is the title flash prints (one per front end)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Flash IWR6843AOP using embedded TI mmWave infrastructure')
+    parser.add_argument('command', nargs='?', default='flash', choices=list(COMMANDS),
+                       help='flash the device (default), check the firmware header offline, '
+                            'run the flashing daemon, submit a job to it, scan for devices or '
+                            'watch the image and reload it to SRAM on every change, index/search '
+                            'the local firmware catalog, write the per-image manifests, validate '
+                            'a batch of images for every part family or print the predicted flash plan')
+    parser.add_argument('--firmware', '-f', nargs='+', metavar='FILE',
+                       help='Firmware file path(s), bundle(s), http(s) URL(s) or sha256:<hash> from the '
+                            'firmware store; several images are '
+                            'downloaded in this order as META_IMAGE1..4 in one session with one erase '
+                            '(default: use built-in demo)')
+    parser.add_argument('--image', '-i', action='append', metavar='QUERY',
+                       help='Pick an image from the catalog by name, glob or SHA-256 prefix (repeatable)')
+    parser.add_argument('--part', metavar='PART',
+                       help='catalog/--image/validate: only images valid for this part, e.g. IWR68 '
+                            '(default for --image: the flasher part)')
+    parser.add_argument('--find', metavar='QUERY',
+                       help='catalog: list matching images from the index without re-indexing')
+    parser.add_argument('--catalog-dir', action='append', metavar='DIR',
+                       help='catalog/manifest/validate: index this directory too (repeatable)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, metavar='BYTES',
+                       help=f'manifest/plan: SEND_DATA chunk size the checksums and predicted times are '
+                            f'computed for (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--baud', type=int, default=DEFAULT_SERIAL_BAUD_RATE, metavar='BD',
+                       help=f'plan: UART baud rate to predict for (default: {DEFAULT_SERIAL_BAUD_RATE})')
+    parser.add_argument('--timing-model', metavar='FILE',
+                       help='flash/plan: timing model learned from past flashes (default: '
+                            'user_files/settings/timing_model.json; simulated flashes only update '
+                            'a file given here)')
+    parser.add_argument('--jobs', '-j', type=int, metavar='N',
+                       help='manifest/validate: worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true',
+                       help='manifest: rebuild manifests that are still valid')
+    parser.add_argument('--no-catalog', action='store_true',
+                       help='Do not record last-flashed stats in the catalog')
+    parser.add_argument('--sha256', metavar='HEX',
+                       help='Expected SHA-256 of an image from a URL; the image is then downloaded '
+                            'completely and verified before anything is erased')
+    parser.add_argument('--no-format', action='store_true',
+                       help='Skip format/erase step')
+    parser.add_argument('--storage', '-s', default='SFLASH',
+                       choices=['SFLASH', 'SRAM', 'EEPROM'],
+                       help='Target storage; validate: SRAM also enforces MAX_APP_FILE_SIZE (default: SFLASH)')
+    parser.add_argument('--com', '-c',
+                       help='Override COM port (default: read from settings); "auto" picks the '
+                            'one port with a bootloader from the last scan')
+    parser.add_argument('--events', default='text', choices=EVENT_FORMATS,
+                       help='Output mode: human-readable text or JSON lines on stdout (default: text)')
+    parser.add_argument('--batch', action='store_true',
+                       help='Non-interactive mode: never wait for Enter before exiting')
+    parser.add_argument('--trace', metavar='FILE',
+                       help='Write phase spans as Chrome trace-event JSON (view in Perfetto)')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                       help='Profile the run: deterministic (cprofile) or sampling (sample)')
+    parser.add_argument('--profile-out', metavar='FILE',
+                       help='Profile output (default: flash_profile.pstats / flash_profile.folded)')
+    parser.add_argument('--simulate', action='store_true',
+                       help='Flash against a built-in simulated bootloader instead of a serial port')
+    parser.add_argument('--header-cache', action='store_true',
+                       help='Keep validated image headers on disk (user_files/settings/header_cache.json) '
+                            'in addition to the in-process cache')
+    parser.add_argument('--no-device-cache', action='store_true',
+                       help='Always read the bootloader version instead of using the cached device info '
+                            '(use it when swapping boards behind the same USB adapter)')
+    parser.add_argument('--address', default='127.0.0.1:8765', metavar='HOST:PORT',
+                       help='daemon/submit: HTTP address of the daemon (default: 127.0.0.1:8765)')
+    parser.add_argument('--job', default='flash', choices=['flash', 'version', 'erase'],
+                       help='submit: job type (default: flash)')
+    parser.add_argument('--scan-timeout', type=float, default=0.5, metavar='SECONDS',
+                       help='scan: per-port handshake deadline (default: 0.5)')
+    parser.add_argument('--benchmark', type=int, metavar='N',
+                       help='daemon: time N back-to-back flashes, process-per-flash vs. daemon, then exit')
+    parser.add_argument('--watch-count', type=int, default=0, metavar='N',
+                       help='watch: stop after N downloads (default: run until Ctrl+C)')
+    
+    reset = parser.add_argument_group('automatic reset', 'Drive nRST/SOP through the DTR/RTS modem lines')
+    reset.add_argument('--reset-line', choices=['dtr', 'rts'],
+                       help='Modem line wired to nRST (enables reset into the bootloader on connect)')
+    reset.add_argument('--sop-line', choices=['dtr', 'rts'],
+                       help='Modem line wired to SOP (default: SOP strapped to flash mode)')
+    reset.add_argument('--reset-invert', action='store_true',
+                       help='nRST is asserted with the line cleared instead of set')
+    reset.add_argument('--sop-invert', action='store_true',
+                       help='Flash mode is selected with the SOP line cleared instead of set')
+    reset.add_argument('--reset-hold', type=float, default=50.0, metavar='MS',
+                       help='How long nRST is held asserted (default: 50)')
+    reset.add_argument('--boot-timeout', type=float, default=2.0, metavar='SECONDS',
+                       help='Give up if the bootloader has not ACKed this long after reset (default: 2.0)')
+    reset.add_argument('--run-after', action='store_true',
+                       help='Reset into the flashed application after a successful flash (needs --sop-line)')
+    
+    args = parser.parse_args(argv)
+    args.banner = banner
+    
+    # In jsonl mode stdout carries only events; human output goes to stderr
+    if args.events == 'jsonl':
+        events = EventStream(sys.stdout)
+        output = contextlib.redirect_stdout(sys.stderr)
+    else:
+        events = EventStream()
+        output = contextlib.nullcontext()
+    
+    if args.header_cache:
+        HEADER_CACHE.use_file()
+    
+    command = COMMANDS[args.command]
+    with output:
+        try:
+            if args.profile:
+                profile_output = args.profile_out or ("flash_profile.pstats" if args.profile == "cprofile"
+                                                      else "flash_profile.folded")
+                exit_code, seconds = run_profiled(args.profile, profile_output, command, args, events)
+                events.emit("profile", mode=args.profile, output=profile_output,
+                            seconds={k: round(v, 6) for k, v in seconds.items()})
+            else:
+                exit_code = command(args, events)
+        except Exception as e:
+            print(f"❌ Fatal error: {e}")
+            events.emit("result", success=False, exit_code=1, error=str(e))
+            exit_code = 1
+    
+    interactive = (not args.batch and args.events == 'text' and sys.stdin.isatty()
+                   and args.command not in ('daemon', 'watch'))
+    if interactive:
+        input("\nPress Enter to exit...")
+    return exit_code
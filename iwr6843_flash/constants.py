@@ -0,0 +1,175 @@
+"""
+mmWave bootloader constants (file types, part numbers, opcodes, trace levels)
+"""
+
+import struct
+
+DEFAULT_SERIAL_BAUD_RATE            = 115200
+DEFAULT_CHUNK_SIZE                  = 240
+MAX_FILE_SIZE                       = 1024*1024
+MAX_APP_FILE_SIZE                   = 166912
+FILE_HEADERSIZE                     = 4
+AWR_CANCEL_MSG = "Cancel request detected...Ceasing flashing operation."
+
+# File types mapping
+Files = {
+"RadarSS_BUILD"            : struct.pack(">I",0),
+"CALIB_DATA"               : struct.pack(">I",1),
+"CONFIG_INFO"              : struct.pack(">I",2),
+"MSS_BUILD"                : struct.pack(">I",3),
+"META_IMAGE1"              : struct.pack(">I",4),
+"META_IMAGE2"              : struct.pack(">I",5),
+"META_IMAGE3"              : struct.pack(">I",6),
+"META_IMAGE4"              : struct.pack(">I",7)
+}
+
+# Part numbers
+AWR12xx_PART_NUM  = "AWR12"
+AWR14xx_PART_NUM  = "AWR14"
+AWR16xx_PART_NUM  = "AWR16"
+IWR12xx_PART_NUM  = "IWR12"
+IWR14xx_PART_NUM  = "IWR14"
+IWR16xx_PART_NUM  = "IWR16"
+IWR16xx_PART_NUM  = "IWR16"
+xWR12xx_PART_NUM  = "WR12"
+xWR14xx_PART_NUM  = "WR14"
+xWR16xx_PART_NUM  = "WR16"
+xWR68xx_PART_NUM  = "WR68"
+xWR18xx_PART_NUM  = "WR18"
+AWR68xx_PART_NUM  = "AWR68"
+AWR18xx_PART_NUM  = "AWR18"
+IWR68xx_PART_NUM  = "IWR68"
+IWR18xx_PART_NUM  = "IWR18"
+
+PartNumSupported = [AWR12xx_PART_NUM, AWR14xx_PART_NUM, AWR16xx_PART_NUM, IWR12xx_PART_NUM, IWR14xx_PART_NUM, IWR16xx_PART_NUM, AWR68xx_PART_NUM, AWR18xx_PART_NUM, IWR68xx_PART_NUM, IWR18xx_PART_NUM]
+OlderFileFormatParts = [AWR12xx_PART_NUM, IWR12xx_PART_NUM, IWR14xx_PART_NUM, AWR14xx_PART_NUM]
+CONFIGFileParts = [IWR14xx_PART_NUM, AWR14xx_PART_NUM, AWR12xx_PART_NUM, IWR12xx_PART_NUM]
+
+# File header versions
+AWR_PRE_PG3_KEY = "PrePG3"
+AWR_POST_PG3_KEY = "PostPG3"
+
+FileHeaders = {
+AWR_PRE_PG3_KEY :  {
+xWR12xx_PART_NUM : { "headers" : [0xB5500000,0x35500000,0xCA11BDA7,0xC0F1618F],
+                     "fileType" : ["RadarSS_BUILD","MSS_BUILD","CALIB_DATA","CONFIG_INFO"]
+                   },
+xWR14xx_PART_NUM : { "headers" : [0xB5500000,0x35500000,0xCA11BDA7,0xC0F1618F],
+                     "fileType" : ["RadarSS_BUILD","MSS_BUILD","CALIB_DATA","CONFIG_INFO"]
+                   },
+xWR16xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR68xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR18xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },                   
+                   },
+AWR_POST_PG3_KEY : {
+xWR12xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR14xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR16xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR68xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },
+xWR18xx_PART_NUM : { "headers" : [0x5254534D],
+                     "fileType" : ["META_IMAGE1", "META_IMAGE2", "META_IMAGE3", "META_IMAGE4"]
+                   },                   
+                   }
+}
+
+# Version information
+AWR_VERSION_PG1_14_12 = "07000600"
+AWR_VERSION_PG2_14_12 = "01000601"
+AWR_VERSION_PG1_16    = "08000602"
+
+BootloaderVerPrePG3 = [AWR_VERSION_PG1_14_12, AWR_VERSION_PG2_14_12]
+
+# Device family by ROM bootloader version (first 4 bytes of GET_VERSION)
+BootloaderFamilies = {
+AWR_VERSION_PG1_14_12 : "xWR12xx/14xx PG1",
+AWR_VERSION_PG2_14_12 : "xWR12xx/14xx PG2",
+AWR_VERSION_PG1_16    : "xWR16xx/18xx/68xx",
+}
+
+# Storage types
+Storages = {
+"SDRAM"     : struct.pack(">I", 0),
+"FLASH"     : struct.pack(">I", 1),
+"SFLASH"    : struct.pack(">I", 2),
+"EEPROM"    : struct.pack(">I", 3),
+"SRAM"      : struct.pack(">I", 4)
+}
+
+# Bootloader opcodes (consolidated from both modules)
+AWR_BOOTLDR_OPCODE_ACK               = struct.pack("B", 0xCC)
+AWR_BOOTLDR_OPCODE_NACK              = struct.pack("B", 0x33)
+AWR_BOOTLDR_OPCODE_PING              = struct.pack("B", 0x20)
+AWR_BOOTLDR_OPCODE_START_DOWNLOAD    = struct.pack("B", 0x21)
+AWR_BOOTLDR_OPCODE_FILE_CLOSE        = struct.pack("B", 0x22)
+AWR_BOOTLDR_OPCODE_GET_LAST_STATUS   = struct.pack("B", 0x23)
+AWR_BOOTLDR_OPCODE_SEND_DATA         = struct.pack("B", 0x24)
+AWR_BOOTLDR_OPCODE_SEND_DATA_RAM     = struct.pack("B", 0x26)
+AWR_BOOTLDR_OPCODE_DISCONNECT        = struct.pack("B", 0x27)
+AWR_BOOTLDR_OPCODE_ERASE             = struct.pack("B", 0x28)
+AWR_BOOTLDR_OPCODE_FILE_ERASE        = struct.pack("B", 0x2E)
+AWR_BOOTLDR_OPCODE_GET_VERSION_INFO  = struct.pack("B", 0x2F)
+
+AWR_BOOTLDR_SYNC_PATTERN             = struct.pack("B", 0xAA)
+AWR_BOOTLDR_OPCODE_RET_SUCCESS             = struct.pack("B", 0x40)
+AWR_BOOTLDR_OPCODE_RET_ACCESS_IN_PROGRESS  = struct.pack("B", 0x4B)
+
+# Opcode names used in timing summaries
+OpcodeNames = {
+0x20 : "PING",
+0x21 : "START_DOWNLOAD",
+0x22 : "FILE_CLOSE",
+0x23 : "GET_LAST_STATUS",
+0x24 : "SEND_DATA",
+0x26 : "SEND_DATA_RAM",
+0x27 : "DISCONNECT",
+0x28 : "ERASE",
+0x2E : "FILE_ERASE",
+0x2F : "GET_VERSION_INFO"
+}
+
+# Device variants
+AWR_DEVICE_IS_AWR12XX               = struct.pack("B", 0x00)
+AWR_DEVICE_IS_AWR14XX               = struct.pack("B", 0x01)
+AWR_DEVICE_IS_AWR16XX               = struct.pack("B", 0x03)
+AWR_DEVICE_IS_AWR17XX               = struct.pack("B", 0x10)
+
+# Progress indicator constants
+UNIFLASH_PROG_INDICATOR_RANGE     = 82
+UNIFLASH_PROG_INDICATOR_B4_SHUTDOWN = 98
+ERASE_PROG_VALUE                  = 4
+
+# Trace levels
+TRACE_LEVEL_FATAL = 3
+TRACE_LEVEL_ERROR = 2
+TRACE_LEVEL_WARNING = 1
+TRACE_LEVEL_INFO = 0
+TRACE_LEVEL_DEBUG = -1
+TRACE_LEVEL_ACTIVITY = TRACE_LEVEL_INFO
+FLASHPYTHON_DEBUG_LEVEL = 255
+
+# Configuration
+ROM_VERSION = 1.0
+RUN_COUNT = 0
+IGNORE_BYTE_CONDITION = True
+IS_FILE_ALLOCATED     = False
+CHIP_VARIANT          = "CC"
+
+# Keys from Uniflash UI
+COMPORT_KEY     = 'COMPort'
+MEMSELECT_KEY   = 'MemSelectRadio'
+PARTNUM_KEY     = 'partnum'
+DOWNLOADFORMAT_KEY = 'DownloadFormat'
@@ -0,0 +1,462 @@
+"""
+Flashing daemon: one warm process that runs flash/version/erase jobs
+submitted over a local HTTP API
+
+Settings are read once, header checks are cached per image and serial
+handles stay open between jobs. Jobs for the same COM port run in order,
+different ports run in parallel.
+"""
+
+import os
+import sys
+import time
+import copy
+import json
+import queue
+import threading
+
+from .events import EventStream
+from .flasher import IWR6843AOPFlasher, image_paths
+from .remote import is_url
+from .store import is_hash_ref
+from .simulator import SimulatedDevice
+from .device import DeviceCache
+from .headers import HEADER_CACHE
+
+DAEMON_DEFAULT_ADDRESS = "127.0.0.1:8765"
+JOB_COMMANDS = ["flash", "version", "erase"]
+JOB_HISTORY = 200
+JOB_WAIT_MAX = 600.0
+
+def parse_address(address):
+    """Split "host:port" into a (host, port) tuple"""
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+class FlashJob:
+    """One queued flash, version or erase request and its outcome"""
+
+    def __init__(self, job_id, command, com_port, firmware=None, storage="SFLASH", format_enabled=True):
+        self.id = job_id
+        self.command = command
+        self.com_port = com_port
+        self.firmware = firmware
+        self.storage = storage
+        self.format_enabled = format_enabled
+        self.status = "queued"
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.run_s = None
+        self.events = []
+        self.phases = []
+        self.result = {}
+        self.done = threading.Event()
+
+    def to_dict(self, events=False):
+        record = {
+            "id": self.id,
+            "command": self.command,
+            "com_port": self.com_port,
+            "firmware": self.firmware,
+            "storage": self.storage,
+            "format": self.format_enabled,
+            "status": self.status,
+            "submitted": round(self.submitted, 6),
+            "queued_s": round((self.started or time.time()) - self.submitted, 6),
+            "run_s": None if self.run_s is None else round(self.run_s, 6),
+            "phases": self.phases,
+            "result": self.result,
+        }
+        if events:
+            record["events"] = self.events
+        return record
+
+class JobEvents(EventStream):
+    """Event sink that keeps a job's records in memory"""
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def emit(self, event, **fields):
+        record = {"event": event, "ts": round(time.time(), 6)}
+        record.update(fields)
+        self.job.events.append(record)
+        if event == "phase_end":
+            self.job.phases.append({"phase": fields["phase"], "ok": fields["ok"],
+                                    "duration_s": fields["duration_s"]})
+        elif event == "opcode_summary":
+            self.job.result["opcodes"] = fields["opcodes"]
+        elif event == "device_info":
+            self.job.result["device"] = {"family": fields["family"], "rom_version": fields["rom_version"],
+                                         "cached": fields["cached"], "saved_s": fields["saved_s"]}
+
+class _PooledPort:
+    """Serial handle whose close() keeps the port open for the next job"""
+
+    def __init__(self, handle):
+        object.__setattr__(self, "_handle", handle)
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._handle, name, value)
+
+    def close(self):
+        self._handle.reset_input_buffer()
+
+class PortPool:
+    """Opens each serial port once and hands out the warm handle"""
+
+    def __init__(self, reset_sequence=None):
+        self.reset_sequence = reset_sequence
+        self.handles = {}
+        self.opened = 0
+        self.reused = 0
+        self.lock = threading.Lock()
+
+    def open_serial(self, port, baudrate, timeout):
+        """BootLdr comm_factory: reuse the open handle for this port"""
+        with self.lock:
+            handle = self.handles.get(port)
+            if handle is None or not handle.is_open:
+                if self.reset_sequence is not None:
+                    # Open with the idle levels so a reconnect never resets the board
+                    handle = self.reset_sequence.open_serial(port, baudrate, timeout)
+                else:
+                    import serial
+                    handle = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
+                self.handles[port] = handle
+                self.opened += 1
+            else:
+                handle.baudrate = baudrate
+                handle.timeout = timeout
+                self.reused += 1
+        return _PooledPort(handle)
+
+    def close_all(self):
+        with self.lock:
+            for handle in self.handles.values():
+                handle.close()
+            self.handles.clear()
+
+class FlashDaemon:
+    """Job queue and warm per-port flash sessions"""
+
+    def __init__(self, com_port=None, simulate=False, device_cache=True, reset_sequence=None):
+        self.simulate = simulate
+        self.started = time.time()
+        self.reset_sequence = reset_sequence
+        self.ports = PortPool(reset_sequence)
+        self.devices = {}
+        # Simulated boards must never end up in the on-disk device cache
+        if not device_cache:
+            self.device_cache = None
+        else:
+            self.device_cache = DeviceCache(path=None) if simulate else DeviceCache()
+        self.sessions = {}
+        self.queues = {}
+        self.jobs = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+        # Settings are read once here; jobs without a COM port use this one
+        self.default_port = self._session(com_port).com_port
+
+    def _open_port(self, port, baudrate, timeout):
+        if self.simulate:
+            device = self.devices.get(port)
+            if device is None:
+                device = SimulatedDevice() if self.reset_sequence is None else self.reset_sequence.simulated_device()
+                self.devices[port] = device
+            return device.open_serial(port, baudrate, timeout)
+        return self.ports.open_serial(port, baudrate, timeout)
+
+    def _session(self, com_port):
+        session = self.sessions.get(com_port)
+        if session is None:
+            # Each session gets its own ResetSequence: ready_s/attempts are per connect
+            reset_sequence = copy.copy(self.reset_sequence) if self.reset_sequence is not None else None
+            session = IWR6843AOPFlasher(com_port=com_port, comm_factory=self._open_port,
+                                        device_cache=self.device_cache,
+                                        reset_sequence=reset_sequence)
+            self.sessions[session.com_port] = session
+        return session
+
+    def submit(self, command="flash", com_port=None, firmware=None, storage="SFLASH", format_enabled=True):
+        """Queue a job and return it; raises ValueError for bad requests"""
+        if command not in JOB_COMMANDS:
+            raise ValueError(f"unknown command {command!r} (expected one of {', '.join(JOB_COMMANDS)})")
+        if command == "flash" and firmware is not None:
+            for path in image_paths(firmware):
+                if not is_url(path) and not os.path.exists(path):
+                    raise ValueError(f"firmware file not found: {path}")
+        with self.lock:
+            port = com_port or self.default_port
+            session = self._session(port)
+            job = FlashJob(self.next_id, command, port, firmware or session.default_firmware,
+                           storage, format_enabled)
+            self.next_id += 1
+            self.jobs[job.id] = job
+            while len(self.jobs) > JOB_HISTORY:
+                oldest = next(iter(self.jobs))
+                if not self.jobs[oldest].done.is_set():
+                    break
+                del self.jobs[oldest]
+            jobs = self.queues.get(port)
+            if jobs is None:
+                jobs = self.queues[port] = queue.Queue()
+                threading.Thread(target=self._worker, args=(session, jobs),
+                                 name=f"flash-{port}", daemon=True).start()
+        jobs.put(job)
+        return job
+
+    def _worker(self, session, jobs):
+        while True:
+            job = jobs.get()
+            self._run(session, job)
+
+    def _run(self, session, job):
+        events = JobEvents(job)
+        session.events = events
+        session.callback.events = events
+        job.status = "running"
+        job.started = time.time()
+        started = time.perf_counter()
+        try:
+            if job.command == "flash":
+                success = session.flash_firmware(job.firmware, job.format_enabled, job.storage)
+            elif job.command == "version":
+                success = session.read_version()
+                job.result["version"] = session.version
+            else:
+                success = session.erase(job.storage)
+        except Exception as e:
+            success = False
+            job.result["error"] = str(e)
+        job.run_s = time.perf_counter() - started
+        job.finished = time.time()
+        job.result["success"] = bool(success)
+        job.status = "succeeded" if success else "failed"
+        job.done.set()
+
+    def status(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "uptime_s": round(time.time() - self.started, 3),
+                "simulate": self.simulate,
+                "default_port": self.default_port,
+                "ports": sorted(self.sessions),
+                "jobs": counts,
+                "next_id": self.next_id,
+                "header_cache": HEADER_CACHE.stats(),
+                "device_cache_hits": self.device_cache.hits if self.device_cache else 0,
+                "serial_opened": self.ports.opened,
+                "serial_reused": self.ports.reused,
+            }
+
+    def close(self):
+        self.ports.close_all()
+
+def _make_handler(daemon):
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qs
+
+    class Handler(BaseHTTPRequestHandler):
+        """GET /status, GET /jobs, GET /jobs/<id>[/events][?wait=s], POST /jobs"""
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip("/").split("/")
+            if parts == ["status"]:
+                return self._reply(200, daemon.status())
+            if parts == ["jobs"]:
+                with daemon.lock:
+                    jobs = [job.to_dict() for job in daemon.jobs.values()]
+                return self._reply(200, {"jobs": jobs})
+            if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1].isdigit():
+                job = daemon.jobs.get(int(parts[1]))
+                if job is None or (len(parts) == 3 and parts[2] != "events"):
+                    return self._reply(404, {"error": "no such job"})
+                try:
+                    wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+                except ValueError:
+                    return self._reply(400, {"error": "wait must be a number of seconds"})
+                if wait > 0:
+                    job.done.wait(min(wait, JOB_WAIT_MAX))
+                return self._reply(200, job.to_dict(events=len(parts) == 3))
+            self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if urlsplit(self.path).path.rstrip("/") != "/jobs":
+                return self._reply(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                job = daemon.submit(command=request.get("command", "flash"),
+                                    com_port=request.get("com_port"),
+                                    firmware=request.get("firmware"),
+                                    storage=request.get("storage", "SFLASH"),
+                                    format_enabled=request.get("format", True))
+            except (ValueError, AttributeError) as e:
+                return self._reply(400, {"error": str(e)})
+            self._reply(202, job.to_dict())
+
+    return Handler
+
+def start_server(daemon, address=DAEMON_DEFAULT_ADDRESS):
+    """Bind the HTTP API for a daemon; call serve_forever() on the result"""
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer(parse_address(address), _make_handler(daemon))
+    server.daemon_threads = True
+    return server
+
+def request_job(address, payload, timeout=JOB_WAIT_MAX):
+    """Submit a job to a running daemon and wait until it has finished"""
+    from urllib.request import Request, urlopen
+    host, port = parse_address(address)
+    base = f"http://{host}:{port}"
+    request = Request(base + "/jobs", data=json.dumps(payload).encode(),
+                      headers={"Content-Type": "application/json"})
+    with urlopen(request) as response:
+        job = json.load(response)
+    deadline = time.time() + timeout
+    while job["status"] in ("queued", "running") and time.time() < deadline:
+        with urlopen(f"{base}/jobs/{job['id']}?wait={min(30.0, timeout)}") as response:
+            job = json.load(response)
+    return job
+
+def run_daemon(args, events):
+    """Serve the job API until interrupted"""
+    reset_sequence = None
+    if args.reset_line:
+        from .reset import reset_sequence_from_args
+        reset_sequence = reset_sequence_from_args(args)
+    daemon = FlashDaemon(com_port=args.com, simulate=args.simulate,
+                         device_cache=not args.no_device_cache, reset_sequence=reset_sequence)
+    if args.simulate:
+        print("🧪 Using simulated bootloader (no device I/O)")
+    if args.benchmark:
+        return run_benchmark(args, events, daemon)
+    server = start_server(daemon, args.address)
+    host, port = server.server_address[:2]
+    print(f"🛰️  Flash daemon listening on http://{host}:{port} (default port {daemon.default_port})")
+    events.emit("daemon_start", address=f"{host}:{port}", default_port=daemon.default_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Daemon stopped")
+    finally:
+        server.server_close()
+        daemon.close()
+    events.emit("daemon_stop", **daemon.status())
+    return 0
+
+def run_submit(args, events):
+    """Send one job to a running daemon and report its status and timings"""
+    from urllib.error import HTTPError, URLError
+    # The daemon may run in another directory; hash references resolve in its store
+    firmware = [path if is_url(path) or is_hash_ref(path) else os.path.abspath(path)
+                for path in args.firmware] if args.firmware else None
+    payload = {"command": args.job, "com_port": args.com, "firmware": firmware,
+               "storage": args.storage, "format": not args.no_format}
+    try:
+        job = request_job(args.address, payload)
+    except HTTPError as e:
+        print(f"❌ Daemon rejected the job: {json.load(e).get('error', e.reason)}")
+        return 2
+    except URLError as e:
+        print(f"❌ Daemon not reachable at {args.address}: {e.reason}")
+        return 2
+    except OSError as e:
+        print(f"❌ Daemon request failed: {e}")
+        return 2
+    print(f"📨 Job {job['id']} ({job['command']} on {job['com_port']}): {job['status']}")
+    print(f"   queued {job['queued_s']:.3f} s, ran {job['run_s'] or 0.0:.3f} s")
+    for phase in job["phases"]:
+        print(f"   {phase['phase']:<14} {phase['duration_s']:8.3f} s  {'ok' if phase['ok'] else 'FAILED'}")
+    if job["result"].get("version"):
+        print(f"🏷️  Bootloader version: {job['result']['version']}")
+    success = job["status"] == "succeeded"
+    events.emit("job", **job)
+    return 0 if success else 1
+
+def run_benchmark(args, events, daemon):
+    """Time N back-to-back flashes: one process per flash vs. the daemon"""
+    import subprocess
+    import contextlib
+    count = args.benchmark
+    firmware = args.firmware or [daemon.sessions[daemon.default_port].default_firmware]
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    command = [sys.executable, "-m", "iwr6843_flash", "flash", "--batch", "--firmware", *firmware,
+               "--storage", args.storage]
+    if args.com:
+        command += ["--com", args.com]
+    if args.no_format:
+        command.append("--no-format")
+    if args.simulate:
+        command.append("--simulate")
+    if args.reset_line:
+        command += ["--reset-line", args.reset_line, "--reset-hold", str(args.reset_hold),
+                    "--boot-timeout", str(args.boot_timeout)]
+        if args.sop_line:
+            command += ["--sop-line", args.sop_line]
+        if args.reset_invert:
+            command.append("--reset-invert")
+        if args.sop_invert:
+            command.append("--sop-invert")
+    payload = {"command": "flash", "com_port": args.com, "firmware": firmware,
+               "storage": args.storage, "format": not args.no_format}
+
+    print(f"⏱️  Benchmark: {count} back-to-back flashes of {', '.join(firmware)}")
+    results = {}
+    started = time.perf_counter()
+    failures = 0
+    for _ in range(count):
+        failures += subprocess.call(command, env=env, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL) != 0
+    results["process"] = (time.perf_counter() - started, failures)
+
+    server = start_server(daemon, "127.0.0.1:0")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    address = "%s:%d" % server.server_address[:2]
+    failures = 0
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            started = time.perf_counter()
+            for _ in range(count):
+                failures += request_job(address, payload)["status"] != "succeeded"
+            results["daemon"] = (time.perf_counter() - started, failures)
+    finally:
+        server.shutdown()
+        server.server_close()
+        daemon.close()
+
+    print(f"📊 Back-to-back throughput ({count} jobs):")
+    for name, label in (("process", "process-per-flash"), ("daemon", "daemon")):
+        seconds, failed = results[name]
+        print(f"   {label:<18} {seconds:8.3f} s  {seconds * 1000.0 / count:8.1f} ms/job  "
+              f"{count * 60.0 / seconds:7.1f} jobs/min  {failed} failed")
+    speedup = results["process"][0] / results["daemon"][0]
+    print(f"⚡ Daemon speedup: {speedup:.2f}x")
+    events.emit("benchmark", jobs=count, firmware=firmware,
+                process_s=round(results["process"][0], 6), process_failed=results["process"][1],
+                daemon_s=round(results["daemon"][0], 6), daemon_failed=results["daemon"][1],
+                speedup=round(speedup, 3))
+    return 0 if results["process"][1] == 0 and results["daemon"][1] == 0 else 1
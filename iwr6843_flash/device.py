@@ -0,0 +1,150 @@
+"""
+Device identity from the GET_VERSION record, cached per port and USB serial
+"""
+
+import os
+import time
+
+from .constants import (BootloaderVerPrePG3, BootloaderFamilies,
+                        AWR_PRE_PG3_KEY, AWR_POST_PG3_KEY)
+
+DEVICE_CACHE_FILE = "user_files/settings/device_cache.json"
+# A hit is only confirmed by the break ACK, which every board gives: another
+# board behind the same adapter (same port and USB serial) gets the old
+# record until the entry expires, so entries only live for a short re-flash loop
+DEVICE_CACHE_TTL = 120.0
+
+# Port -> USB serial from the last enumeration, and when it was taken
+_usb_serials = {}
+_usb_serials_at = None
+
+class DeviceInfo:
+    """Parsed ROM bootloader version record of one board"""
+
+    def __init__(self, record, port="", usb_serial="", read_at=None, probe_s=0.0):
+        self.record = bytes(record)
+        self.port = port
+        self.usb_serial = usb_serial
+        self.read_at = time.time() if read_at is None else read_at
+        # Time the GET_VERSION round trip took when the record was read
+        self.probe_s = probe_s
+
+    @property
+    def rom_version(self):
+        """First 4 bytes as hex, the value TI compares against BootloaderVerPrePG3"""
+        return self.record[0:4].hex()
+
+    @property
+    def extra(self):
+        """Remaining bytes of the record as hex (meaning not documented by TI)"""
+        return self.record[4:].hex()
+
+    @property
+    def family(self):
+        return BootloaderFamilies.get(self.rom_version, "unknown")
+
+    @property
+    def pg3(self):
+        return self.rom_version not in BootloaderVerPrePG3
+
+    @property
+    def pg_key(self):
+        return AWR_POST_PG3_KEY if self.pg3 else AWR_PRE_PG3_KEY
+
+    def to_dict(self):
+        return {"port": self.port, "usb_serial": self.usb_serial, "record": self.record.hex(),
+                "rom_version": self.rom_version, "extra": self.extra, "family": self.family,
+                "pg_key": self.pg_key, "read_at": round(self.read_at, 3),
+                "probe_s": round(self.probe_s, 6)}
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(bytes.fromhex(entry["record"]), entry.get("port", ""), entry.get("usb_serial", ""),
+                   entry.get("read_at", 0.0), entry.get("probe_s", 0.0))
+
+def usb_serial_number(port):
+    """USB serial number of the adapter behind a port ('' if unknown)
+
+    Enumerating the ports can cost as much as the GET_VERSION round trip a
+    cache hit saves, so it happens once per process (again after
+    DEVICE_CACHE_TTL in a long-running one, or for a port not seen yet).
+    """
+    global _usb_serials, _usb_serials_at
+    now = time.monotonic()
+    if _usb_serials_at is None or now - _usb_serials_at > DEVICE_CACHE_TTL or port not in _usb_serials:
+        try:
+            from serial.tools import list_ports
+        except ImportError:
+            return ""
+        serials = {info.device: info.serial_number or "" for info in list_ports.comports()}
+        # Ports without an adapter (simulated, unplugged) are not enumerated again
+        serials.setdefault(port, "")
+        _usb_serials, _usb_serials_at = serials, now
+    return _usb_serials.get(port, "")
+
+class DeviceCache:
+    """DeviceInfo per (port, USB serial) with a TTL; path=None keeps it in memory"""
+
+    def __init__(self, path=DEVICE_CACHE_FILE, ttl=DEVICE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+        import threading
+        # The daemon shares one cache between its per-port workers
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(port, usb_serial):
+        return f"{port}|{usb_serial}"
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if self.path is None:
+            return
+        import json
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, port, usb_serial):
+        """Return the cached DeviceInfo if it is younger than the TTL"""
+        with self.lock:
+            self._load()
+            entry = self.entries.get(self.key(port, usb_serial))
+        if entry is not None and time.time() - entry.get("read_at", 0.0) <= self.ttl:
+            try:
+                info = DeviceInfo.from_dict(entry)
+            except (KeyError, ValueError):
+                info = None
+            if info is not None:
+                self.hits += 1
+                return info
+        self.misses += 1
+        return None
+
+    def store(self, info):
+        with self.lock:
+            self._load()
+            self.entries[self.key(info.port, info.usb_serial)] = info.to_dict()
+            if self.path is None:
+                return
+            import json
+            import tempfile
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # A temp name of its own, so concurrent writers never replace each other's file
+            fd, temp = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.entries, f, indent=2)
+                os.replace(temp, self.path)
+            except BaseException:
+                os.remove(temp)
+                raise
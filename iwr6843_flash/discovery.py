@@ -0,0 +1,219 @@
+"""
+Serial port discovery: probe many ports in parallel for a ROM bootloader
+
+Each probe is a short-deadline handshake (break -> ACK, GET_VERSION ->
+ACK + version record), so ports without a device in flashing mode cost at
+most the deadline and all ports are probed at the same time.
+"""
+
+import os
+import time
+import struct
+
+from .constants import *
+from .bootloader import _checksum, _wait_for_ack
+from .simulator import SimulatedDevice
+
+SCAN_DEADLINE = 0.5
+SCAN_READ_TIMEOUT = 0.02
+SCAN_MAX_WORKERS = 32
+SCAN_CACHE_FILE = "user_files/settings/port_scan.json"
+SCAN_CACHE_TTL = 300.0
+SIM_RACK_SIZE = 16
+
+class PortProbe:
+    """Outcome of probing one serial port"""
+
+    def __init__(self, port, usb_serial="", description=""):
+        self.port = port
+        self.usb_serial = usb_serial
+        self.description = description
+        self.bootloader = False
+        self.version = ""
+        self.latency = 0.0
+        self.version_s = 0.0
+        self.error = ""
+
+    @property
+    def rom_version(self):
+        return self.version[0:8]
+
+    @property
+    def family(self):
+        if not self.bootloader:
+            return ""
+        return BootloaderFamilies.get(self.rom_version, "unknown")
+
+    def to_dict(self):
+        return {"port": self.port, "usb_serial": self.usb_serial, "description": self.description,
+                "bootloader": self.bootloader, "version": self.version, "family": self.family,
+                "latency_s": round(self.latency, 6), "error": self.error}
+
+    @classmethod
+    def from_dict(cls, record):
+        probe = cls(record["port"], record.get("usb_serial", ""), record.get("description", ""))
+        probe.bootloader = record.get("bootloader", False)
+        probe.version = record.get("version", "")
+        probe.latency = record.get("latency_s", 0.0)
+        probe.error = record.get("error", "")
+        return probe
+
+def _open_serial(port, baudrate, timeout):
+    import serial
+    if os.name == "posix":
+        # Never probe a port another process (e.g. a running flash) holds
+        return serial.Serial(port=port, baudrate=baudrate, timeout=timeout, exclusive=True)
+    return serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
+
+def _read_exact(comm, size, until):
+    data = bytearray()
+    while len(data) < size and time.perf_counter() < until:
+        data += comm.read(size - len(data))
+    return bytes(data)
+
+def probe_port(port, open_port=_open_serial, deadline=SCAN_DEADLINE, usb_serial="", description=""):
+    """Handshake with the ROM bootloader on one port within the deadline"""
+    probe = PortProbe(port, usb_serial, description)
+    started = time.perf_counter()
+    until = started + deadline
+    try:
+        comm = open_port(port=port, baudrate=DEFAULT_SERIAL_BAUD_RATE, timeout=SCAN_READ_TIMEOUT)
+    except Exception as e:
+        probe.error = str(e) or e.__class__.__name__
+        probe.latency = time.perf_counter() - started
+        return probe
+    try:
+        comm.break_condition = True
+        acked = _wait_for_ack(comm, until)
+        comm.break_condition = False
+        if not acked:
+            probe.error = "no bootloader response"
+            return probe
+        request = AWR_BOOTLDR_OPCODE_GET_VERSION_INFO
+        version_started = time.perf_counter()
+        comm.write(AWR_BOOTLDR_SYNC_PATTERN + struct.pack(">HB", len(request) + 2, _checksum(request)) + request)
+        if not _wait_for_ack(comm, until):
+            probe.error = "GET_VERSION not acknowledged"
+            return probe
+        header = _read_exact(comm, 3, until)
+        if len(header) < 3:
+            probe.error = "version record timed out"
+            return probe
+        size, checksum = struct.unpack(">HB", header)
+        record = _read_exact(comm, size - 2, until)
+        if len(record) != size - 2 or _checksum(record) != checksum:
+            probe.error = "bad version record"
+            return probe
+        comm.write(AWR_BOOTLDR_OPCODE_ACK)
+        probe.version_s = time.perf_counter() - version_started
+        probe.bootloader = True
+        probe.version = record.hex()
+    except Exception as e:
+        probe.error = str(e) or e.__class__.__name__
+    finally:
+        probe.latency = time.perf_counter() - started
+        try:
+            comm.close()
+        except Exception:
+            pass
+    return probe
+
+def list_candidate_ports():
+    """Return (device, usb_serial, description) for every serial port on the host"""
+    from serial.tools import list_ports
+    return [(p.device, p.serial_number or "", p.description or "")
+            for p in sorted(list_ports.comports(), key=lambda p: p.device)]
+
+def simulated_rack(size=SIM_RACK_SIZE):
+    """Ports SIM0..SIMn: one board in flashing mode, the rest without a bootloader"""
+    devices = {f"SIM{i}": SimulatedDevice(silent=(i > 0)) for i in range(size)}
+    ports = [(name, f"SIMRACK{i:02d}", "Simulated port") for i, name in enumerate(devices)]
+
+    def open_port(port, baudrate, timeout):
+        return devices[port].open_serial(port, baudrate, timeout)
+
+    return ports, open_port
+
+def scan_ports(ports, open_port=_open_serial, deadline=SCAN_DEADLINE):
+    """Probe (device, usb_serial, description) entries in parallel, keeping their order"""
+    from concurrent.futures import ThreadPoolExecutor
+    if not ports:
+        return []
+    with ThreadPoolExecutor(max_workers=min(SCAN_MAX_WORKERS, len(ports))) as pool:
+        return list(pool.map(lambda p: probe_port(p[0], open_port, deadline, p[1], p[2]), ports))
+
+def save_scan(probes, path=SCAN_CACHE_FILE):
+    import json
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"scanned": time.time(), "ports": [p.to_dict() for p in probes]}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def load_scan(path=SCAN_CACHE_FILE, ttl=SCAN_CACHE_TTL):
+    """Return cached probes if the last scan is younger than ttl seconds, else None"""
+    import json
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - cache.get("scanned", 0) > ttl:
+        return None
+    return [PortProbe.from_dict(record) for record in cache.get("ports", [])]
+
+def resolve_auto_port(simulate=False):
+    """Pick the one port with a bootloader for --com auto (cached scan first)"""
+    probes = None if simulate else load_scan()
+    source = "cached scan"
+    if probes is None:
+        if simulate:
+            ports, open_port = simulated_rack()
+            probes = scan_ports(ports, open_port)
+        else:
+            probes = scan_ports(list_candidate_ports())
+            save_scan(probes)
+        source = "scan"
+    found = [p for p in probes if p.bootloader]
+    if len(found) != 1:
+        listed = ", ".join(p.port for p in found) or "none"
+        raise ValueError(f"--com auto needs exactly one bootloader, found {len(found)} ({listed}); "
+                         f"run 'scan' and pass --com")
+    print(f"🔎 --com auto: {found[0].port} ({found[0].family}, from {source})")
+    return found[0].port
+
+def run_scan(args, events):
+    """Probe all candidate ports and print port -> bootloader version"""
+    started = time.perf_counter()
+    if args.simulate:
+        ports, open_port = simulated_rack()
+        print("🧪 Scanning a simulated rack (no device I/O)")
+    else:
+        ports, open_port = list_candidate_ports(), _open_serial
+    print(f"🔎 Probing {len(ports)} port(s) in parallel (deadline {args.scan_timeout:.2f} s)...")
+    probes = scan_ports(ports, open_port, args.scan_timeout)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'PORT':<16} {'VERSION':<26} {'FAMILY':<20} {'USB SERIAL':<12} {'TIME':>8}")
+    for probe in probes:
+        version = probe.version or f"- ({probe.error})"
+        print(f"{probe.port:<16} {version:<26} {probe.family or '-':<20} {probe.usb_serial or '-':<12} "
+              f"{probe.latency:7.3f}s")
+        events.emit("port", **probe.to_dict())
+
+    found = sum(1 for p in probes if p.bootloader)
+    print(f"\n{'✅' if found else '❌'} {found} bootloader(s) on {len(probes)} port(s) in {elapsed:.3f} s")
+    if not args.simulate:
+        from .device import DeviceCache, DeviceInfo
+        devices = DeviceCache()
+        for probe in probes:
+            if probe.bootloader:
+                devices.store(DeviceInfo(bytes.fromhex(probe.version), probe.port, probe.usb_serial,
+                                         probe_s=probe.version_s))
+        save_scan(probes)
+        print(f"💾 Scan cached for {SCAN_CACHE_TTL:.0f} s: {SCAN_CACHE_FILE} (use --com auto)")
+    exit_code = 0 if found else 1
+    events.emit("result", success=bool(found), exit_code=exit_code,
+                duration_s=round(elapsed, 6), ports=len(probes), bootloaders=found)
+    return exit_code
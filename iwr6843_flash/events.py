@@ -0,0 +1,60 @@
+"""
+Structured event stream (JSON lines)
+"""
+
+import time
+import contextlib
+
+from .constants import (TRACE_LEVEL_FATAL, TRACE_LEVEL_ERROR, TRACE_LEVEL_WARNING,
+                        TRACE_LEVEL_INFO, TRACE_LEVEL_DEBUG, FLASHPYTHON_DEBUG_LEVEL)
+
+EVENT_FORMATS = ["text", "jsonl"]
+
+TRACE_LEVEL_NAMES = {
+    TRACE_LEVEL_FATAL: "FATAL",
+    TRACE_LEVEL_ERROR: "ERROR",
+    TRACE_LEVEL_WARNING: "WARN",
+    TRACE_LEVEL_INFO: "INFO",
+    FLASHPYTHON_DEBUG_LEVEL: "DEBUG",
+    TRACE_LEVEL_DEBUG: "DEBUG"
+}
+
+class FlashPhase:
+    """Outcome of a phase opened with EventStream.phase()"""
+
+    def __init__(self, name):
+        self.name = name
+        self.ok = True
+        self.duration = 0.0
+
+class EventStream:
+    """Machine-readable event sink writing one JSON record per line"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def emit(self, event, **fields):
+        """Write a single event record (no-op without a stream)"""
+        if self.stream is None:
+            return
+        import json
+        record = {"event": event, "ts": round(time.time(), 6)}
+        record.update(fields)
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    @contextlib.contextmanager
+    def phase(self, name, **fields):
+        """Emit phase_start/phase_end records around a block"""
+        phase = FlashPhase(name)
+        self.emit("phase_start", phase=name, **fields)
+        started = time.perf_counter()
+        try:
+            yield phase
+        except BaseException:
+            phase.ok = False
+            raise
+        finally:
+            phase.duration = time.perf_counter() - started
+            self.emit("phase_end", phase=name, ok=bool(phase.ok),
+                      duration_s=round(phase.duration, 6), **fields)
@@ -0,0 +1,512 @@
+"""
+IWR6843AOP flash session: settings, header check, erase and download
+"""
+
+import os
+import time
+import contextlib
+
+from .bootloader import BootLdr, FilesObject
+from .events import EventStream, TRACE_LEVEL_NAMES
+from .device import usb_serial_number
+from .bundle import is_bundle, expand_images
+from .headers import HEADER_CACHE
+from .remote import UrlImage, is_url
+from .store import resolve_hash_ref
+from .manifest import read_image_manifest, chunk_sums
+from .constants import FILE_HEADERSIZE
+
+# META_IMAGE1..4: the most images one session can download
+MAX_IMAGES = 4
+# Printed by flash_firmware; flash_iwr6843aop_standalone.py passes its own
+FLASH_BANNER = "IWR6843AOP Flash Tool (Using TI mmWave)"
+
+def image_paths(firmware_path):
+    """One path or an ordered list of paths -> list of paths
+
+    'sha256:<hex>' references resolve to their blob in the firmware store.
+    """
+    if not isinstance(firmware_path, (list, tuple)):
+        firmware_path = [firmware_path]
+    return [resolve_hash_ref(path) for path in firmware_path]
+
+class IWR6843AOPFlasher:
+    """IWR6843AOP Flasher using embedded TI mmWave infrastructure"""
+    
+    def __init__(self, events=None, tracer=None, com_port=None, comm_factory=None,
+                 device_cache=None, reset_sequence=None, banner=FLASH_BANNER):
+        self.config_file = "user_files/configs/iwr6843AOP.ccxml"
+        self.settings_file = "user_files/settings/generated.ufsettings"
+        self.default_firmware = "user_files/images/vital_signs_tracking_6843AOP_demo.bin"
+        self.part_number = "IWR68"  # Part number for IWR6843 series
+        self.events = events if events is not None else EventStream()
+        self.tracer = tracer
+        self.com_port = com_port
+        self.version = ""
+        # Optional DeviceCache: skips GET_VERSION for a board seen recently
+        self.device_cache = device_cache
+        self.saved_s = 0.0
+        # Expected SHA-256 of an image streamed from a URL
+        self.expected_sha256 = None
+        # Optional ResetSequence: reset into the bootloader via DTR/RTS on connect
+        self.reset_sequence = reset_sequence
+        self.banner = banner
+        
+        # Load settings
+        with self._phase("settings_load"):
+            self.load_settings()
+            if com_port:
+                self.com_port = com_port
+                print(f"🔌 COM port overridden: {com_port}")
+        
+        # Create callback handler
+        self.callback = FlashCallback(self.events)
+        
+        # Create bootloader instance
+        self.bootloader = BootLdr(self.callback, self.com_port, tracer=self.tracer,
+                                  comm_factory=comm_factory, reset_sequence=reset_sequence)
+        
+    @contextlib.contextmanager
+    def _phase(self, name, **fields):
+        """Open an event phase and, when tracing, a span on this device's track"""
+        with self.events.phase(name, **fields) as phase:
+            started = time.perf_counter()
+            try:
+                yield phase
+            finally:
+                if self.tracer is not None:
+                    self.tracer.add_span(name, self.com_port, started,
+                                         time.perf_counter() - started, fields)
+        
+    def load_settings(self):
+        """Load COM port from generated.ufsettings"""
+        try:
+            if os.path.exists(self.settings_file):
+                import json
+                with open(self.settings_file, 'r') as f:
+                    settings = json.load(f)
+                    # Extract COM port from settings
+                    cortex_settings = settings.get("Serial Connection/Cortex_R4_0", {})
+                    self.com_port = cortex_settings.get("COMPort", "COM9")
+            else:
+                self.com_port = "COM9"  # Default
+                
+            print(f"🔌 COM Port: {self.com_port}")
+        except Exception as e:
+            print(f"⚠️  Settings load error, using COM9: {e}")
+            self.com_port = "COM9"
+    
+    def connect(self, use_device_cache=True):
+        """Connect to IWR6843AOP device"""
+        print(f"🚀 Connecting to IWR6843AOP on {self.com_port}...")
+        
+        try:
+            success = self.bootloader.connect(10, self.com_port)
+            if self.reset_sequence is not None:
+                reset = self.reset_sequence
+                if success:
+                    print(f"🔁 Reset via {reset.reset_line.upper()}: bootloader ready after "
+                          f"{reset.ready_s * 1000:.1f} ms ({reset.attempts} break(s))")
+                else:
+                    print(f"⚠️  No bootloader ACK within {reset.ready_timeout:.1f} s after reset via "
+                          f"{reset.reset_line.upper()}; check wiring or try --reset-invert/--sop-invert")
+                self.events.emit("reset", line=reset.reset_line, sop_line=reset.sop_line, ok=success,
+                                 ready_s=round(reset.ready_s, 6), attempts=reset.attempts)
+            if success:
+                print("✅ Connected to device")
+                
+                # Set part number for IWR6843AOP
+                self.bootloader.setPartNum(self.part_number)
+                print(f"📋 Part number set: {self.part_number}")
+                
+                # Determine PG version
+                with self._phase("pg_version") as phase:
+                    phase.ok = self.determine_pg_version(use_device_cache)
+                if phase.ok:
+                    print("✅ Device PG version determined")
+                    return True
+                else:
+                    print("❌ Cannot determine device PG version")
+                    return False
+            else:
+                print("❌ Failed to connect to device")
+                return False
+                
+        except Exception as e:
+            print(f"❌ Connection error: {e}")
+            return False
+    
+    def determine_pg_version(self, use_device_cache=True):
+        """PG version from the device cache when possible, else via GET_VERSION"""
+        self.saved_s = 0.0
+        usb_serial = ""
+        if self.device_cache is not None:
+            usb_serial = usb_serial_number(self.com_port)
+        if self.device_cache is not None and use_device_cache:
+            info = self.device_cache.lookup(self.com_port, usb_serial)
+            if info is not None:
+                # The break ACK in connect() already proved a bootloader on this port
+                self.bootloader.setDeviceInfo(info)
+                self.saved_s = info.probe_s
+                print(f"⚡ Device info from cache: {info.family}, ROM {info.rom_version} "
+                      f"(GET_VERSION skipped, {info.probe_s * 1000:.1f} ms saved)")
+                self.events.emit("device_info", cached=True, saved_s=round(info.probe_s, 6),
+                                 **info.to_dict())
+                return True
+        if not self.bootloader.determinePGVersion():
+            return False
+        info = self.bootloader.deviceInfo
+        info.usb_serial = usb_serial
+        print(f"🏷️  Device: {info.family}, ROM {info.rom_version}, record {info.record.hex()}")
+        self.events.emit("device_info", cached=False, saved_s=0.0, **info.to_dict())
+        if self.device_cache is not None:
+            self.device_cache.store(info)
+        return True
+    
+    def disconnect(self):
+        """Disconnect from device"""
+        try:
+            self.bootloader.disconnect()
+            print("🔌 Disconnected from device")
+        except Exception as e:
+            print(f"⚠️  Disconnect warning: {e}")
+    
+    def prepare_file_list(self, firmware_path):
+        """Prepare file list for flashing: images and/or bundles, in order (META_IMAGE1..4)"""
+        paths = image_paths(firmware_path)
+        if any(is_bundle(path) for path in paths):
+            try:
+                paths = expand_images(paths)
+            except Exception as e:
+                print(f"❌ Bundle error: {e}")
+                return None
+        if len(paths) > MAX_IMAGES:
+            print(f"❌ At most {MAX_IMAGES} images per session (META_IMAGE1..{MAX_IMAGES}), got {len(paths)}")
+            return None
+        file_list = []
+        for order, path in enumerate(paths, 1):
+            if is_url(path):
+                try:
+                    print(f"🌐 Streaming {path}")
+                    path = UrlImage(path, self.expected_sha256).start(FILE_HEADERSIZE)
+                except Exception as e:
+                    print(f"❌ Download error: {e}")
+                    self.close_streams(file_list)
+                    return None
+            file_info = self._prepare_file(path, order)
+            if file_info is None:
+                if isinstance(path, UrlImage):
+                    path.close()
+                self.close_streams(file_list)
+                return None
+            file_list.append(file_info)
+        return file_list
+    
+    @staticmethod
+    def close_streams(file_list):
+        """Stop the downloaders of URL images that were not read to the end"""
+        for file_info in file_list or []:
+            if isinstance(file_info.path, UrlImage):
+                file_info.path.close()
+    
+    def _prepare_file(self, firmware_path, order):
+        try:
+            # Create file object using TI's FilesObject
+            file_info = FilesObject(firmware_path, order)
+            
+            # Check file header (memoized per file identity in HEADER_CACHE)
+            hits = HEADER_CACHE.hits
+            if not self.bootloader.checkFileHeader(firmware_path, file_info):
+                print(f"❌ Invalid file header for {self.part_number}: {firmware_path}")
+                return None
+                
+            self._attach_manifest(file_info)
+            if HEADER_CACHE.hits > hits:
+                print(f"✅ File header valid for {self.part_number} (cached)")
+                return file_info
+            print(f"✅ File header valid for {self.part_number}")
+            print(f"📁 File: {firmware_path}")
+            print(f"📏 Size: {file_info.fileSize} bytes")
+            print(f"🆔 File ID: {file_info.file_id}")
+            
+            return file_info
+            
+        except Exception as e:
+            print(f"❌ File preparation error: {e}")
+            return None
+    
+    def _attach_manifest(self, file_info):
+        """Use the image's manifest sidecar, if still valid, for the chunk checksums"""
+        if not isinstance(file_info.path, str):
+            return
+        manifest = read_image_manifest(file_info.path, self.bootloader.chunksize)
+        if manifest is None:
+            return
+        file_info.chunkSums = chunk_sums(manifest)
+        print(f"🧾 Manifest: {manifest['chunk_count']} chunk checksums precomputed")
+    
+    def _download_all(self, file_list, storage):
+        """Download every file in order; prints and emits per-file and total throughput"""
+        files = []
+        for file_info in file_list:
+            with self._phase("download", file_id=file_info.file_id,
+                             size=file_info.fileSize) as phase:
+                phase.ok = self.flash_file(file_info, storage)
+            if not phase.ok:
+                return False
+            rate = file_info.fileSize / phase.duration if phase.duration else 0.0
+            files.append({"file_id": file_info.file_id, "path": str(file_info.path),
+                          "size": file_info.fileSize, "duration_s": round(phase.duration, 6),
+                          "bytes_per_s": round(rate, 1), "manifest": file_info.chunkSums is not None})
+            print(f"✅ SUCCESS: File {file_info.file_id} flashed to {storage} "
+                  f"({rate / 1024:.1f} KiB/s)")
+            if isinstance(file_info.path, UrlImage):
+                image = file_info.path
+                files[-1]["sha256"] = image.sha256
+                print(f"🔐 SHA-256: {image.sha256} (downloaded in {image.download_s:.2f} s, "
+                      f"peak buffer {image.peak_blocks}/{image.buffer_blocks} blocks)")
+                self.events.emit("stream", url=image.url, size=image.size, sha256=image.sha256,
+                                 verified=image.expected_sha256 is not None,
+                                 download_s=round(image.download_s, 6),
+                                 peak_blocks=image.peak_blocks)
+        total_size = sum(f["size"] for f in files)
+        total_s = sum(f["duration_s"] for f in files)
+        total_rate = total_size / total_s if total_s else 0.0
+        if len(files) > 1:
+            print(f"📦 {len(files)} images, {total_size} bytes in {total_s:.2f} s "
+                  f"({total_rate / 1024:.1f} KiB/s)")
+        self.events.emit("throughput", storage=storage, files=files, size=total_size,
+                         duration_s=round(total_s, 6), bytes_per_s=round(total_rate, 1))
+        return True
+    
+    def calculate_progress(self, file_list, format_enabled=True):
+        """Calculate progress indicators"""
+        try:
+            total_size = sum(f.fileSize for f in file_list)
+            self.bootloader.calcProgressValues(file_list, total_size, format_enabled)
+            print(f"📊 Progress calculation completed for {total_size} bytes")
+        except Exception as e:
+            print(f"⚠️  Progress calculation warning: {e}")
+    
+    def format_flash(self, storage="SFLASH"):
+        """Format (erase) flash before programming"""
+        try:
+            print(f"🗑️  Formatting {storage} storage...")
+            self.callback.update_progress("Formatting flash storage...", 5)
+            
+            self.bootloader.erase_storage(storage, 0, 0)
+            
+            self.callback.update_progress("Format completed", 10)
+            print(f"✅ {storage} format completed")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Format error: {e}")
+            return False
+    
+    def flash_file(self, file_info, storage="SFLASH"):
+        """Flash single file to device"""
+        try:
+            print(f"📤 Flashing {file_info.path}...")
+            
+            # Get progress counters
+            image_prog_list = self.bootloader.getImageProgCntList(file_info)
+            
+            # Download file
+            success = self.bootloader.download_file(
+                file_info.path,
+                file_info.file_id,
+                0,  # mirror_enabled
+                0,  # max_size  
+                storage,
+                image_prog_list,
+                file_info.chunkSums
+            )
+            
+            if success:
+                print(f"✅ File flashed successfully to {storage}")
+                return True
+            else:
+                print(f"❌ Failed to flash file")
+                return False
+                
+        except Exception as e:
+            print(f"❌ Flash error: {e}")
+            return False
+    
+    def run_application(self):
+        """Reset into the flashed application (SOP in functional mode)"""
+        if self.reset_sequence is None:
+            print("⚠️  No reset line configured; reset the device manually")
+            return False
+        with self._phase("run_application") as phase:
+            phase.ok = self.bootloader.resetToApplication()
+        if phase.ok:
+            print("▶️  Device reset into application")
+        return phase.ok
+    
+    def check_firmware(self, firmware_path=None):
+        """Validate the firmware header(s) for this part without touching the device"""
+        if firmware_path is None:
+            firmware_path = self.default_firmware
+        self.bootloader.setPartNum(self.part_number)
+        with self._phase("header_check") as phase:
+            file_list = self.prepare_file_list(firmware_path)
+            phase.ok = file_list is not None
+        # Only the headers were needed
+        self.close_streams(file_list)
+        self.events.emit("header_cache", **self.bootloader.getHeaderCacheStats())
+        return phase.ok
+    
+    def read_version(self):
+        """Connect, read the bootloader version record and disconnect"""
+        try:
+            with self._phase("connect", com_port=self.com_port) as phase:
+                # Always ask the device; the fresh record also refreshes the cache
+                phase.ok = self.connect(use_device_cache=False)
+            if phase.ok:
+                version = self.bootloader.versionInfo
+                self.version = version.decode() if isinstance(version, bytes) else version
+                print(f"🏷️  Bootloader version: {self.version}")
+            return phase.ok
+        finally:
+            self.disconnect()
+    
+    def erase(self, storage="SFLASH"):
+        """Connect and erase the storage without downloading anything"""
+        try:
+            with self._phase("connect", com_port=self.com_port) as phase:
+                phase.ok = self.connect()
+            if not phase.ok:
+                return False
+            with self._phase("erase", storage=storage) as phase:
+                phase.ok = self.format_flash(storage)
+            return phase.ok
+        finally:
+            self.disconnect()
+    
+    def load_to_sram(self, firmware_path):
+        """Connect and download to SRAM without erase (watch-mode iteration)"""
+        file_list = None
+        try:
+            with self._phase("connect", com_port=self.com_port) as phase:
+                phase.ok = self.connect()
+            if not phase.ok:
+                return False
+            with self._phase("header_check") as phase:
+                file_list = self.prepare_file_list(firmware_path)
+                phase.ok = bool(file_list)
+            if not file_list:
+                return False
+            with self._phase("progress_calc"):
+                self.calculate_progress(file_list, format_enabled=False)
+            return self._download_all(file_list, "SRAM")
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return False
+        finally:
+            self.close_streams(file_list)
+            self.disconnect()
+    
+    def flash_firmware(self, firmware_path=None, format_enabled=True, storage="SFLASH"):
+        """Main method to flash firmware to IWR6843AOP"""
+        
+        print("=" * 60)
+        print(f"🎯 {self.banner}")
+        print("=" * 60)
+        
+        # Use default firmware if not specified
+        if firmware_path is None:
+            firmware_path = self.default_firmware
+            
+        # Check firmware files exist
+        for path in image_paths(firmware_path):
+            if not is_url(path) and not os.path.exists(path):
+                print(f"❌ Firmware file not found: {path}")
+                return False
+            
+        file_list = None
+        try:
+            # Step 1: Connect to device
+            with self._phase("connect", com_port=self.com_port) as phase:
+                phase.ok = self.connect()
+            if not phase.ok:
+                return False
+            
+            # Step 2: Prepare file list
+            with self._phase("header_check") as phase:
+                file_list = self.prepare_file_list(firmware_path)
+                phase.ok = bool(file_list)
+            if not file_list:
+                return False
+            
+            # Step 3: Calculate progress
+            with self._phase("progress_calc"):
+                self.calculate_progress(file_list, format_enabled)
+            
+            # Step 4: Format flash if enabled
+            if format_enabled:
+                with self._phase("erase", storage=storage) as phase:
+                    phase.ok = self.format_flash(storage)
+                if not phase.ok:
+                    return False
+            
+            # Step 5: Flash each file (one connection, one erase)
+            if not self._download_all(file_list, storage):
+                return False
+            
+            print("=" * 60)
+            print("🎉 IWR6843AOP Flash Completed Successfully!")
+            if self.saved_s:
+                print(f"⚡ Cached device info saved {self.saved_s * 1000:.1f} ms (GET_VERSION skipped)")
+            print("=" * 60)
+            return True
+            
+        except KeyboardInterrupt:
+            print("\n⚠️  Operation cancelled by user")
+            return False
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return False
+        finally:
+            self.close_streams(file_list)
+            with self._phase("close"):
+                self.disconnect()
+            self.events.emit("opcode_summary", opcodes=self.bootloader.getOpcodeStats())
+            self.events.emit("header_cache", **self.bootloader.getHeaderCacheStats())
+
+class FlashCallback:
+    """Callback class to handle progress and messages from TI bootloader"""
+    
+    def __init__(self, events=None):
+        self.progress = 0
+        self.events = events if events is not None else EventStream()
+        
+    def update_progress(self, message, percentage):
+        """Update progress indicator"""
+        if percentage != self.progress:
+            self.progress = percentage
+            print(f"[{percentage:3d}%] {message}")
+            self.events.emit("progress", percent=percentage, message=message)
+    
+    def push_message(self, message, level):
+        """Handle log messages from bootloader"""
+        level_str = TRACE_LEVEL_NAMES.get(level, "INFO")
+        if level_str != "DEBUG":
+            self.events.emit("log", level=level_str, message=message)
+        
+        # Only show important messages
+        if level <= 1:  # FATAL, ERROR, WARN
+            print(f"[{level_str}] {message}")
+        elif level == 0:  # INFO
+            if any(keyword in message.lower() for keyword in 
+                   ["success", "completed", "failed", "error", "downloading"]):
+                print(f"[{level_str}] {message}")
+    
+    def report_retry(self, operation, attempt):
+        """Handle retry notifications from bootloader"""
+        self.events.emit("retry", operation=operation, attempt=attempt)
+    
+    def check_is_cancel_set(self):
+        """Check if operation should be cancelled"""
+        return False
@@ -0,0 +1,116 @@
+"""
+Image header lookups for checkFileHeader
+
+FileHeaders is turned into O(1) dicts per (PG key, part family) once at
+import, and the raw header word of each image is memoized per file identity
+(path, inode, size, mtime), so validating the same image for many boards
+opens it once. The cache is process-wide and can also be kept on disk.
+"""
+
+import os
+import stat
+import time
+
+from .constants import FileHeaders
+
+HEADER_CACHE_FILE = "user_files/settings/header_cache.json"
+
+def _build_tables():
+    exact, masked = {}, {}
+    for pg_key, families in FileHeaders.items():
+        exact[pg_key], masked[pg_key] = {}, {}
+        for family, entry in families.items():
+            headers, file_types = entry["headers"], entry["fileType"]
+            index = {}
+            for i, header in enumerate(headers):
+                index.setdefault(header, i)
+            exact[pg_key][family] = index
+            # Older parts also match on the top 12 bits, for images before CALIB_DATA only
+            limit = file_types.index("CALIB_DATA") if "CALIB_DATA" in file_types else 0
+            masked[pg_key][family] = {h: i for h, i in index.items() if i < limit}
+    return exact, masked
+
+# HEADER_INDEX[pg_key][family][header] -> index into FileHeaders[...]["fileType"]
+HEADER_INDEX, MASKED_HEADER_INDEX = _build_tables()
+
+def image_identity(image):
+    """Cache key of an image: (path, inode, size, mtime_ns)
+
+    None for streamed images and for paths that are not regular files.
+    """
+    if hasattr(image, "cache_key"):
+        return image.cache_key()
+    if hasattr(image, "open"):
+        # Streamed images are read once anyway
+        return None
+    try:
+        info = os.stat(image)
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+    return (os.path.abspath(image), info.st_ino, info.st_size, info.st_mtime_ns)
+
+class HeaderCache:
+    """Raw header word per image identity, with hit/miss counters"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        import threading
+        # Daemon workers check headers in parallel
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(identity):
+        return "|".join(str(part) for part in identity)
+
+    def use_file(self, path=HEADER_CACHE_FILE):
+        """Also keep the cache on disk (loaded now, written on every new entry)"""
+        import json
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, identity):
+        entry = self.entries.get(self._key(identity)) if identity is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["header"]
+
+    def store(self, identity, header):
+        if identity is None:
+            return
+        with self.lock:
+            self.entries[self._key(identity)] = {"header": header, "checked_at": round(time.time(), 3)}
+            if self.path is None:
+                return
+            import json
+            import tempfile
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # A temp name of its own, so concurrent writers never replace each other's file
+            fd, temp = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.entries, f, indent=2)
+                os.replace(temp, self.path)
+            except BaseException:
+                os.remove(temp)
+                raise
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries),
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0}
+
+# Shared by every BootLdr in the process (fleet mode validates one image for many boards)
+HEADER_CACHE = HeaderCache()
@@ -0,0 +1,209 @@
+"""
+Per-image manifests: everything a consumer needs to know about an image
+
+A manifest is a JSON sidecar next to the image (<image>.manifest.json) with
+its SHA-256, size, header, the detected file type per part family and, for
+one chunk size, the number of SEND_DATA chunks plus each chunk's 8-bit
+bootloader checksum and CRC32. The flasher, the mirror and the ESPHome
+generator read it instead of rescanning the image. A manifest is valid
+while the image's size and mtime are unchanged.
+"""
+
+import os
+import time
+import zlib
+import struct
+
+from .constants import DEFAULT_CHUNK_SIZE
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+MANIFEST_READ_SIZE = 1 << 20
+
+def manifest_path(path):
+    return f"{path}{MANIFEST_SUFFIX}"
+
+class ChunkSums:
+    """Per-chunk sum8 and CRC32, fed incrementally in blocks of any size"""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.sum8 = bytearray()
+        self.crc32 = bytearray()
+        self.pending = bytearray()
+
+    def _add(self, chunk):
+        self.sum8.append(sum(chunk) & 0xFF)
+        self.crc32 += struct.pack(">I", zlib.crc32(chunk))
+
+    def update(self, data):
+        view = memoryview(data)
+        if self.pending:
+            need = self.chunk_size - len(self.pending)
+            self.pending += view[:need]
+            view = view[need:]
+            if len(self.pending) < self.chunk_size:
+                return
+            self._add(self.pending)
+            self.pending = bytearray()
+        full = len(view) - len(view) % self.chunk_size
+        for offset in range(0, full, self.chunk_size):
+            self._add(view[offset:offset + self.chunk_size])
+        self.pending += view[full:]
+
+    def finish(self):
+        """Account for the short last chunk; returns self"""
+        if self.pending:
+            self._add(self.pending)
+            self.pending = bytearray()
+        return self
+
+    def __len__(self):
+        return len(self.sum8)
+
+def make_manifest(name, sha256, size, mtime_ns, head, sums):
+    """Manifest dict from values a reader of the image has already collected"""
+    from .catalog import parse_header, detect_file_types
+    header = parse_header(head)
+    return {
+        "version": MANIFEST_VERSION,
+        "name": name,
+        "sha256": sha256,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "header": None if header is None else f"0x{header:08X}",
+        "file_types": {} if header is None else detect_file_types(header),
+        "chunk_size": sums.chunk_size,
+        "chunk_count": len(sums),
+        "chunk_sum8": sums.sum8.hex(),
+        "chunk_crc32": sums.crc32.hex(),
+    }
+
+def build_image_manifest(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read the image once and return its manifest (not written)"""
+    import hashlib
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    sums = ChunkSums(chunk_size)
+    head = b""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(MANIFEST_READ_SIZE), b""):
+            digest.update(block)
+            sums.update(block)
+            if len(head) < 4:
+                head += block[:4 - len(head)]
+    return make_manifest(os.path.basename(path), digest.hexdigest(), stat.st_size,
+                         stat.st_mtime_ns, head, sums.finish())
+
+def write_image_manifest(path, manifest):
+    """Write the sidecar atomically; mtime_ns is taken from the image as it is now
+
+    Callers that have just written the image pass a manifest built from the
+    stream, whose mtime_ns is not known yet.
+    """
+    import json
+    stat = os.stat(path)
+    manifest = dict(manifest, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    target = manifest_path(path)
+    with open(target + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(target + ".tmp", target)
+    return manifest
+
+def read_image_manifest(path, chunk_size=None):
+    """The sidecar of an image if it still describes it (and uses chunk_size), else None"""
+    import json
+    try:
+        stat = os.stat(path)
+        with open(manifest_path(path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("size") != stat.st_size \
+            or manifest.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    if chunk_size is not None and manifest.get("chunk_size") != chunk_size:
+        return None
+    return manifest
+
+def ensure_image_manifest(path, chunk_size=DEFAULT_CHUNK_SIZE, force=False):
+    """Return (manifest, built): the valid sidecar, or a freshly built and written one"""
+    manifest = None if force else read_image_manifest(path, chunk_size)
+    if manifest is not None:
+        return manifest, False
+    return write_image_manifest(path, build_image_manifest(path, chunk_size)), True
+
+def _ensure_job(job):
+    path, chunk_size, force = job
+    started = time.perf_counter()
+    manifest, built = ensure_image_manifest(path, chunk_size, force)
+    return manifest, built, time.perf_counter() - started
+
+def ensure_manifests(paths, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, force=False):
+    """ensure_image_manifest for many images in a process pool, in input order
+
+    Returns (path, manifest, built, seconds) tuples. Each image is read by
+    one worker in one pass, so the work is linear in the total image size
+    and spreads over the CPU cores.
+    """
+    jobs = [(path, chunk_size, force) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = list(map(_ensure_job, jobs))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_ensure_job, jobs))
+    return [(path,) + result for path, result in zip(paths, results)]
+
+def chunk_sums(manifest):
+    """Per-chunk sum8 values of a manifest as bytes"""
+    return bytes.fromhex(manifest["chunk_sum8"])
+
+def find_images(directories):
+    from .catalog import CATALOG_SUFFIX
+    paths = []
+    for directory in directories:
+        for root, _dirs, names in os.walk(directory):
+            paths += [os.path.join(root, name) for name in sorted(names)
+                      if name.lower().endswith(CATALOG_SUFFIX)]
+    return paths
+
+def run_manifest(args, events):
+    """Build or refresh the manifests of the given images (default: the catalog folders)"""
+    from .catalog import CATALOG_DIRS
+    from .store import resolve_hash_ref
+    started = time.perf_counter()
+    if args.firmware:
+        paths = [resolve_hash_ref(path) for path in args.firmware]
+    else:
+        paths = find_images(CATALOG_DIRS + (args.catalog_dir or []))
+    workers = args.jobs or os.cpu_count() or 1
+    print(f"🧾 Manifests for {len(paths)} image(s), chunk size {args.chunk_size}, {workers} worker(s)...")
+    try:
+        results = ensure_manifests(paths, args.chunk_size, workers, args.force)
+    except OSError as e:
+        print(f"❌ Manifest error: {e}")
+        events.emit("result", success=False, exit_code=1,
+                    duration_s=round(time.perf_counter() - started, 6))
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'IMAGE':<40} {'SIZE':>9} {'CHUNKS':>7} {'HEADER':<11} {'SHA-256':<14} {'STATE':<8}")
+    built = total = 0
+    for path, manifest, was_built, seconds in results:
+        built += was_built
+        total += manifest["size"]
+        print(f"{manifest['name']:<40} {manifest['size']:>9} {manifest['chunk_count']:>7} "
+              f"{manifest['header'] or '-':<11} {manifest['sha256'][:12]:<14} "
+              f"{'built' if was_built else 'valid':<8}")
+        events.emit("image_manifest", path=path, manifest=manifest_path(path), built=was_built,
+                    duration_s=round(seconds, 6), sha256=manifest["sha256"], size=manifest["size"],
+                    header=manifest["header"], chunk_size=manifest["chunk_size"],
+                    chunk_count=manifest["chunk_count"])
+    rate = total / elapsed / 2**20 if elapsed else 0.0
+    print(f"\n✅ {len(results)} manifest(s), {built} built, {len(results) - built} still valid "
+          f"({total / 2**20:.1f} MiB in {elapsed:.3f} s, {rate:.0f} MiB/s)")
+    events.emit("result", success=True, exit_code=0, images=len(results), built=built,
+                duration_s=round(elapsed, 6))
+    return 0
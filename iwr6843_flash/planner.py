@@ -0,0 +1,327 @@
+"""
+Flash-time estimator: predicts every phase of a flash without touching a device
+
+The timing model (JSON, like the other caches in user_files/settings) keeps
+per port running averages of what real flashes measured: the connect,
+GET_VERSION, erase and close phases, and per bootloader command a fixed
+latency plus the share of the nominal UART wire time the link really spends.
+Splitting a command into latency and wire time lets the plan follow another
+chunk size or baud rate than the runs it learned from. Without history the
+plan uses wire time plus a default turnaround per round trip.
+After a flash the plan is compared with the measured phases and the model is
+updated, so it stays calibrated.
+"""
+
+import os
+import time
+
+from .events import EventStream
+from .constants import DEFAULT_CHUNK_SIZE, DEFAULT_SERIAL_BAUD_RATE
+
+TIMING_MODEL_FILE = "user_files/settings/timing_model.json"
+TIMING_MODEL_VERSION = 1
+# Weight of the newest run in the running averages
+MODEL_WEIGHT = 0.3
+# Plan-vs-measured records kept per port
+CHECK_HISTORY = 20
+# Start bit, 8 data bits, stop bit
+BITS_PER_BYTE = 10
+# About what one command adds on the wire besides its payload: sync, size and
+# checksum, the ACK, then GET_LAST_STATUS and the status reply
+COMMAND_FRAME_BYTES = 20
+# Payload (opcode included) of the commands that are not SEND_DATA
+COMMAND_PAYLOAD = {"START_DOWNLOAD": 13, "FILE_CLOSE": 5, "GET_VERSION_INFO": 1}
+# Device turnaround per round trip while nothing has been measured
+DEFAULT_TURNAROUND_S = 0.002
+# Every bootloader command is two round trips: the command and GET_LAST_STATUS
+ROUND_TRIPS_PER_COMMAND = 2
+DEFAULT_PHASE_S = {"connect": 0.05, "close": 0.01}
+DEFAULT_ERASE_S = {"SFLASH": 25.0, "SRAM": 0.1, "EEPROM": 5.0}
+# Port name the profile of simulated runs is kept under
+SIMULATED_PORT = "simulated"
+
+def wire_time(nbytes, baud):
+    """Seconds nbytes take on a UART at baud"""
+    return nbytes * BITS_PER_BYTE / baud
+
+def _average(old, new):
+    return new if old is None else old + MODEL_WEIGHT * (new - old)
+
+def _send_opcode(storage):
+    return "SEND_DATA_RAM" if storage == "SRAM" else "SEND_DATA"
+
+class TimingModel:
+    """Per-port timing profiles; path=None keeps them in memory"""
+
+    def __init__(self, path=TIMING_MODEL_FILE):
+        self.path = path
+        self.ports = None
+
+    def _load(self):
+        if self.ports is not None:
+            return
+        self.ports = {}
+        if self.path is None:
+            return
+        import json
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == TIMING_MODEL_VERSION:
+            self.ports = data.get("ports", {})
+
+    def profile(self, port):
+        """The profile of a port (empty if no run was recorded)"""
+        self._load()
+        return self.ports.get(port, {})
+
+    def save(self):
+        self._load()
+        if self.path is None:
+            return
+        import json
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"version": TIMING_MODEL_VERSION, "ports": self.ports}, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+
+    def record(self, port, measured, check=None):
+        """Fold one run's measurements (see measure_run) into the port's profile"""
+        self._load()
+        profile = self.ports.setdefault(port, {"runs": 0, "phases": {}, "commands": {}, "checks": []})
+        profile["runs"] += 1
+        profile["updated_at"] = round(time.time(), 3)
+        profile["baud"] = measured["baud"]
+        profile["chunk_size"] = measured["chunk_size"]
+        phases = profile["phases"]
+        for name, seconds in measured["phases"].items():
+            phases[name] = round(_average(phases.get(name), seconds), 6)
+        commands = profile["commands"]
+        for name, (seconds, payload) in measured["commands"].items():
+            # What the wire cannot explain is latency; a link faster than the
+            # nominal baud rate (simulator, USB bridge) shows up as link_factor < 1
+            wire = wire_time(payload + COMMAND_FRAME_BYTES, measured["baud"])
+            latency, factor = (seconds - wire, 1.0) if seconds >= wire else (0.0, seconds / wire)
+            entry = commands.setdefault(name, {"samples": 0})
+            entry["latency_s"] = round(_average(entry.get("latency_s"), latency), 6)
+            entry["link_factor"] = round(_average(entry.get("link_factor"), factor), 6)
+            entry["samples"] += 1
+        if check is not None:
+            profile["checks"] = (profile["checks"] + [check])[-CHECK_HISTORY:]
+        return profile
+
+def _command_time(profile, name, payload, baud):
+    """(seconds, source) for one command of payload bytes"""
+    entry = profile.get("commands", {}).get(name)
+    wire = wire_time(payload + COMMAND_FRAME_BYTES, baud)
+    if entry is None:
+        return ROUND_TRIPS_PER_COMMAND * DEFAULT_TURNAROUND_S + wire, "wire"
+    return entry["latency_s"] + entry["link_factor"] * wire, "history"
+
+def image_sizes(firmware_path):
+    """(name, size) per image to download; bundles are expanded, URL sizes are None"""
+    from .flasher import image_paths
+    from .bundle import is_bundle, open_bundle
+    from .remote import is_url
+    images = []
+    for path in image_paths(firmware_path):
+        if is_bundle(path):
+            images += [(str(member), member.size) for member in open_bundle(path)]
+        elif is_url(path):
+            images.append((path, None))
+        else:
+            images.append((path, os.path.getsize(path)))
+    return images
+
+def plan_flash(profile, images, storage="SFLASH", chunk_size=DEFAULT_CHUNK_SIZE,
+               baud=DEFAULT_SERIAL_BAUD_RATE, format_enabled=True):
+    """Predicted duration of every phase of a flash, from a port profile and (name, size) images"""
+    learned = profile.get("phases", {})
+    phases = []
+
+    def add(phase, seconds, source, detail="", **fields):
+        phases.append(dict(phase=phase, predicted_s=round(seconds, 6), source=source,
+                           detail=detail, **fields))
+
+    if "connect" in learned:
+        add("connect", learned["connect"], "history")
+    else:
+        add("connect", DEFAULT_PHASE_S["connect"], "default")
+    if "version" in learned:
+        # Includes the runs where the device cache skipped GET_VERSION
+        add("version", learned["version"], "history", "GET_VERSION")
+    else:
+        add("version", *_command_time(profile, "GET_VERSION_INFO",
+                                      COMMAND_PAYLOAD["GET_VERSION_INFO"], baud), "GET_VERSION")
+    if format_enabled:
+        erase = f"erase:{storage}"
+        if erase in learned:
+            add("erase", learned[erase], "history", storage)
+        else:
+            add("erase", DEFAULT_ERASE_S[storage], "default", storage)
+
+    send = _send_opcode(storage)
+    for order, (name, size) in enumerate(images, 1):
+        if size is None:
+            add("download", 0.0, "unknown", f"{os.path.basename(name)}, size unknown (URL)",
+                image=order, size=None, chunks=None)
+            continue
+        chunks = max(1, -(-size // chunk_size))
+        start, _ = _command_time(profile, "START_DOWNLOAD", COMMAND_PAYLOAD["START_DOWNLOAD"], baud)
+        close, _ = _command_time(profile, "FILE_CLOSE", COMMAND_PAYLOAD["FILE_CLOSE"], baud)
+        # All chunks are full except the last one
+        chunk_s, source = _command_time(profile, send, 1 + chunk_size, baud)
+        last_s, _ = _command_time(profile, send, 1 + size - (chunks - 1) * chunk_size, baud)
+        seconds = start + (chunks - 1) * chunk_s + last_s + close
+        add("download", seconds, source,
+            f"{os.path.basename(name)}, {size} B, {chunks} chunks",
+            image=order, size=size, chunks=chunks)
+
+    if "close" in learned:
+        add("close", learned["close"], "history")
+    else:
+        add("close", DEFAULT_PHASE_S["close"], "default")
+    return {"storage": storage, "chunk_size": chunk_size, "baud": baud, "format": format_enabled,
+            "runs": profile.get("runs", 0), "phases": phases,
+            "total_s": round(sum(p["predicted_s"] for p in phases), 6)}
+
+def _label(phase):
+    return f"download {phase['image']}" if phase["phase"] == "download" else phase["phase"]
+
+def print_plan(port, plan):
+    print(f"🗓️  Flash plan for {port} -> {plan['storage']}, chunk {plan['chunk_size']} B, "
+          f"{plan['baud']} Bd ({plan['runs']} run(s) of history)")
+    print(f"\n{'PHASE':<14} {'PREDICTED':>11} {'SOURCE':<8} DETAIL")
+    for phase in plan["phases"]:
+        print(f"{_label(phase):<14} {phase['predicted_s']:>9.3f} s {phase['source']:<8} {phase['detail']}")
+    print(f"{'total':<14} {plan['total_s']:>9.3f} s")
+
+
+class RunRecorder(EventStream):
+    """Forwards every event and keeps the phases and opcode stats of the run"""
+
+    def __init__(self, events):
+        super().__init__(events.stream)
+        self.events = events
+        self.phases = []
+        self.opcodes = {}
+
+    def emit(self, event, **fields):
+        self.events.emit(event, **fields)
+        if event == "phase_end":
+            self.phases.append(fields)
+        elif event == "opcode_summary":
+            self.opcodes = fields["opcodes"]
+
+def measure_run(recorder, storage, chunk_size, baud):
+    """What a recorded flash measured, in the terms the timing model learns"""
+    first = {}
+    downloads = []
+    for phase in recorder.phases:
+        if not phase["ok"]:
+            continue
+        if phase["phase"] == "download":
+            downloads.append(phase)
+        else:
+            first.setdefault(phase["phase"], phase["duration_s"])
+    phases = {}
+    if "connect" in first:
+        phases["connect"] = max(0.0, first["connect"] - first.get("pg_version", 0.0))
+    if "pg_version" in first:
+        phases["version"] = first["pg_version"]
+    if "erase" in first:
+        phases[f"erase:{storage}"] = first["erase"]
+    if "close" in first:
+        phases["close"] = first["close"]
+
+    opcodes = recorder.opcodes
+    commands = {name: (opcodes[name]["avg_s"], payload)
+                for name, payload in COMMAND_PAYLOAD.items() if name in opcodes}
+    send = opcodes.get(_send_opcode(storage))
+    if downloads and send:
+        # Per chunk, with the Python work between chunks, as the plan needs it
+        other = sum(opcodes[name]["total_s"] for name in ("START_DOWNLOAD", "FILE_CLOSE") if name in opcodes)
+        seconds = (sum(d["duration_s"] for d in downloads) - other) / send["count"]
+        payload = 1 + sum(d["size"] for d in downloads) / send["count"]
+        commands[_send_opcode(storage)] = (max(0.0, seconds), payload)
+    return {"baud": baud, "chunk_size": chunk_size, "phases": phases, "commands": commands,
+            "downloads": [d["duration_s"] for d in downloads]}
+
+def compare_run(plan, measured):
+    """Plan rows with the measured seconds next to the predicted ones"""
+    actual = {"connect": measured["phases"].get("connect"),
+              "version": measured["phases"].get("version"),
+              "erase": measured["phases"].get(f"erase:{plan['storage']}"),
+              "close": measured["phases"].get("close")}
+    rows = []
+    for phase in plan["phases"]:
+        if phase["phase"] == "download":
+            index = phase["image"] - 1
+            seconds = measured["downloads"][index] if index < len(measured["downloads"]) else None
+        else:
+            seconds = actual[phase["phase"]]
+        rows.append({"phase": _label(phase), "predicted_s": phase["predicted_s"],
+                     "measured_s": None if seconds is None else round(seconds, 6)})
+    return rows
+
+def calibrate(model, port, plan, recorder, events):
+    """Compare a successful flash with its plan, print it and update the model"""
+    measured = measure_run(recorder, plan["storage"], plan["chunk_size"], plan["baud"])
+    rows = compare_run(plan, measured)
+    known = [row for row in rows if row["measured_s"] is not None]
+    predicted = sum(row["predicted_s"] for row in known)
+    actual = sum(row["measured_s"] for row in known)
+    error = (predicted - actual) / actual * 100 if actual else 0.0
+
+    print(f"\n📐 Plan vs. measured ({port}):")
+    for row in rows:
+        seconds = "-" if row["measured_s"] is None else f"{row['measured_s']:.3f} s"
+        print(f"   {row['phase']:<14} {row['predicted_s']:>9.3f} s  {seconds:>11}")
+    print(f"   {'total':<14} {predicted:>9.3f} s  {actual:>9.3f} s ({error:+.0f}%)")
+
+    check = {"at": round(time.time(), 3), "predicted_s": round(predicted, 6),
+             "measured_s": round(actual, 6), "error_pct": round(error, 1)}
+    profile = model.record(port, measured, check)
+    model.save()
+    if model.path is not None:
+        print(f"🧮 Timing model updated: {port}, {profile['runs']} run(s)")
+    events.emit("plan_check", port=port, phases=rows, predicted_s=check["predicted_s"],
+                measured_s=check["measured_s"], error_pct=check["error_pct"],
+                runs=profile["runs"], model=model.path)
+    return check
+
+def run_plan(args, events):
+    """Print the predicted phases of a flash; no serial port is opened"""
+    from .flasher import IWR6843AOPFlasher
+    started = time.perf_counter()
+    if args.com == "auto":
+        from .discovery import resolve_auto_port
+        args.com = resolve_auto_port(args.simulate)
+    flasher = IWR6843AOPFlasher(events, com_port=args.com)
+    port = SIMULATED_PORT if args.simulate else flasher.com_port
+    model = TimingModel(args.timing_model or TIMING_MODEL_FILE)
+    try:
+        images = image_sizes(args.firmware or flasher.default_firmware)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot size the images: {e}")
+        events.emit("result", success=False, exit_code=1,
+                    duration_s=round(time.perf_counter() - started, 6))
+        return 1
+    plan = plan_flash(model.profile(port), images, args.storage, args.chunk_size,
+                      args.baud, not args.no_format)
+    print_plan(port, plan)
+    if any(size is None for _name, size in images):
+        print("⚠️  URL images are not sized without downloading them; their time is missing")
+    checks = model.profile(port).get("checks", [])
+    if checks:
+        errors = [abs(check["error_pct"]) for check in checks]
+        print(f"🎯 Last {len(errors)} plan(s) were off by {sum(errors) / len(errors):.0f}% on average "
+              f"(last: {checks[-1]['error_pct']:+.0f}%)")
+    events.emit("plan", port=port, **plan)
+    events.emit("result", success=True, exit_code=0, total_s=plan["total_s"],
+                duration_s=round(time.perf_counter() - started, 6))
+    return 0
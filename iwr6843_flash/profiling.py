@@ -0,0 +1,262 @@
+"""
+Built-in profiling (--profile): cProfile or a low-overhead stack sampler
+"""
+
+import os
+import sys
+
+from .serial_stub import SerialStub
+from .bootloader import BootLdr, _checksum
+from .simulator import SimulatedDevice
+from .events import EventStream
+from .tracing import Tracer
+from .flasher import FlashCallback
+
+PROFILE_MODES = ["cprofile", "sample"]
+PROFILE_TOP_N = 20
+PROFILE_SAMPLE_INTERVAL = 0.002
+
+PROFILE_CATEGORY_LABELS = [
+    ("serial_io", "Serial I/O (blocked)"),
+    ("wait", "Sleeps/waits (blocked)"),
+    ("simulator", "Simulated device"),
+    ("checksum", "Checksum"),
+    ("framing", "Packet framing"),
+    ("callbacks", "Progress/log callbacks"),
+    ("console", "Console output"),
+    ("other", "Other Python"),
+]
+# Neither is host CPU time: the thread was blocked, or the device was simulated
+BLOCKED_CATEGORIES = ("serial_io", "wait")
+NON_CPU_CATEGORIES = BLOCKED_CATEGORIES + ("simulator",)
+
+# Builtins that block on the serial port (cProfile reports them as '~')
+SERIAL_IO_BUILTIN_PREFIXES = ("<built-in method select.", "<built-in method posix.read",
+                              "<built-in method posix.write",
+                              "<built-in method fcntl.", "<built-in method termios.",
+                              "<built-in method nt.read", "<built-in method nt.write")
+# Builtins that block without touching the port (break wait, response delays)
+WAIT_BUILTIN_PREFIXES = ("<built-in method time.sleep", "<method 'acquire' of '_thread.",
+                         "<method 'wait' of ")
+CONSOLE_BUILTINS = ("<built-in method builtins.print>",
+                    "<method 'write' of '_io.TextIOWrapper' objects>",
+                    "<method 'flush' of '_io.TextIOWrapper' objects>")
+
+def _code_keys(*objects):
+    """Return pstats-style keys for functions and all methods of classes"""
+    keys = set()
+    for obj in objects:
+        members = vars(obj).values() if isinstance(obj, type) else [obj]
+        for member in members:
+            if isinstance(member, property):
+                member = member.fget
+            func = getattr(member, "__wrapped__", member)
+            code = getattr(func, "__code__", None)
+            if code is not None:
+                keys.add((code.co_filename, code.co_firstlineno, code.co_name))
+    return keys
+
+def _profile_code_categories():
+    categories = {}
+    groups = [
+        ("simulator", _code_keys(SimulatedDevice, SerialStub)),
+        ("checksum", _code_keys(_checksum)),
+        ("framing", _code_keys(BootLdr._send_packet, BootLdr._receive_packet, BootLdr._read_ack,
+                               BootLdr._read_ack_with_cancel_check, BootLdr._send_command,
+                               BootLdr._send_chunk, BootLdr._send_chunkRAM,
+                               BootLdr._send_start_download, BootLdr._send_file_close)),
+        ("callbacks", _code_keys(FlashCallback, EventStream, Tracer,
+                                 BootLdr._update_prog_msg, BootLdr._trace_msg, BootLdr._checkForCancel,
+                                 BootLdr._record_opcode_time, BootLdr._trace_span, BootLdr._report_retry)),
+    ]
+    for name, keys in groups:
+        for key in keys:
+            categories[key] = name
+    return categories
+
+def _profile_category(key, code_categories):
+    """Classify a (filename, lineno, funcname) key into a report category"""
+    category = code_categories.get(key)
+    if category is not None:
+        return category
+    filename, lineno, funcname = key
+    if filename == "~":
+        if funcname.startswith(SERIAL_IO_BUILTIN_PREFIXES):
+            return "serial_io"
+        if funcname.startswith(WAIT_BUILTIN_PREFIXES):
+            return "wait"
+        if funcname in CONSOLE_BUILTINS:
+            return "console"
+        return "other"
+    if (os.sep + "serial" + os.sep) in filename:
+        return "serial_io"
+    return "other"
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampler of one thread's Python stack
+
+    Each interval is charged to the stack seen at its end. Where the
+    platform has per-thread CPU clocks (Linux, macOS) it is split into the
+    CPU time the thread used and the time it was blocked; elsewhere a
+    sleep or wait stays with the Python frame that called it.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        import threading
+        self.interval = interval
+        self.samples = {}
+        # Wall and CPU seconds per stack
+        self.wall = {}
+        self.cpu = {}
+        self.thread_id = None
+        self._cpu_clock = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+
+    @property
+    def measures_cpu(self):
+        return self._cpu_clock is not None
+
+    def start(self):
+        import time
+        import threading
+        self.thread_id = threading.get_ident()
+        try:
+            self._cpu_clock = time.pthread_getcpuclockid(self.thread_id)
+        except (AttributeError, OSError):
+            # Windows: no CPU clock for another thread
+            self._cpu_clock = None
+        # The sampler only runs when the GIL is released; switch often enough
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._thread = threading.Thread(target=self._run, name="flash-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _cpu_time(self):
+        import time
+        return time.clock_gettime(self._cpu_clock) if self._cpu_clock is not None else 0.0
+
+    def _run(self):
+        import time
+        last_wall, last_cpu = time.perf_counter(), self._cpu_time()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            wall, cpu = time.perf_counter(), self._cpu_time()
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            key = tuple(reversed(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+            self.wall[key] = self.wall.get(key, 0.0) + wall - last_wall
+            self.cpu[key] = self.cpu.get(key, 0.0) + min(cpu - last_cpu, wall - last_wall)
+            last_wall, last_cpu = wall, cpu
+
+    @staticmethod
+    def _label(code):
+        return "%s:%s" % (os.path.basename(code.co_filename), getattr(code, "co_qualname", code.co_name))
+
+    def write_collapsed(self, path):
+        """Write stacks in collapsed format (flamegraph.pl, speedscope)"""
+        with open(path, "w") as f:
+            for stack, count in self.samples.items():
+                f.write(";".join(self._label(code) for code in stack) + " %d\n" % count)
+
+    def top_functions(self, limit):
+        inclusive = {}
+        for stack, wall in self.wall.items():
+            for code in set(stack):
+                inclusive[code] = inclusive.get(code, 0.0) + wall
+        ranked = sorted(inclusive.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self._label(code), seconds) for code, seconds in ranked]
+
+    def breakdown(self):
+        code_categories = _profile_code_categories()
+        seconds = {}
+        for stack, wall in self.wall.items():
+            categories = [_profile_category((code.co_filename, code.co_firstlineno, code.co_name),
+                                            code_categories) for code in stack]
+            if "simulator" in categories:
+                # The simulated device's work and delays are not host time
+                charges = {"simulator": wall}
+            else:
+                # CPU goes to the innermost frame with a known category,
+                # blocked time to the serial port if pyserial is on the stack
+                cpu_category = next((c for c in reversed(categories) if c != "other"), "other")
+                blocked_category = "serial_io" if "serial_io" in categories else "wait"
+                if self.measures_cpu:
+                    cpu = self.cpu[stack]
+                    charges = {cpu_category: cpu, blocked_category: wall - cpu}
+                else:
+                    charges = {cpu_category: wall}
+            for category, value in charges.items():
+                seconds[category] = seconds.get(category, 0.0) + value
+        return seconds
+
+def _cprofile_breakdown(stats):
+    code_categories = _profile_code_categories()
+    seconds = {}
+    for key, (cc, nc, tottime, cumtime, callers) in stats.stats.items():
+        category = _profile_category(key, code_categories)
+        if key[0] == "~" and callers and category in ("other",) + BLOCKED_CATEGORIES:
+            # Charge plain builtins (sum, struct.pack, ...) to their callers,
+            # and sleeps or reads inside the simulator to the simulator
+            for caller, caller_stats in callers.items():
+                caller_category = _profile_category(caller, code_categories)
+                if category != "other" and caller_category != "simulator":
+                    caller_category = category
+                seconds[caller_category] = seconds.get(caller_category, 0.0) + caller_stats[2]
+        else:
+            seconds[category] = seconds.get(category, 0.0) + tottime
+    return seconds
+
+def _print_profile_breakdown(seconds, cpu_measured=True):
+    total = sum(seconds.values()) or 1.0
+    print("\n⏱️  Time breakdown (self time):")
+    for category, label in PROFILE_CATEGORY_LABELS:
+        value = seconds.get(category, 0.0)
+        print(f"   {label:<24} {value:9.4f} s  {value * 100.0 / total:5.1f}%")
+    if cpu_measured:
+        python_cpu = sum(value for category, value in seconds.items() if category not in NON_CPU_CATEGORIES)
+        print(f"   {'Python CPU (excl. I/O)':<24} {python_cpu:9.4f} s")
+    else:
+        print(f"   {'Python CPU (excl. I/O)':<24}       n/a (no per-thread CPU clock here; "
+              f"waits stay with their caller)")
+
+def run_profiled(mode, output, func, *args):
+    """Run func under the chosen profiler, save the profile and print hot spots"""
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func, *args)
+        finally:
+            profiler.dump_stats(output)
+        stats = pstats.Stats(profiler, stream=sys.stdout)
+        print(f"\n🔬 Top {PROFILE_TOP_N} functions by cumulative time:")
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        seconds = _cprofile_breakdown(stats)
+        cpu_measured = True
+    else:
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            result = func(*args)
+        finally:
+            sampler.stop()
+            sampler.write_collapsed(output)
+        print(f"\n🔬 Top {PROFILE_TOP_N} functions by cumulative time (sampled every {sampler.interval * 1000:.0f} ms):")
+        for label, value in sampler.top_functions(PROFILE_TOP_N):
+            print(f"   {value:9.4f} s  {label}")
+        seconds = sampler.breakdown()
+        cpu_measured = sampler.measures_cpu
+    _print_profile_breakdown(seconds, cpu_measured)
+    print(f"💾 Profile written: {output}")
+    return result, seconds
@@ -0,0 +1,231 @@
+"""
+Stream firmware from an HTTP(S) URL straight into the flash pipeline
+
+A background thread reads the response into a bounded queue (so a slow
+serial link throttles the download instead of buffering the whole image)
+and hashes it with SHA-256 on the way. The header bytes arrive first and
+are checked before anything is erased; BootLdr then reads the chunks as
+they come in.
+
+With a pinned SHA-256 the image is downloaded completely into a spooled
+temp file first and verified before START_DOWNLOAD, so a mismatch never
+leaves the device erased with a partial image.
+"""
+
+import time
+
+STREAM_BLOCK_SIZE = 8192
+# Blocks the downloader may run ahead of the serial link (512 KiB)
+STREAM_BUFFER_BLOCKS = 64
+STREAM_TIMEOUT = 30.0
+# How often a downloader blocked on the full buffer checks whether it was closed
+STREAM_POLL_INTERVAL = 0.2
+# Spooled bodies (pinned hash, no Content-Length) stay in memory up to this size
+STREAM_SPOOL_MEMORY = 2 * 1024 * 1024
+
+def is_url(path):
+    return isinstance(path, str) and path.lower().startswith(("http://", "https://"))
+
+class _StreamError:
+    def __init__(self, error):
+        self.error = error
+
+class _UrlReader:
+    """Reader handed to BootLdr: replays the prefetched header, then streams"""
+
+    def __init__(self, image):
+        self.image = image
+        self.pos = 0
+
+    def read(self, size=-1):
+        data = self.image._read_at(self.pos, size)
+        self.pos += len(data)
+        return data
+
+    def close(self):
+        pass
+
+class UrlImage:
+    """A remote image; BootLdr accepts it wherever it takes a file name"""
+
+    def __init__(self, url, sha256=None, buffer_blocks=STREAM_BUFFER_BLOCKS, timeout=STREAM_TIMEOUT):
+        self.url = url
+        self.expected_sha256 = sha256.lower() if sha256 else None
+        self.buffer_blocks = buffer_blocks
+        self.timeout = timeout
+        self.size = 0
+        self.head = b""
+        self.received = 0
+        self.consumed = 0
+        self.sha256 = ""
+        self.download_s = 0.0
+        self.peak_blocks = 0
+        self._blocks = None
+        self._pending = b""
+        self._done = False
+        self._stop = None
+        # Whole body, when it is verified or sized before the flash starts
+        self._spool = None
+
+    def start(self, head_size):
+        """Connect, learn the size and prefetch the first head_size bytes"""
+        import queue
+        import hashlib
+        import threading
+        from urllib.request import urlopen
+        self.started = time.perf_counter()
+        response = urlopen(self.url, timeout=self.timeout)
+        length = response.headers.get("Content-Length")
+        self._hash = hashlib.sha256()
+        self._blocks = queue.Queue(maxsize=self.buffer_blocks)
+        self._stop = threading.Event()
+        if self.expected_sha256 is not None or length is None:
+            if length is None:
+                # START_DOWNLOAD needs the size up front
+                print("⚠️  Server sent no Content-Length; downloading the whole image first")
+            else:
+                print("🔐 Pinned SHA-256: downloading the whole image and verifying it before the erase")
+            self._spool_body(response, None if length is None else int(length))
+        else:
+            self.size = int(length)
+            threading.Thread(target=self._fetch, args=(response,), name="url-stream",
+                             daemon=True).start()
+        while len(self.head) < head_size:
+            block = self._take(head_size - len(self.head))
+            if not block:
+                break
+            self.head += block
+        return self
+
+    def _spool_body(self, response, length):
+        """Read the whole body into a temp file and check its length and hash"""
+        import tempfile
+        spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MEMORY)
+        try:
+            received = 0
+            with response:
+                for block in iter(lambda: response.read(STREAM_BLOCK_SIZE), b""):
+                    spool.write(block)
+                    self._hash.update(block)
+                    received += len(block)
+            if length is not None and received != length:
+                raise IOError(f"download ended after {received} of {length} bytes")
+            self.size = received
+            self._finish(received)
+            if self.expected_sha256 and self.sha256 != self.expected_sha256:
+                raise IOError(f"SHA-256 mismatch for {self.url}: got {self.sha256}")
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        self._spool = spool
+        self._done = True
+
+    def _put(self, item):
+        """Queue an item for the reader; False once close() has given up on the stream"""
+        import queue
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=STREAM_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fetch(self, response):
+        received = 0
+        try:
+            with response:
+                while True:
+                    block = response.read(STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    received += len(block)
+                    self._hash.update(block)
+                    if not self._put(block):
+                        return
+                    self.peak_blocks = max(self.peak_blocks, self._blocks.qsize())
+            if received != self.size:
+                raise IOError(f"download ended after {received} of {self.size} bytes")
+            self._finish(received)
+            self._put(None)
+        except Exception as e:
+            self._put(_StreamError(e))
+
+    def _finish(self, received):
+        self.received = received
+        self.download_s = time.perf_counter() - self.started
+        self.sha256 = self._hash.hexdigest()
+
+    def _next_block(self):
+        """Next block from the downloader (None at the end); raises its errors"""
+        block = self._blocks.get()
+        if block is None or isinstance(block, _StreamError):
+            self._done = True
+        if isinstance(block, _StreamError):
+            raise IOError(f"{self.url}: {block.error}")
+        return block
+
+    def _take(self, size):
+        """Next bytes of the body, blocking until the downloader delivers them"""
+        if self._spool is not None:
+            return self._spool.read(size)
+        while not self._pending and not self._done:
+            self._pending = self._next_block() or b""
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def _read_at(self, pos, size):
+        """Read like a file: full size bytes unless the image ends first"""
+        if size < 0:
+            size = self.size - pos
+        data = b""
+        if pos < len(self.head):
+            data = self.head[pos:pos + size]
+            pos += len(data)
+        if len(data) < size and pos >= len(self.head):
+            if pos != len(self.head) + self.consumed:
+                raise IOError(f"{self.url} can only be streamed once")
+            while len(data) < size:
+                block = self._take(size - len(data))
+                if not block:
+                    break
+                data += block
+                self.consumed += len(block)
+        if self.consumed and len(self.head) + self.consumed >= self.size:
+            # Last chunk: wait for the end of the stream, then the digest is final
+            while not self._done:
+                if self._next_block() is not None:
+                    raise IOError(f"{self.url} is longer than its Content-Length")
+            if self.expected_sha256 and self.sha256 != self.expected_sha256:
+                raise IOError(f"SHA-256 mismatch for {self.url}: got {self.sha256}")
+        return data
+
+    def open(self):
+        return _UrlReader(self)
+
+    def close(self):
+        """Stop the downloader and drop its buffer (the connection closes with it)
+
+        Needed whenever the image is not read to the end, e.g. after a failed
+        header check or erase; otherwise the thread waits on the full queue forever.
+        """
+        import queue
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        if self._stop is None or self._done:
+            return
+        self._stop.set()
+        self._done = True
+        self._pending = b""
+        try:
+            while True:
+                self._blocks.get_nowait()
+        except queue.Empty:
+            pass
+
+    def __str__(self):
+        return self.url
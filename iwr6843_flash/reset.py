@@ -0,0 +1,117 @@
+"""
+Automatic reset into the ROM bootloader via the serial modem-control lines
+
+nRST and SOP are wired to DTR and/or RTS of the USB-UART. Levels are given
+as pyserial line states (True = line set); most adapters invert, so each
+line's active state is configurable.
+"""
+
+import time
+
+from .bootloader import _wait_for_ack
+
+RESET_LINES = ["dtr", "rts"]
+RESET_HOLD = 0.05
+RESET_SOP_SETUP = 0.005
+RESET_READY_TIMEOUT = 2.0
+RESET_POLL_INTERVAL = 0.05
+
+class ResetSequence:
+    """Drives nRST/SOP through DTR/RTS and waits until the bootloader ACKs"""
+
+    def __init__(self, reset_line="dtr", sop_line=None, reset_active=True, sop_flash=True,
+                 hold=RESET_HOLD, sop_setup=RESET_SOP_SETUP, ready_timeout=RESET_READY_TIMEOUT,
+                 poll_interval=RESET_POLL_INTERVAL):
+        for line in (reset_line, sop_line):
+            if line is not None and line not in RESET_LINES:
+                raise ValueError(f"unknown modem line {line!r} (expected dtr or rts)")
+        if reset_line == sop_line:
+            raise ValueError("nRST and SOP need different modem lines")
+        self.reset_line = reset_line
+        self.sop_line = sop_line
+        self.reset_active = reset_active
+        self.sop_flash = sop_flash
+        self.hold = hold
+        self.sop_setup = sop_setup
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.ready_s = 0.0
+        self.attempts = 0
+
+    def _drive(self, comm, line, value):
+        if line is not None:
+            setattr(comm, line, value)
+
+    def apply_idle(self, comm):
+        """Reset released, SOP left in flash mode so a stray reset lands in the bootloader"""
+        self._drive(comm, self.reset_line, not self.reset_active)
+        self._drive(comm, self.sop_line, self.sop_flash)
+
+    def open_serial(self, port, baudrate, timeout):
+        """Open a pyserial port with the idle line levels applied before open
+
+        pyserial sets DTR and RTS when a port opens, which would reset boards
+        wired with the active state True on every reconnect.
+        """
+        import serial
+        comm = serial.Serial()
+        comm.port = port
+        comm.baudrate = baudrate
+        comm.timeout = timeout
+        self.apply_idle(comm)
+        comm.open()
+        return comm
+
+    def _pulse_reset(self, comm, sop_level):
+        self._drive(comm, self.sop_line, sop_level)
+        time.sleep(self.sop_setup)
+        self._drive(comm, self.reset_line, self.reset_active)
+        time.sleep(self.hold)
+        self._drive(comm, self.reset_line, not self.reset_active)
+
+    def enter_bootloader(self, comm, report_retry=None):
+        """Reset with SOP in flash mode; True as soon as a break is ACKed
+
+        Leaves the break condition set on success, like BootLdr's own
+        handshake; the caller clears it.
+        """
+        self._pulse_reset(comm, self.sop_flash)
+        released = time.perf_counter()
+        deadline = released + self.ready_timeout
+        timeout = comm.timeout
+        comm.timeout = min(self.poll_interval, timeout) if timeout else self.poll_interval
+        self.attempts = 0
+        try:
+            while time.perf_counter() < deadline:
+                self.attempts += 1
+                if self.attempts > 1 and report_retry is not None:
+                    report_retry("reset", self.attempts - 1)
+                comm.break_condition = True
+                if _wait_for_ack(comm, min(deadline, time.perf_counter() + self.poll_interval)):
+                    self.ready_s = time.perf_counter() - released
+                    return True
+                # Re-arm the break in case it started before the ROM was listening
+                comm.break_condition = False
+            self.ready_s = time.perf_counter() - released
+            return False
+        finally:
+            comm.timeout = timeout
+
+    def enter_application(self, comm):
+        """Reset with SOP in functional mode so the flashed image starts"""
+        self._pulse_reset(comm, not self.sop_flash)
+
+    def simulated_device(self):
+        """SimulatedDevice wired like this sequence, booted into its application"""
+        from .simulator import SimulatedDevice, SIM_BOOT_DELAY
+        return SimulatedDevice(reset_line=self.reset_line, sop_line=self.sop_line,
+                               reset_active=self.reset_active, sop_flash=self.sop_flash,
+                               boot_delay=SIM_BOOT_DELAY)
+
+def reset_sequence_from_args(args):
+    """ResetSequence for the --reset-* options, None without --reset-line"""
+    if not args.reset_line:
+        return None
+    return ResetSequence(args.reset_line, args.sop_line, reset_active=not args.reset_invert,
+                         sop_flash=not args.sop_invert, hold=args.reset_hold / 1000.0,
+                         ready_timeout=args.boot_timeout)
@@ -0,0 +1,224 @@
+"""
+Simulated xWR ROM bootloader for hardware-free runs
+"""
+
+import time
+import struct
+
+from .constants import *
+from .bootloader import _checksum
+
+SIM_VERSION_INFO = bytes.fromhex("080006020000000000000000")
+SIM_STORAGE_SRAM = 4
+SIM_BOOT_DELAY = 0.02
+
+class SimulatedDevice:
+    """In-process xWR bootloader model with a pyserial-like interface
+
+    Parses the framed packets BootLdr writes and answers with the same
+    ACK/NACK, status and version packets as the ROM bootloader, so a full
+    flash runs without hardware. Pass open_serial as BootLdr comm_factory.
+    A silent device models a port with no bootloader behind it.
+
+    With reset_line set, nRST (and optionally SOP) follow the DTR/RTS
+    modem lines: the board starts in its application and only enters the
+    bootloader after a reset with SOP at the flash level, boot_delay
+    seconds after nRST is released. Line changes are kept in lineLog.
+    """
+
+    def __init__(self, version_info=SIM_VERSION_INFO, response_delay=0.0, erase_delay=0.0, silent=False,
+                 reset_line=None, sop_line=None, reset_active=True, sop_flash=True, boot_delay=0.0):
+        self.version_info = version_info
+        self.silent = silent
+        self.reset_line = reset_line
+        self.sop_line = sop_line
+        self.reset_active = reset_active
+        self.sop_flash = sop_flash
+        self.boot_delay = boot_delay
+        self.lines = {"dtr": False, "rts": False}
+        self.lineLog = []
+        self.resets = 0
+        self.mode = "bootloader" if reset_line is None else "application"
+        self.readyAt = 0.0
+        self._pendingBreak = False
+        self.response_delay = response_delay
+        self.erase_delay = erase_delay
+        self.port = ""
+        self.baudrate = DEFAULT_SERIAL_BAUD_RATE
+        self.timeout = None
+        self.is_open = False
+        self._break = False
+        self.rx = bytearray()
+        self.tx = bytearray()
+        self.statusSize = 1
+        self.lastStatus = AWR_BOOTLDR_OPCODE_RET_SUCCESS
+        self.download = None
+        self.files = {}
+        self.erased = []
+        self.opcodeCounts = {}
+
+    def open_serial(self, port, baudrate, timeout):
+        """(Re)open the simulated port; used as BootLdr comm_factory"""
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.is_open = True
+        return self
+
+    # ---- pyserial compatible surface ----
+
+    def isOpen(self):
+        return self.is_open
+
+    def flushInput(self):
+        self.tx.clear()
+
+    def close(self):
+        self.is_open = False
+        self.rx.clear()
+        self.tx.clear()
+
+    @property
+    def break_condition(self):
+        return self._break
+
+    @break_condition.setter
+    def break_condition(self, value):
+        # The ROM bootloader answers a break with an ACK once it is listening
+        if value and not self._break and self._listening():
+            self._pendingBreak = True
+            self._poll()
+        elif not value:
+            self._pendingBreak = False
+        self._break = bool(value)
+
+    @property
+    def dtr(self):
+        return self.lines["dtr"]
+
+    @dtr.setter
+    def dtr(self, value):
+        self._set_line("dtr", value)
+
+    @property
+    def rts(self):
+        return self.lines["rts"]
+
+    @rts.setter
+    def rts(self, value):
+        self._set_line("rts", value)
+
+    def write(self, data):
+        if self._listening() and time.perf_counter() >= self.readyAt:
+            self.rx += data
+            self._parse()
+        return len(data)
+
+    def read(self, size=1):
+        self._poll()
+        if not self.tx and self.timeout:
+            if self._pendingBreak:
+                # Block like a real port until the ROM is up (or the read times out)
+                time.sleep(max(0.0, min(self.timeout, self.readyAt - time.perf_counter())))
+                self._poll()
+            elif not self._listening():
+                # Nothing will ever arrive; block until the read timeout
+                time.sleep(self.timeout)
+        data = bytes(self.tx[:size])
+        del self.tx[:size]
+        return data
+
+    # ---- modem lines / reset model ----
+
+    def _listening(self):
+        return not self.silent and self.mode == "bootloader"
+
+    def _poll(self):
+        if self._pendingBreak and self._listening() and time.perf_counter() >= self.readyAt:
+            self._pendingBreak = False
+            self._respond_ack(True)
+
+    def _set_line(self, name, value):
+        value = bool(value)
+        if self.lines[name] == value:
+            return
+        self.lines[name] = value
+        self.lineLog.append((time.perf_counter(), name, value))
+        if name != self.reset_line:
+            return
+        if value == self.reset_active:
+            self.mode = "reset"
+            self._pendingBreak = False
+            self.rx.clear()
+            self.tx.clear()
+        elif self.mode == "reset":
+            # nRST released: the ROM samples SOP and boots
+            self.resets += 1
+            sop = self.lines[self.sop_line] if self.sop_line is not None else self.sop_flash
+            self.mode = "bootloader" if sop == self.sop_flash else "application"
+            self.readyAt = time.perf_counter() + self.boot_delay
+
+    # ---- device side protocol ----
+
+    def _parse(self):
+        while True:
+            # Anything before a SYNC byte (e.g. the host's raw ACK) is skipped
+            start = self.rx.find(AWR_BOOTLDR_SYNC_PATTERN)
+            if start < 0:
+                self.rx.clear()
+                return
+            del self.rx[:start]
+            if len(self.rx) < 4:
+                return
+            msgSize = (self.rx[1] << 8) | self.rx[2]
+            if len(self.rx) < msgSize + 2:
+                return
+            checksum = self.rx[3]
+            payload = bytes(self.rx[4:msgSize + 2])
+            del self.rx[:msgSize + 2]
+            self._handle(payload, checksum)
+
+    def _respond(self, payload):
+        if self.response_delay:
+            time.sleep(self.response_delay)
+        self.tx += struct.pack(">HB", len(payload) + 2, _checksum(payload)) + payload
+
+    def _respond_ack(self, ok):
+        self._respond(b"\x00" + (AWR_BOOTLDR_OPCODE_ACK if ok else AWR_BOOTLDR_OPCODE_NACK))
+
+    def _handle(self, payload, checksum):
+        if not payload or _checksum(payload) != checksum:
+            self._respond_ack(False)
+            return
+        opcode = payload[0]
+        name = OpcodeNames.get(opcode, hex(opcode))
+        self.opcodeCounts[name] = self.opcodeCounts.get(name, 0) + 1
+        if opcode == AWR_BOOTLDR_OPCODE_GET_LAST_STATUS[0]:
+            self._respond(self.lastStatus + b"\x00" * (self.statusSize - 1))
+        elif opcode == AWR_BOOTLDR_OPCODE_GET_VERSION_INFO[0]:
+            self._respond_ack(True)
+            self._respond(self.version_info)
+        elif opcode == AWR_BOOTLDR_OPCODE_ERASE[0]:
+            if self.erase_delay:
+                time.sleep(self.erase_delay)
+            self.erased.append(struct.unpack(">I", payload[1:5])[0])
+            self._respond_ack(True)
+        elif opcode == AWR_BOOTLDR_OPCODE_START_DOWNLOAD[0]:
+            size, storage, fileType, mirror = struct.unpack(">IIII", payload[1:17])
+            self.statusSize = 4 if storage == SIM_STORAGE_SRAM else 1
+            self.download = [fileType, size, bytearray()]
+            self._respond_ack(True)
+        elif opcode in (AWR_BOOTLDR_OPCODE_SEND_DATA[0], AWR_BOOTLDR_OPCODE_SEND_DATA_RAM[0]):
+            ok = self.download is not None and len(self.download[2]) + len(payload) - 1 <= self.download[1]
+            if ok:
+                self.download[2] += payload[1:]
+            self._respond_ack(ok)
+        elif opcode == AWR_BOOTLDR_OPCODE_FILE_CLOSE[0]:
+            if self.download is not None:
+                self.files[self.download[0]] = bytes(self.download[2])
+                self.download = None
+            self._respond_ack(True)
+        elif opcode in (AWR_BOOTLDR_OPCODE_PING[0], AWR_BOOTLDR_OPCODE_DISCONNECT[0]):
+            self._respond_ack(True)
+        else:
+            self._respond_ack(False)
@@ -0,0 +1,171 @@
+"""
+Content-addressed firmware store
+
+Blobs live under <root>/sha256/ab/cdef... named by their SHA-256, are
+written atomically and are never written in place. refs.json maps image names
+to hashes; legacy paths such as firmware/<name>.bin are hardlinks to the
+blobs, so identical images are stored once whatever they are called. A
+blob's image manifest sits next to it as <blob>.manifest.json.
+gc() removes the blobs no name refers to, with their manifests.
+"""
+
+import os
+import shutil
+
+from .manifest import MANIFEST_SUFFIX
+
+STORE_DIR = "user_files/store"
+HASH_REF_PREFIX = "sha256:"
+
+def make_writable(path):
+    """Clear a read-only bit before path is replaced or removed
+
+    Windows refuses both on read-only files. Blobs are no longer made
+    read-only (legacy paths share their inode), but stores written by
+    earlier versions still contain such blobs.
+    """
+    import stat
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return
+    if not mode & stat.S_IWRITE:
+        os.chmod(path, mode | stat.S_IWRITE)
+
+def is_sha256(text):
+    return len(text) == 64 and all(c in "0123456789abcdef" for c in text)
+
+def is_hash_ref(path):
+    """True for 'sha256:<64 hex digits>' image references"""
+    return isinstance(path, str) and path.startswith(HASH_REF_PREFIX) and is_sha256(path[len(HASH_REF_PREFIX):])
+
+class FirmwareStore:
+    """Blobs by SHA-256 plus name -> hash references"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.refs_file = os.path.join(root, "refs.json")
+        self._refs = None
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, "sha256", sha256[:2], sha256[2:])
+
+    def has(self, sha256):
+        return os.path.isfile(self.blob_path(sha256))
+
+    def _temp_path(self, name):
+        directory = os.path.join(self.root, "tmp")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{name}.{os.getpid()}")
+
+    def put_file(self, path, sha256, move=False):
+        """Add a file whose SHA-256 is already known; returns the blob path
+
+        The caller vouches for the hash (it comes from the download stream).
+        With move the file is consumed; otherwise it is hardlinked, or copied
+        where links are not possible. An existing blob is kept as is.
+        """
+        blob = self.blob_path(sha256)
+        if os.path.isfile(blob):
+            if move:
+                make_writable(path)
+                os.remove(path)
+            return blob
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        temp = self._temp_path(sha256)
+        try:
+            if move:
+                os.replace(path, temp)
+            else:
+                os.link(path, temp)
+        except OSError:
+            # Other file system, or no hardlinks
+            shutil.copyfile(path, temp)
+            if move:
+                make_writable(path)
+                os.remove(path)
+        # Not chmod'ed read-only: the blob's inode is also the legacy path, and
+        # Windows could then neither replace nor remove that path on the next update
+        os.replace(temp, blob)
+        return blob
+
+    def materialize(self, sha256, destination):
+        """Make destination a hardlink to the blob (copy if links fail), atomically"""
+        blob = self.blob_path(sha256)
+        try:
+            if os.path.samefile(blob, destination):
+                return destination
+        except OSError:
+            pass
+        temp = f"{destination}.link"
+        if os.path.lexists(temp):
+            os.remove(temp)
+        try:
+            os.link(blob, temp)
+        except OSError:
+            shutil.copyfile(blob, temp)
+        make_writable(destination)
+        os.replace(temp, destination)
+        return destination
+
+    @property
+    def refs(self):
+        if self._refs is None:
+            import json
+            try:
+                with open(self.refs_file) as f:
+                    self._refs = json.load(f)
+            except (OSError, ValueError):
+                self._refs = {}
+        return self._refs
+
+    def set_ref(self, name, sha256):
+        self.refs[name] = sha256
+
+    def save(self):
+        import json
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.refs_file + ".tmp", "w") as f:
+            json.dump(self.refs, f, indent=2, sort_keys=True)
+        os.replace(self.refs_file + ".tmp", self.refs_file)
+
+    def resolve(self, ref):
+        """Blob path for 'sha256:<hex>', a bare hash or a ref name; None if absent"""
+        if is_hash_ref(ref):
+            sha256 = ref[len(HASH_REF_PREFIX):]
+        elif is_sha256(ref):
+            sha256 = ref
+        else:
+            sha256 = self.refs.get(ref)
+        if sha256 is None or not self.has(sha256):
+            return None
+        return self.blob_path(sha256)
+
+    def gc(self, dry_run=False):
+        """Remove blobs no ref points to; returns (blobs removed, bytes freed)"""
+        keep = set(self.refs.values())
+        removed = freed = 0
+        for root, _dirs, names in os.walk(os.path.join(self.root, "sha256")):
+            for name in names:
+                # Image manifests (<blob>.manifest.json) go with their blob
+                blob = name.split(".", 1)[0]
+                sha256 = os.path.basename(root) + blob
+                if sha256 in keep and (blob == name or name == blob + MANIFEST_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                if blob == name:
+                    removed += 1
+                freed += os.path.getsize(path)
+                if not dry_run:
+                    make_writable(path)
+                    os.remove(path)
+        if not dry_run:
+            # Leftovers of interrupted writes
+            shutil.rmtree(os.path.join(self.root, "tmp"), ignore_errors=True)
+        return removed, freed
+
+def resolve_hash_ref(path, store=None):
+    """Blob path for a 'sha256:' reference; other paths and unknown hashes unchanged"""
+    if not is_hash_ref(path):
+        return path
+    return (store or FirmwareStore()).resolve(path) or path
@@ -0,0 +1,55 @@
+"""
+Phase span tracing with Chrome trace-event export
+"""
+
+import os
+import time
+import contextlib
+
+class Tracer:
+    """Collects timed spans per device track and exports Chrome trace JSON"""
+
+    def __init__(self):
+        import threading
+        self.spans = []
+        self.tracks = {}
+        self.lock = threading.Lock()
+        self.wall_origin = time.time()
+        self.perf_origin = time.perf_counter()
+
+    def add_span(self, name, track, started, duration, args=None):
+        """Record a finished span; started is a time.perf_counter() value"""
+        with self.lock:
+            tid = self.tracks.setdefault(str(track), len(self.tracks) + 1)
+            self.spans.append((name, tid, started, duration, args or {}))
+
+    @contextlib.contextmanager
+    def span(self, name, track, **args):
+        """Time a block as a span on the given track"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, track, started, time.perf_counter() - started, args)
+
+    def chrome_trace(self):
+        """Return the collected spans as a Chrome trace-event document"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                   "args": {"name": "IWR6843AOP flasher"}}]
+        with self.lock:
+            for track, tid in self.tracks.items():
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                               "args": {"name": track}})
+            for name, tid, started, duration, args in self.spans:
+                # Wall-clock based timestamps so traces of parallel runs line up
+                ts = (self.wall_origin + started - self.perf_origin) * 1e6
+                events.append({"name": name, "cat": "flash", "ph": "X", "pid": pid, "tid": tid,
+                               "ts": round(ts, 3), "dur": round(duration * 1e6, 3), "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        """Write the trace to a JSON file (open with Perfetto or chrome://tracing)"""
+        import json
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
@@ -0,0 +1,159 @@
+"""
+Batch validation of many images without a device or a configured BootLdr
+
+Every image is checked against all part families and PG keys in
+FileHeaders at once (the rules of BootLdr.checkFileHeader), its size
+against MAX_FILE_SIZE (and MAX_APP_FILE_SIZE for SRAM), and its SHA-256
+against what the catalog, its image manifest or its store path claim.
+Images are mmapped and hashed in a process pool, a few images per task, and
+the results come back as one report.
+"""
+
+import os
+import time
+
+from .constants import FILE_HEADERSIZE, MAX_FILE_SIZE, MAX_APP_FILE_SIZE
+
+def _store_sha256(path):
+    """SHA-256 a firmware store blob path encodes (.../sha256/ab/cdef...), else None"""
+    from .store import is_sha256
+    parent, name = os.path.split(os.path.abspath(path))
+    top, prefix = os.path.split(parent)
+    sha256 = prefix + name
+    if os.path.basename(top) == "sha256" and is_sha256(sha256):
+        return sha256
+    return None
+
+def _read_image(path):
+    """(size, SHA-256, header bytes) of one image from a read-only mmap"""
+    import mmap
+    import hashlib
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # Empty files cannot be mapped
+            return 0, hashlib.sha256().hexdigest(), b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return size, hashlib.sha256(view).hexdigest(), view[:FILE_HEADERSIZE]
+
+def validate_image(job):
+    """Check one image; job is (path, part family or None, storage, catalog SHA-256 or None)"""
+    from .catalog import parse_header, detect_file_types
+    from .manifest import read_image_manifest
+    path, family, storage, catalog_sha256 = job
+    started = time.perf_counter()
+    result = {"path": path, "name": os.path.basename(path), "size": None, "sha256": None,
+              "header": None, "file_types": {}, "fits_sram": False, "errors": []}
+    errors = result["errors"]
+    try:
+        size, sha256, head = _read_image(path)
+    except (OSError, ValueError) as e:
+        errors.append(f"unreadable: {e}")
+        result["duration_s"] = round(time.perf_counter() - started, 6)
+        return result
+    result.update(size=size, sha256=sha256, fits_sram=size <= MAX_APP_FILE_SIZE)
+
+    # Sizes: download_file refuses empty images and anything from MAX_FILE_SIZE on
+    if size < FILE_HEADERSIZE:
+        errors.append(f"smaller than the {FILE_HEADERSIZE}-byte header")
+    elif size >= MAX_FILE_SIZE:
+        errors.append(f"{size} bytes, limit {MAX_FILE_SIZE - 1}")
+    if storage == "SRAM" and size > MAX_APP_FILE_SIZE:
+        errors.append(f"{size} bytes do not fit SRAM (MAX_APP_FILE_SIZE {MAX_APP_FILE_SIZE})")
+
+    header = parse_header(head)
+    if header is not None:
+        result["header"] = f"0x{header:08X}"
+        result["file_types"] = detect_file_types(header)
+        if not result["file_types"]:
+            errors.append(f"header {result['header']} matches no part family")
+        elif family and not any(family in types for types in result["file_types"].values()):
+            errors.append(f"header {result['header']} is not valid for {family}")
+
+    manifest = read_image_manifest(path)
+    expected = {"catalog": catalog_sha256, "store": _store_sha256(path),
+                "manifest": manifest["sha256"] if manifest else None}
+    for source, known in expected.items():
+        if known and known != sha256:
+            errors.append(f"SHA-256 differs from the {source} ({known[:12]})")
+    result["verified_by"] = [source for source, known in expected.items() if known]
+    result["duration_s"] = round(time.perf_counter() - started, 6)
+    return result
+
+def validate_images(paths, part=None, storage="SFLASH", workers=None, catalog=None):
+    """validate_image for every path in a process pool; results in input order
+
+    Duplicates (same SHA-256 under several paths) are marked in each
+    result's "duplicate_of".
+    """
+    from .catalog import _family
+    family = _family(part) if part else None
+    jobs = [(path, family, storage, catalog.indexed_sha256(path) if catalog is not None else None)
+            for path in paths]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [validate_image(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = min(workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # A few tasks per worker keep IPC low and the load balanced
+            results = list(pool.map(validate_image, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    first = {}
+    for result in results:
+        result["duplicate_of"] = None
+        if result["sha256"] is None:
+            continue
+        if result["sha256"] in first:
+            result["duplicate_of"] = first[result["sha256"]]
+        else:
+            first[result["sha256"]] = result["path"]
+    return results
+
+def run_validate(args, events):
+    """Validate images (default: the catalog folders) and print one report"""
+    from .catalog import CATALOG_DIRS, FirmwareCatalog
+    from .manifest import find_images
+    from .store import resolve_hash_ref
+    started = time.perf_counter()
+    if args.firmware:
+        paths = [resolve_hash_ref(path) for path in args.firmware]
+    else:
+        paths = find_images(CATALOG_DIRS + (args.catalog_dir or []))
+    workers = args.jobs or os.cpu_count() or 1
+    catalog = FirmwareCatalog()
+    print(f"🔍 Validating {len(paths)} image(s) with {workers} worker(s)"
+          f"{f' for {args.part}' if args.part else ''}, target {args.storage}...")
+    results = validate_images(paths, args.part, args.storage, workers,
+                              catalog if catalog.exists() else None)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'':<2} {'IMAGE':<40} {'SIZE':>9} {'HEADER':<11} {'FAMILIES':<24} {'SHA-256':<14} NOTES")
+    for result in results:
+        families = sorted({family for types in result["file_types"].values() for family in types})
+        notes = list(result["errors"])
+        if result["duplicate_of"]:
+            notes.append(f"same as {os.path.basename(result['duplicate_of'])}")
+        if not result["errors"] and result.get("verified_by"):
+            notes.append(f"hash matches {', '.join(result['verified_by'])}")
+        size = "-" if result["size"] is None else result["size"]
+        print(f"{'❌' if result['errors'] else '✅'} {result['name']:<40} {size:>9} "
+              f"{result['header'] or '-':<11} {','.join(families) or '-':<24} "
+              f"{(result['sha256'] or '-')[:12]:<14} {'; '.join(notes)}")
+
+    invalid = sum(1 for r in results if r["errors"])
+    duplicates = sum(1 for r in results if r["duplicate_of"])
+    total = sum(r["size"] or 0 for r in results)
+    summary = {"images": len(results), "valid": len(results) - invalid, "invalid": invalid,
+               "duplicates": duplicates, "bytes": total, "workers": workers,
+               "part": args.part, "storage": args.storage, "duration_s": round(elapsed, 6)}
+    rate = total / elapsed / 2**20 if elapsed else 0.0
+    print(f"\n{'✅' if not invalid else '❌'} {summary['valid']}/{len(results)} valid, {invalid} invalid, "
+          f"{duplicates} duplicate(s) ({total / 2**20:.1f} MiB in {elapsed:.3f} s, {rate:.0f} MiB/s)")
+    events.emit("validation", summary=summary, images=results)
+    exit_code = 1 if invalid else 0
+    events.emit("result", success=not invalid, exit_code=exit_code, images=len(results),
+                invalid=invalid, duration_s=round(elapsed, 6))
+    return exit_code
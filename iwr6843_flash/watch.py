@@ -0,0 +1,105 @@
+"""
+Watch mode: re-download the image to SRAM whenever the file changes
+
+One flash session lives for the whole loop, so settings, the header check
+per image version and the device info are only read once; SRAM needs no
+erase. Each iteration reports the edit-to-running latency: from the file's
+modification time until the bootloader acknowledged FILE_CLOSE.
+"""
+
+import os
+import time
+
+WATCH_POLL_INTERVAL = 0.05
+# Builds often write the image in several steps; wait until it stops changing
+WATCH_SETTLE = 0.15
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def wait_for_change(path, last_state, poll_interval=WATCH_POLL_INTERVAL, settle=WATCH_SETTLE):
+    """Block until the file differs from last_state and has been stable for settle seconds"""
+    while True:
+        state = _file_state(path)
+        if state is not None and state != last_state:
+            stable_since = time.perf_counter()
+            while time.perf_counter() - stable_since < settle:
+                time.sleep(poll_interval)
+                current = _file_state(path)
+                if current != state:
+                    state = current
+                    stable_since = time.perf_counter()
+            if state is not None and state[0] > 0:
+                return state
+        time.sleep(poll_interval)
+
+def run_watch(args, events):
+    """Download the image to SRAM now and again after every change"""
+    from .flasher import IWR6843AOPFlasher
+    from .device import DeviceCache
+    from .simulator import SimulatedDevice
+
+    if args.com == "auto":
+        from .discovery import resolve_auto_port
+        args.com = resolve_auto_port(args.simulate)
+
+    reset_sequence = None
+    if args.reset_line:
+        from .reset import reset_sequence_from_args
+        reset_sequence = reset_sequence_from_args(args)
+
+    comm_factory = None
+    if args.simulate:
+        device = SimulatedDevice() if reset_sequence is None else reset_sequence.simulated_device()
+        comm_factory = device.open_serial
+        print("🧪 Using simulated bootloader (no device I/O)")
+
+    device_cache = None
+    if not args.no_device_cache:
+        device_cache = DeviceCache(path=None) if args.simulate else DeviceCache()
+
+    flasher = IWR6843AOPFlasher(events, com_port=args.com, comm_factory=comm_factory,
+                                device_cache=device_cache,
+                                reset_sequence=reset_sequence)
+    # Store blobs never change, so a sha256: reference is no use here either
+    if args.firmware and (len(args.firmware) > 1 or "://" in args.firmware[0]
+                          or args.firmware[0].startswith("sha256:")):
+        raise ValueError("watch takes a single local image")
+    firmware = os.path.abspath(args.firmware[0] if args.firmware else flasher.default_firmware)
+    if reset_sequence is None:
+        print("💡 Without --reset-line the board must be back in the bootloader before each change")
+    print(f"👀 Watching {firmware} (SRAM, Ctrl+C to stop)")
+
+    iteration = 0
+    failures = 0
+    state = _file_state(firmware)
+    try:
+        while not args.watch_count or iteration < args.watch_count:
+            if iteration > 0 or state is None:
+                state = wait_for_change(firmware, state)
+            iteration += 1
+            detected = time.time()
+            started = time.perf_counter()
+            ok = flasher.load_to_sram(firmware)
+            download_s = time.perf_counter() - started
+            # First load: measured from start-up, not from an edit
+            edited = state[1] / 1e9 if iteration > 1 else detected
+            latency_s = time.time() - edited
+            failures += not ok
+            mark = "✅" if ok else "❌"
+            print(f"{mark} #{iteration}: edit→running {latency_s * 1000:.0f} ms "
+                  f"(detect {(detected - edited) * 1000:.0f} ms, download {download_s * 1000:.0f} ms)")
+            events.emit("watch_iteration", iteration=iteration, ok=ok, firmware=firmware,
+                        size=state[0], latency_s=round(latency_s, 6),
+                        detect_s=round(detected - edited, 6), download_s=round(download_s, 6))
+    except KeyboardInterrupt:
+        print("\n👋 Watch stopped")
+
+    exit_code = 0 if iteration and not failures else 1
+    events.emit("result", success=exit_code == 0, exit_code=exit_code, iterations=iteration,
+                failed=failures, firmware=firmware)
+    return exit_code